@@ -20,6 +20,14 @@ flutter clean
 rm -rf "${TEMP_DMG_DIR}"
 mkdir -p "${TEMP_DMG_DIR}"
 
+# 无损压缩应用图标（缺少 Pillow/NumPy 时跳过）
+if command -v python3 >/dev/null 2>&1 && python3 -c "import PIL, numpy" >/dev/null 2>&1; then
+    echo "🗜️ 无损压缩应用图标..."
+    python3 scripts/png_optimize.py "macos/Runner/Assets.xcassets/AppIcon.appiconset"
+else
+    echo "⚠️ 未安装 Pillow/NumPy，跳过图标压缩"
+fi
+
 # 2. 构建 Release 版本
 echo "🔨 构建 Release 版本..."
 flutter build macos --release
@@ -72,6 +80,17 @@ Google Drive Downloader v${APP_VERSION} 安装说明
 © 2025 Google Drive Downloader v${APP_VERSION}
 EOF
 
+# DMG卷图标（scripts/icon_containers.py 生成的 .icns，需要 Xcode 命令行工具中的 SetFile）
+VOLUME_ICON="generated_icons/AppIcon.icns"
+if [ -f "${VOLUME_ICON}" ] && command -v SetFile >/dev/null 2>&1; then
+    cp "${VOLUME_ICON}" "${TEMP_DMG_DIR}/.VolumeIcon.icns"
+    SetFile -c icnC "${TEMP_DMG_DIR}/.VolumeIcon.icns"
+    SetFile -a C "${TEMP_DMG_DIR}"
+    echo "✅ 已设置DMG卷图标"
+else
+    echo "⚠️ 未找到 ${VOLUME_ICON} 或 SetFile，DMG使用默认卷图标"
+fi
+
 # 6. 创建 DMG 文件
 echo "💿 创建 DMG 安装包..."
 DMG_PATH="${DMG_NAME}.dmg"
@@ -5,103 +5,179 @@ X Google Drive Downloader 简单图标生成器
 """
 
 try:
-    from PIL import Image, ImageDraw, ImageFont
+    import PIL  # noqa: F401  检查依赖是否已安装
+    import argparse
     import os
+    from functools import lru_cache
+    import sys
 except ImportError:
     print("❌ 需要安装 PIL 库")
     print("运行: pip3 install Pillow")
     exit(1)
 
-def create_app_icon(size):
-    """创建指定尺寸的应用图标"""
-    
-    # 创建图像
-    img = Image.new('RGBA', (size, size), (250, 250, 250, 255))
-    draw = ImageDraw.Draw(img)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+from display_list import DisplayList
+from export_scheduler import ExportTask, add_jobs_argument, run_exports, save_png
+from icon_hinting import DESIGN_SIZE, Hinter
+from icon_pyramid import IconPyramid
+from png_stream import add_png_mode_argument, set_png_mode
+
+# 不超过这个尺寸的图标使用像素对齐的几何直接在目标尺寸绘制，不再从1024母版缩小
+HINT_MAX_SIZE = 32
+# 各尺寸的关键尺寸覆盖表（像素），没有列出的按比例取整
+HINT_OVERRIDES = {
+    16: {"x_radius": 2, "x_arm": 1, "head_half": 2, "head_height": 2, "dot_spacing": 2},
+    32: {"x_radius": 3, "x_arm": 2, "shaft_width": 2, "head_height": 3, "dot_spacing": 3},
+}
+
+CLOUD_COLOR = (0, 102, 204, 255)  # #0066CC
+ARROW_COLOR = (52, 199, 89, 255)  # #34C759
+
+def design_geometry(size):
+    """按比例缩放1024设计坐标（size=1024时即为显示列表使用的设计坐标）"""
     
     # 计算尺寸比例
     scale = size / 1024.0
     
-    # 背景圆角矩形
-    corner_radius = int(180 * scale)
-    
-    # 绘制云朵 (简化版)
-    cloud_color = (0, 102, 204, 255)  # #0066CC
+    # 云朵 (简化版)：主体和三个小圆
     cloud_x = int(200 * scale)
     cloud_y = int(300 * scale)
     cloud_w = int(400 * scale)
     cloud_h = int(150 * scale)
-    
-    # 云朵主体
-    draw.ellipse([cloud_x, cloud_y, cloud_x + cloud_w, cloud_y + cloud_h], 
-                 fill=cloud_color)
-    
-    # 云朵小圆
-    draw.ellipse([cloud_x - int(50 * scale), cloud_y + int(30 * scale), 
-                  cloud_x + int(100 * scale), cloud_y + int(120 * scale)], 
-                 fill=cloud_color)
-    draw.ellipse([cloud_x + int(150 * scale), cloud_y - int(30 * scale), 
-                  cloud_x + int(300 * scale), cloud_y + int(60 * scale)], 
-                 fill=cloud_color)
-    draw.ellipse([cloud_x + int(300 * scale), cloud_y + int(20 * scale), 
-                  cloud_x + int(450 * scale), cloud_y + int(110 * scale)], 
-                 fill=cloud_color)
+    cloud = [
+        [cloud_x, cloud_y, cloud_x + cloud_w, cloud_y + cloud_h],
+        [cloud_x - int(50 * scale), cloud_y + int(30 * scale),
+         cloud_x + int(100 * scale), cloud_y + int(120 * scale)],
+        [cloud_x + int(150 * scale), cloud_y - int(30 * scale),
+         cloud_x + int(300 * scale), cloud_y + int(60 * scale)],
+        [cloud_x + int(300 * scale), cloud_y + int(20 * scale),
+         cloud_x + int(450 * scale), cloud_y + int(110 * scale)],
+    ]
     
     # X标识
-    x_size = int(60 * scale)
     x_pos = int(600 * scale)
     x_y = int(250 * scale)
-    
-    # X背景圆
-    draw.ellipse([x_pos - int(40 * scale), x_y - int(40 * scale),
-                  x_pos + int(40 * scale), x_y + int(40 * scale)], 
-                 fill=(255, 255, 255, 200))
-    
-    # X字符 (使用线条绘制)
-    line_width = max(1, int(8 * scale))
     x_offset = int(25 * scale)
-    draw.line([x_pos - x_offset, x_y - x_offset, 
-               x_pos + x_offset, x_y + x_offset], 
-              fill=cloud_color, width=line_width)
-    draw.line([x_pos + x_offset, x_y - x_offset, 
-               x_pos - x_offset, x_y + x_offset], 
-              fill=cloud_color, width=line_width)
+    x_circle = [x_pos - int(40 * scale), x_y - int(40 * scale),
+                x_pos + int(40 * scale), x_y + int(40 * scale)]
+    x_lines = [[x_pos - x_offset, x_y - x_offset, x_pos + x_offset, x_y + x_offset],
+               [x_pos + x_offset, x_y - x_offset, x_pos - x_offset, x_y + x_offset]]
     
     # 下载箭头
     arrow_x = int(400 * scale)
     arrow_y = int(500 * scale)
-    arrow_color = (52, 199, 89, 255)  # #34C759
-    
-    # 箭头杆
     arrow_width = int(40 * scale)
     arrow_height = int(120 * scale)
-    draw.rectangle([arrow_x - arrow_width//2, arrow_y,
-                    arrow_x + arrow_width//2, arrow_y + arrow_height],
-                   fill=arrow_color)
-    
-    # 箭头头部
+    shaft = [arrow_x - arrow_width//2, arrow_y,
+             arrow_x + arrow_width//2, arrow_y + arrow_height]
     arrow_head_size = int(60 * scale)
     arrow_head_y = arrow_y + arrow_height - int(20 * scale)
-    draw.polygon([
+    head = [
         (arrow_x, arrow_y + arrow_height + int(20 * scale)),  # 尖端
         (arrow_x - arrow_head_size, arrow_head_y),           # 左边
         (arrow_x + arrow_head_size, arrow_head_y)            # 右边
-    ], fill=arrow_color)
+    ]
     
     # 完成指示点
     dot_y = int(700 * scale)
     dot_radius = int(12 * scale)
-    for i, x_offset in enumerate([-30, 0, 30]):
+    dots = []
+    for x_offset in [-30, 0, 30]:
         dot_x = arrow_x + int(x_offset * scale)
+        dots.append([dot_x - dot_radius, dot_y - dot_radius,
+                     dot_x + dot_radius, dot_y + dot_radius])
+    
+    return {"cloud": cloud, "x_circle": x_circle, "x_lines": x_lines,
+            "x_width": max(1, int(8 * scale)), "shaft": shaft, "head": head, "dots": dots}
+
+def hinted_geometry(size):
+    """像素对齐的几何：边缘落在整像素上，笔画、箭头杆和圆点不会缩成0宽度"""
+    h = Hinter(size, HINT_OVERRIDES.get(size))
+    
+    cloud = [h.design_box(200, 300, 600, 450), h.design_box(150, 330, 300, 420),
+             h.design_box(350, 270, 500, 360), h.design_box(500, 320, 650, 410)]
+    
+    # X标识：背景圆按直径的奇偶居中，X的两笔从圆心出发
+    x_radius = h.length("x_radius", 40, 2)
+    x_left, x_right = h.span(600, 2 * x_radius)
+    x_top, x_bottom = h.span(250, 2 * x_radius)
+    center = ((x_left + x_right) / 2, (x_top + x_bottom) / 2)
+    arm = h.length("x_arm", 25)
+    cx, cy = h.vertex(*center)
+    x_lines = [[cx - arm, cy - arm, cx + arm, cy + arm],
+               [cx + arm, cy - arm, cx - arm, cy + arm]]
+    
+    # 下载箭头：杆的两侧边缘对齐像素，箭头头部以杆的中线为轴
+    shaft_width = h.length("shaft_width", 40)
+    shaft_left, shaft_right = h.span(400, shaft_width)
+    shaft_top = h.edge(500)
+    head_y = h.edge(600)
+    head_height = h.length("head_height", 40)
+    shaft_bottom = max(shaft_top + 1, head_y)
+    axis = (shaft_left + shaft_right) / 2
+    head_half = h.length("head_half", 60)
+    head = [h.vertex(axis, head_y + head_height),
+            h.vertex(axis - head_half, head_y),
+            h.vertex(axis + head_half, head_y)]
+    
+    # 完成指示点：直径至少1像素，间距至少比直径大1像素
+    diameter = max(1, 2 * h.length("dot_radius", 12, 0))
+    spacing = h.length("dot_spacing", 30, diameter + 1)
+    dot_top = h.start(700, diameter)
+    dots = []
+    for i in (-1, 0, 1):
+        left = round(axis + i * spacing - diameter / 2)
+        dots.append(h.box(left, dot_top, left + diameter, dot_top + diameter))
+    
+    return {"cloud": cloud, "x_circle": h.box(x_left, x_top, x_right, x_bottom), "x_lines": x_lines,
+            "x_width": h.length("x_stroke", 8), "shaft": h.box(shaft_left, shaft_top, shaft_right, shaft_bottom),
+            "head": head, "dots": dots}
+
+def app_icon_display_list(geometry, design_size):
+    """把一组几何转换为图标的显示列表"""
+    draw = DisplayList(design_size, background=(250, 250, 250, 255))
+    
+    # 绘制云朵
+    for box in geometry["cloud"]:
+        draw.ellipse(box, fill=CLOUD_COLOR)
+    
+    # X背景圆和X字符 (使用线条绘制)
+    draw.ellipse(geometry["x_circle"], fill=(255, 255, 255, 200))
+    for line in geometry["x_lines"]:
+        draw.line(line, fill=CLOUD_COLOR, width=geometry["x_width"])
+    
+    # 下载箭头：箭头杆和头部
+    draw.rectangle(geometry["shaft"], fill=ARROW_COLOR)
+    draw.polygon(geometry["head"], fill=ARROW_COLOR)
+    
+    # 完成指示点
+    for i, box in enumerate(geometry["dots"]):
         opacity = 255 if i == 1 else 180
-        dot_color = (52, 199, 89, opacity)
-        draw.ellipse([dot_x - dot_radius, dot_y - dot_radius,
-                      dot_x + dot_radius, dot_y + dot_radius],
-                     fill=dot_color)
+        draw.ellipse(box, fill=(52, 199, 89, opacity))
     
-    return img
+    return draw
+
+@lru_cache(maxsize=None)
+def design_display_list():
+    """1024设计坐标的显示列表（大尺寸共用，只构建一次）"""
+    return app_icon_display_list(design_geometry(DESIGN_SIZE), DESIGN_SIZE)
+
+@lru_cache(maxsize=None)
+def hinted_display_list(size):
+    """像素对齐的小尺寸显示列表（直接使用该尺寸的像素坐标）"""
+    return app_icon_display_list(hinted_geometry(size), size)
 
-def main():
+def create_app_icon(size, supersample=None, hinted=None):
+    """
+    创建指定尺寸的应用图标（supersample为超采样倍数，默认读取XGDD_SUPERSAMPLE；
+    hinted为是否使用像素对齐的几何，默认不超过 HINT_MAX_SIZE 的尺寸使用）
+    """
+    if hinted is None:
+        hinted = size <= HINT_MAX_SIZE
+    display_list = hinted_display_list(size) if hinted else design_display_list()
+    return display_list.render(size, supersample)
+
+def main(jobs=None):
     """主函数"""
     print("🎨 生成 X Google Drive Downloader 应用图标")
     print("=" * 50)
@@ -118,23 +194,24 @@ def main():
     
     success_count = 0
     
+    # 只绘制一次1024母版，较大的尺寸逐级缩小；小尺寸用像素对齐的几何直接绘制
+    pyramid = IconPyramid.from_renderer(create_app_icon, max(sizes))
+    pyramid.build([size for size in sizes if size > HINT_MAX_SIZE])
+    
+    # PNG编码在进程池中并行执行
+    tasks = []
     for size in sizes:
-        try:
-            # 生成图标
-            icon = create_app_icon(size)
-            
-            # 保存文件
-            filename = f"app_icon_{size}.png"
-            filepath = os.path.join(icon_dir, filename)
-            icon.save(filepath, "PNG")
-            
-            file_size = os.path.getsize(filepath)
-            size_kb = file_size / 1024
-            print(f"  ✅ {size}x{size} -> {filename} ({size_kb:.1f}KB)")
+        filename = f"app_icon_{size}.png"
+        filepath = os.path.join(icon_dir, filename)
+        image = create_app_icon(size) if size <= HINT_MAX_SIZE else pyramid.get(size)
+        tasks.append(ExportTask(filename, save_png, (image, filepath), weight=size * size))
+    
+    for size, result in zip(sizes, run_exports(tasks, jobs)):
+        if result.ok:
+            print(f"  ✅ {size}x{size} -> {result.label} ({result.value.describe()})")
             success_count += 1
-            
-        except Exception as e:
-            print(f"  ❌ 生成 {size}x{size} 失败: {e}")
+        else:
+            print(f"  ❌ 生成 {size}x{size} 失败: {result.error}")
     
     print("")
     if success_count == len(sizes):
@@ -155,4 +232,9 @@ def main():
         print(f"⚠️ 部分图标生成失败 ({success_count}/{len(sizes)})")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="生成 X Google Drive Downloader 应用图标")
+    add_jobs_argument(parser)
+    add_png_mode_argument(parser)
+    args = parser.parse_args()
+    set_png_mode(args.png_mode)
+    main(args.jobs)
\ No newline at end of file
@@ -4,43 +4,56 @@
 """
 
 try:
-    from PIL import Image, ImageDraw
+    import PIL  # noqa: F401  检查依赖是否已安装
+    import numpy  # noqa: F401
+    import argparse
     import os
+    import sys
 except ImportError:
-    print("❌ 需要安装 PIL 库")
-    print("运行: pip3 install Pillow")
+    print("❌ 需要安装 PIL 和 NumPy 库")
+    print("运行: pip3 install Pillow numpy")
     exit(1)
 
-def create_icon_from_source(source_path, size):
-    """从源图标创建指定尺寸的应用图标"""
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+from export_scheduler import ExportTask, add_jobs_argument, run_exports
+from icon_containers import write_containers
+from linear_light import LinearPyramid, background, over, to_image
+from png_stream import add_png_mode_argument, set_png_mode, write_png
+from resample import add_kernel_argument
+
+# 小尺寸图标的白色背景（线性光预乘向量，所有尺寸共用）
+WHITE_BACKGROUND = background((255, 255, 255))
+
+def create_icon_from_source(source, size):
+    """从源图标（文件路径或LinearPyramid）创建指定尺寸的应用图标"""
     
     try:
-        # 打开源图标文件
-        source_img = Image.open(source_path).convert('RGBA')
-        
-        # 调整尺寸（保持高质量）
-        resized_img = source_img.resize((size, size), Image.Resampling.LANCZOS)
-        
-        # 如果需要，可以在这里添加圆角处理
-        # macOS会自动处理圆角，所以保持原始方形
-        
-        # 确保没有透明背景（如果需要）
-        if size >= 256:  # 大尺寸图标保持透明度
-            final_img = resized_img
-        else:  # 小尺寸图标可能需要白色背景以提高可见性
-            background = Image.new('RGBA', (size, size), (255, 255, 255, 255))
-            final_img = Image.alpha_composite(background, resized_img)
-        
-        # 转换为RGB（PNG格式不需要alpha通道用于macOS图标）
-        final_img = final_img.convert('RGB')
-        
-        return final_img
+        # 源图标只解码一次，由金字塔在线性光预乘空间中逐级缩小（保持高质量）
+        pyramid = source if isinstance(source, LinearPyramid) else LinearPyramid.from_file(source, size)
+        return finalize_icon(pyramid.pixels(size), size)
         
     except Exception as e:
         print(f"处理图标时出错: {e}")
         return None
 
-def main():
+def finalize_icon(pixels, size):
+    """对已缩放的图标（线性光预乘浮点数组）做背景处理，并转换为8位RGB图像"""
+    
+    # 如果需要，可以在这里添加圆角处理
+    # macOS会自动处理圆角，所以保持原始方形
+    
+    # 确保没有透明背景（如果需要）
+    if size < 256:  # 小尺寸图标可能需要白色背景以提高可见性
+        pixels = over(pixels, WHITE_BACKGROUND)
+    
+    # 转换为RGB（PNG格式不需要alpha通道用于macOS图标）
+    return to_image(pixels, 'RGB')
+
+def export_icon(pixels, size, filepath):
+    """在工作进程中完成后处理并保存，返回EncodeStats"""
+    return write_png(finalize_icon(pixels, size), filepath)
+
+def main(jobs=None, containers=False, kernel="auto"):
     """主函数"""
     print("🎨 提取并转换用户提供的图标")
     print("=" * 50)
@@ -80,26 +93,35 @@ def main():
     
     success_count = 0
     
+    try:
+        pyramid = LinearPyramid.from_file(source_path, max(sizes), kernel)
+        pyramid.build(sizes)
+    except Exception as e:
+        print(f"❌ 无法读取源图标: {e}")
+        return False
+    
+    # 后处理和PNG编码在进程池中并行执行
+    tasks = []
     for size in sizes:
-        try:
-            # 生成图标
-            icon = create_icon_from_source(source_path, size)
-            
-            if icon is None:
-                continue
-            
-            # 保存文件
-            filename = f"app_icon_{size}.png"
-            filepath = os.path.join(icon_dir, filename)
-            icon.save(filepath, "PNG", quality=95)
-            
-            file_size = os.path.getsize(filepath)
-            size_kb = file_size / 1024
-            print(f"  ✅ {size}x{size} -> {filename} ({size_kb:.1f}KB)")
+        filename = f"app_icon_{size}.png"
+        filepath = os.path.join(icon_dir, filename)
+        tasks.append(ExportTask(filename, export_icon, (pyramid.pixels(size), size, filepath), weight=size * size))
+    
+    for size, result in zip(sizes, run_exports(tasks, jobs)):
+        if result.ok:
+            print(f"  ✅ {size}x{size} -> {result.label} ({result.value.describe()})")
             success_count += 1
-            
+        else:
+            print(f"  ❌ 生成 {size}x{size} 失败: {result.error}")
+    
+    if containers:
+        # 复用同一个金字塔生成 .icns / .ico / hicolor，不重新解码源图标
+        try:
+            for fmt, paths in write_containers(pyramid, jobs=jobs).items():
+                print(f"  ✅ {fmt} -> {paths[0]}" + (f" 等 {len(paths)} 个文件" if len(paths) > 1 else ""))
         except Exception as e:
-            print(f"  ❌ 生成 {size}x{size} 失败: {e}")
+            print(f"  ❌ 生成桌面图标容器失败: {e}")
+            success_count = 0
     
     print("")
     if success_count == len(sizes):
@@ -109,7 +131,7 @@ def main():
         print("📋 转换特点:")
         print("  🔵 保持原图标的专业设计")
         print("  📱 适配macOS应用图标规范")
-        print("  ⚡ 高质量Lanczos算法调整尺寸")
+        print(f"  ⚡ 线性光预乘空间中缩放（卷积核: {kernel}，透明边缘无暗边）")
         print("  🎯 小尺寸图标优化可见性")
         print("")
         print("下一步:")
@@ -122,7 +144,15 @@ def main():
         return False
 
 if __name__ == "__main__":
-    success = main()
+    parser = argparse.ArgumentParser(description="提取并转换用户提供的图标")
+    add_jobs_argument(parser)
+    add_kernel_argument(parser)
+    add_png_mode_argument(parser)
+    parser.add_argument("--containers", action="store_true",
+                        help="同时生成 .icns / .ico / hicolor 桌面图标（Windows、Linux 构建使用）")
+    args = parser.parse_args()
+    set_png_mode(args.png_mode)
+    success = main(args.jobs, args.containers, args.kernel)
     if success:
         print("\n🚀 准备构建应用以查看新图标效果...")
     else:
@@ -52,20 +52,35 @@ declare -a sizes=("16" "32" "64" "128" "256" "512" "1024")
 
 echo "📐 生成不同尺寸的图标..."
 
+# 渲染缓存（需要python3，键包含SVG内容、尺寸、转换工具版本和本脚本内容）
+RENDER_CACHE="scripts/render_cache.py"
+USE_CACHE=0
+if command -v python3 &> /dev/null && [ -f "$RENDER_CACHE" ]; then
+    USE_CACHE=1
+fi
+
 for size in "${sizes[@]}"; do
     output_file="$ICON_DIR/app_icon_${size}.png"
     
-    case $CONVERTER in
-        "rsvg-convert")
-            rsvg-convert -w $size -h $size "$LOGO_SVG" -o "$output_file"
-            ;;
-        "inkscape")
-            inkscape "$LOGO_SVG" --export-png="$output_file" -w $size -h $size
-            ;;
-        "imagemagick")
-            convert -background none -size ${size}x${size} "$LOGO_SVG" "$output_file"
-            ;;
-    esac
+    if [ $USE_CACHE -eq 1 ] && python3 "$RENDER_CACHE" fetch "$LOGO_SVG" "$size" "$CONVERTER" "$output_file" --code "$0" 2>/dev/null; then
+        echo "  ♻️ ${size}x${size} 使用缓存"
+    else
+        case $CONVERTER in
+            "rsvg-convert")
+                rsvg-convert -w $size -h $size "$LOGO_SVG" -o "$output_file"
+                ;;
+            "inkscape")
+                inkscape "$LOGO_SVG" --export-png="$output_file" -w $size -h $size
+                ;;
+            "imagemagick")
+                convert -background none -size ${size}x${size} "$LOGO_SVG" "$output_file"
+                ;;
+        esac
+        
+        if [ $USE_CACHE -eq 1 ] && [ -f "$output_file" ]; then
+            python3 "$RENDER_CACHE" store "$LOGO_SVG" "$size" "$CONVERTER" "$output_file" --code "$0" || true
+        fi
+    fi
     
     if [ -f "$output_file" ]; then
         file_size=$(du -h "$output_file" | cut -f1)
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+资源管线基准测试
+固定工作负载（1x/4x超采样图标集、4096母版、20种语言的截图批量、各SVG转换工具）直接调用各生成脚本的入口函数，
+在临时工作区中写出真实的输出文件；每个负载在独立的新进程中串行执行，记录墙钟时间、CPU时间（含子进程）、峰值内存，
+以及 profiling.span 记录的 render / resize / encode / copy / subprocess 等各阶段耗时；结果输出为JSON，
+可以与保存的基线比较，超过阈值的变慢或内存增长记为回归
+"""
+
+import argparse
+import fnmatch
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from dataclasses import dataclass, field
+from typing import Callable
+
+try:
+    import resource
+except ImportError:  # Windows没有resource模块，不记录峰值内存
+    resource = None
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 根目录下的生成脚本（user_provided_icon.py 等）也需要能导入
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
+
+BASELINE_PATH = os.path.join(".xgdd-assets", "bench_baseline.json")
+REPORT_VERSION = 2
+# 比基线慢（或峰值内存高）超过这个比例记为回归
+DEFAULT_THRESHOLD = 0.10
+# 耗时太短的负载计时抖动大，低于这个秒数的差异不判定为回归
+MIN_REGRESSION_SECONDS = 0.05
+
+ICON_SIZES = [16, 32, 64, 128, 256, 512, 1024]
+SCREENSHOT_SCENE = "assets/scenes/realistic_main.json"
+SCREENSHOT_LOCALES = 20
+# 入口函数直接写入、不会自己创建的输出目录
+OUTPUT_DIRS = ["macos/Runner/Assets.xcassets/AppIcon.appiconset", "screenshots", "generated_icons"]
+
+
+def _cpu_time():
+    """本进程和已结束子进程的用户态+内核态CPU时间"""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def _peak_rss_mb():
+    """本进程和子进程中较大的峰值常驻内存（MB）"""
+    if resource is None:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # Linux 单位为KB，macOS 为字节
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _check(result, entry):
+    """入口函数返回False或非0退出码时视为失败"""
+    if result is False or (type(result) is int and result != 0):
+        raise RuntimeError(f"{entry} 执行失败")
+
+
+# ---------------------------------------------------------------- 工作负载
+# 每个负载调用生产环境的入口函数；入口函数使用相对仓库根目录的路径，
+# 因此在临时工作区中运行：输入从仓库链接过来，输出写在工作区里
+
+@dataclass(frozen=True)
+class Workload:
+    run: Callable[[], None]
+    # 从仓库带入工作区的输入（目录或文件）
+    inputs: tuple = ("assets",)
+    # 负载进程的环境变量（如超采样倍数）
+    env: dict = field(default_factory=dict)
+    # 依赖的外部SVG转换工具，未安装时跳过
+    converter: str = None
+
+
+def _icon_set():
+    # 与构建图的 user_icon + app_icons 节点相同：生成1024源图标，再缩放、后处理、编码全部尺寸
+    import extract_and_convert_icon
+    import user_provided_icon
+    user_provided_icon.main()
+    _check(extract_and_convert_icon.main(), "extract_and_convert_icon.main")
+
+
+def _showcase_icon_set():
+    from create_professional_icon import generate_all_icon_sizes
+    _check(generate_all_icon_sizes(), "generate_all_icon_sizes")
+
+
+def _master_4096():
+    import user_provided_icon
+    user_provided_icon.main(4096, os.path.join("generated_icons", "master_4096.png"))
+
+
+def _screenshot_locales():
+    """同一场景 × 20种语言（语言由场景自带的字符串表复制而来），经由 scene_render 的批量渲染入口"""
+    import scene_render
+
+    with open(SCREENSHOT_SCENE, encoding="utf-8") as f:
+        source = json.load(f)
+    strings = list(source["strings"].values())
+    source["strings"] = {f"bench-{i:02d}": strings[i % len(strings)] for i in range(SCREENSHOT_LOCALES)}
+    source["default_locale"] = "bench-00"
+    source["variants"] = {}
+    with open("bench_locales.json", "w", encoding="utf-8") as f:
+        json.dump(source, f, ensure_ascii=False)
+    theme = next(iter(source["themes"]))
+    _check(scene_render.main(["bench_locales.json", "--themes", theme, "--scales", "1",
+                              "--locales", *source["strings"], "-o", "variants"]), "scene_render.main")
+
+
+def _screenshots_realistic():
+    from create_realistic_screenshots import main
+    _check(main(scales=(1, 2)), "create_realistic_screenshots.main")
+
+
+def _svg_builtin():
+    import svg_to_png
+    for size in ICON_SIZES:
+        _check(svg_to_png.main(output_path=os.path.join("generated_icons", f"icon_{size}.png"), size=size),
+               "svg_to_png.main")
+
+
+def _svg_converter(converter):
+    def run():
+        # 不使用渲染缓存，测量转换工具本身
+        from generate_icons import main
+        _check(main(use_cache=False, converter=converter), "generate_icons.main")
+    return run
+
+
+WORKLOADS = {
+    "icon_set_ss1": Workload(_icon_set, env={"XGDD_SUPERSAMPLE": "1"}),
+    "icon_set_ss4": Workload(_icon_set, env={"XGDD_SUPERSAMPLE": "4"}),
+    "showcase_icon_set": Workload(_showcase_icon_set),
+    "master_4096": Workload(_master_4096),
+    "screenshots_20_locales": Workload(_screenshot_locales, inputs=("assets", "screenshots/app_icon_new.png")),
+    "screenshots_realistic": Workload(_screenshots_realistic, inputs=("assets", "screenshots/app_icon_new.png")),
+    "svg_builtin": Workload(_svg_builtin),
+    **{f"svg_{name}": Workload(_svg_converter(name), converter=name)
+       for name in ("cairosvg", "librsvg", "inkscape", "imagemagick")},
+}
+
+
+def _prepare_workspace(root, inputs):
+    """
+    按仓库结构准备临时工作区并创建入口函数写入的输出目录；
+    输入目录用符号链接（不支持时复制），输入文件复制（避免输出覆盖时写穿链接改动仓库）
+    """
+    for relative in inputs:
+        source, target = os.path.join(REPO_ROOT, relative), os.path.join(root, relative)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if not os.path.isdir(source):
+            shutil.copy2(source, target)
+            continue
+        try:
+            os.symlink(source, target, target_is_directory=True)
+        except OSError:
+            shutil.copytree(source, target)
+    for directory in OUTPUT_DIRS:
+        os.makedirs(os.path.join(root, directory), exist_ok=True)
+
+
+def _stage_report(trace_path):
+    """按 profiling.span 的类别汇总耗时和调用次数（并行执行时累计值可能超过墙钟时间）"""
+    with open(trace_path, encoding="utf-8") as f:
+        events = json.load(f)["traceEvents"]
+    stages = {}
+    for event in events:
+        if event.get("ph") == "X":
+            entry = stages.setdefault(event["cat"], {"wall": 0.0, "calls": 0})
+            entry["wall"] += event["dur"] / 1e6
+            entry["calls"] += 1
+    return {name: {"wall": round(entry["wall"], 6), "calls": entry["calls"]} for name, entry in stages.items()}
+
+
+def run_workload(name):
+    """在当前（新启动的）进程中执行一个工作负载，返回结果字典"""
+    workload = WORKLOADS[name]
+    if workload.converter:
+        from converter_tools import tool_info
+        if tool_info(workload.converter) is None:
+            return {"name": name, "skipped": f"未安装 {workload.converter}"}
+    # 必须在导入生成脚本之前设置（超采样倍数等在导入时读取）
+    os.environ.update(workload.env)
+    import profiling
+
+    with tempfile.TemporaryDirectory(prefix="xgdd-bench-") as root:
+        workspace = os.path.join(root, "workspace")
+        _prepare_workspace(workspace, workload.inputs)
+        trace_path = os.path.join(root, "trace.json")
+        # 阶段耗时来自各模块的 profiling.span，导出进程池的工作进程通过环境变量一起记录
+        profiling.enable(trace_path)
+        os.chdir(workspace)
+        wall, cpu = time.perf_counter(), _cpu_time()
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            workload.run()
+        wall, cpu = time.perf_counter() - wall, _cpu_time() - cpu
+        os.chdir(REPO_ROOT)
+        stages = _stage_report(trace_path) if profiling.export_trace() else {}
+    return {"name": name, "wall": round(wall, 6), "cpu": round(cpu, 6),
+            "peak_rss_mb": _peak_rss_mb(), "stages": stages}
+
+
+def _run_isolated(name):
+    """每个负载使用新的spawn进程，峰值内存和各种缓存互不影响"""
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        try:
+            return pool.submit(run_workload, name).result()
+        except Exception as e:
+            return {"name": name, "error": f"{type(e).__name__}: {e}"}
+
+
+def run_benchmarks(names, repeat=1):
+    """执行负载（每个重复repeat次，取墙钟时间最短的一次），返回报告字典"""
+    results = []
+    for name in names:
+        runs = [_run_isolated(name) for _ in range(repeat)]
+        timed = [run for run in runs if "wall" in run]
+        results.append(min(timed, key=lambda run: run["wall"]) if timed else runs[0])
+    return {
+        "version": REPORT_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "repeat": repeat,
+        "workloads": results,
+    }
+
+
+def compare_reports(report, baseline, threshold=DEFAULT_THRESHOLD):
+    """与基线比较，返回 [(负载, 指标, 基线值, 当前值)] 形式的回归列表"""
+    previous = {item["name"]: item for item in baseline.get("workloads", [])}
+    regressions = []
+    for item in report["workloads"]:
+        old = previous.get(item["name"])
+        if not old or "wall" not in item or "wall" not in old:
+            continue
+        if (item["wall"] > old["wall"] * (1 + threshold)
+                and item["wall"] - old["wall"] > MIN_REGRESSION_SECONDS):
+            regressions.append((item["name"], "wall", old["wall"], item["wall"]))
+        if item.get("peak_rss_mb") and old.get("peak_rss_mb") \
+                and item["peak_rss_mb"] > old["peak_rss_mb"] * (1 + threshold):
+            regressions.append((item["name"], "peak_rss_mb", old["peak_rss_mb"], item["peak_rss_mb"]))
+    return regressions
+
+
+def _describe(item, old=None):
+    if "skipped" in item:
+        return f"⏭️ {item['name']}: 跳过（{item['skipped']}）"
+    if "error" in item:
+        return f"❌ {item['name']}: {item['error']}"
+    change = ""
+    if old and "wall" in old:
+        change = f" ({(item['wall'] / old['wall'] - 1) * 100:+.0f}%)"
+    stages = ", ".join(f"{stage} {entry['wall'] * 1000:.0f}ms"
+                       for stage, entry in sorted(item["stages"].items(), key=lambda kv: -kv[1]["wall"]))
+    rss = f", 峰值内存 {item['peak_rss_mb']}MB" if item.get("peak_rss_mb") is not None else ""
+    return (f"⏱️ {item['name']}: {item['wall'] * 1000:.0f}ms{change}, CPU {item['cpu'] * 1000:.0f}ms{rss}\n"
+            f"     {stages}")
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="资源管线基准测试")
+    parser.add_argument("workloads", nargs="*", help="只运行名称匹配的负载（支持通配符，默认全部）")
+    parser.add_argument("--list", action="store_true", help="列出全部负载")
+    parser.add_argument("--repeat", type=int, default=1, help="每个负载重复次数（取最快的一次）")
+    parser.add_argument("--json", help="把结果写入JSON文件")
+    parser.add_argument("--baseline", nargs="?", const=BASELINE_PATH,
+                        help=f"与基线比较（默认 {BASELINE_PATH}）")
+    parser.add_argument("--save-baseline", nargs="?", const=BASELINE_PATH,
+                        help=f"把结果保存为基线（默认 {BASELINE_PATH}）")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="判定回归的变化比例（默认0.10）")
+    args = parser.parse_args(argv)
+
+    patterns = args.workloads or ["*"]
+    names = [name for name in WORKLOADS if any(fnmatch.fnmatch(name, p) for p in patterns)]
+    if args.list:
+        for name in WORKLOADS:
+            print(f"  {name}")
+        return 0
+    if not names:
+        print("❌ 没有匹配的负载")
+        return 1
+
+    os.chdir(REPO_ROOT)
+    baseline = None
+    if args.baseline:
+        try:
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"❌ 无法读取基线 {args.baseline}: {e}")
+            return 1
+
+    print(f"🏁 运行 {len(names)} 个基准负载（每个重复 {args.repeat} 次）...")
+    report = run_benchmarks(names, args.repeat)
+    previous = {item["name"]: item for item in (baseline or {}).get("workloads", [])}
+    for item in report["workloads"]:
+        print(f"  {_describe(item, previous.get(item['name']))}")
+
+    for path in filter(None, (args.json, args.save_baseline)):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 结果已保存: {path}")
+
+    failed = any("error" in item for item in report["workloads"])
+    if baseline is not None:
+        regressions = compare_reports(report, baseline, args.threshold)
+        print("")
+        if regressions:
+            print(f"⚠️ 发现 {len(regressions)} 项回归（阈值 {args.threshold:.0%}）:")
+            for name, metric, old, new in regressions:
+                print(f"  📉 {name} {metric}: {old} -> {new}")
+            return 1
+        print("✅ 与基线相比没有回归")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+资源构建图
+把各个资源生成脚本声明为带输入/输出的节点，按 mtime+哈希 判断是否过期，
+只重建受影响的节点，并按拓扑顺序并行执行
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+from export_scheduler import add_jobs_argument, resolve_jobs
+from profiling import add_trace_arguments, enable_from_args, export_trace, span, summarize
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATE_PATH = os.path.join(".xgdd-assets", "build_state.json")
+
+APPICON_DIR = "macos/Runner/Assets.xcassets/AppIcon.appiconset"
+ICON_SIZES = [16, 32, 64, 128, 256, 512, 1024]
+PYRAMID_MODULES = ["scripts/icon_pyramid.py", "scripts/linear_light.py", "scripts/resample.py",
+                   "scripts/export_scheduler.py", "scripts/png_stream.py"]
+
+
+@dataclass
+class Node:
+    """构建图中的一个节点：在仓库根目录执行command，由inputs生成outputs"""
+    name: str
+    command: list
+    inputs: list = field(default_factory=list)
+    outputs: list = field(default_factory=list)
+
+
+ASSET_NODES = [
+    Node("user_icon", [sys.executable, "user_provided_icon.py"],
+         inputs=["user_provided_icon.py", "scripts/display_list.py", "scripts/supersample.py",
+                 "scripts/png_stream.py"],
+         outputs=["user_icon.png"]),
+    Node("app_icons", [sys.executable, "extract_and_convert_icon.py"],
+         inputs=["extract_and_convert_icon.py", "user_icon.png", *PYRAMID_MODULES],
+         outputs=[f"{APPICON_DIR}/app_icon_{size}.png" for size in ICON_SIZES]),
+    Node("desktop_icons", [sys.executable, "scripts/icon_containers.py"],
+         inputs=["scripts/icon_containers.py", "user_icon.png", *PYRAMID_MODULES],
+         outputs=["generated_icons/AppIcon.icns", "windows/runner/resources/app_icon.ico",
+                  *[f"linux/icons/hicolor/{size}x{size}/apps/com.example.gdrive_downloader_flutter.png"
+                    for size in (16, 22, 24, 32, 48, 64, 128, 256, 512)]]),
+    Node("showcase_icon", [sys.executable, "scripts/create_professional_icon.py", "--showcase-only"],
+         inputs=["scripts/create_professional_icon.py", "scripts/fill_engine.py",
+                 "scripts/supersample.py", *PYRAMID_MODULES],
+         outputs=["screenshots/app_icon_new.png"]),
+    Node("realistic_screenshots", [sys.executable, "scripts/create_realistic_screenshots.py"],
+         inputs=["scripts/create_realistic_screenshots.py", "scripts/png_stream.py", "scripts/font_registry.py",
+                 "scripts/text_layout.py", "scripts/scene_render.py", "scripts/layer_cache.py",
+                 "scripts/export_scheduler.py",
+                 "assets/scenes/realistic_main.json", "assets/scenes/realistic_features.json",
+                 "screenshots/app_icon_new.png"],
+         outputs=["screenshots/01_main_interface_fixed.png",
+                  "screenshots/02_features_fixed.png",
+                  "screenshots/03_app_icon_professional.png"]),
+    Node("demo_screenshots", [sys.executable, "scripts/generate_demo_screenshots.py"],
+         inputs=["scripts/generate_demo_screenshots.py", "scripts/png_stream.py", "scripts/font_registry.py",
+                 "scripts/text_layout.py", "scripts/scene_render.py", "scripts/layer_cache.py",
+                 "scripts/export_scheduler.py",
+                 "assets/scenes/demo_main.json", "assets/scenes/demo_features.json",
+                 f"{APPICON_DIR}/app_icon_1024.png", "user_icon.png"],
+         outputs=["screenshots/01_main_interface.png",
+                  "screenshots/02_features.png",
+                  "screenshots/03_app_icon.png",
+                  "screenshots/04_icon_design.png"]),
+    Node("improved_base_icon", [sys.executable, "scripts/svg_to_png.py"],
+         inputs=["scripts/svg_to_png.py", "scripts/svg_raster.py", "scripts/display_list.py", "scripts/supersample.py",
+                 "scripts/png_stream.py", "scripts/font_registry.py",
+                 "assets/x-google-drive-downloader-concrete.svg"],
+         outputs=["generated_icons/base_1024_improved.png"]),
+]
+
+
+def fingerprint(path, previous=None):
+    """返回 [mtime_ns, 大小, sha256]；mtime和大小未变时沿用之前的哈希"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    if previous and previous[0] == stat.st_mtime_ns and previous[1] == stat.st_size:
+        return previous
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return [stat.st_mtime_ns, stat.st_size, digest.hexdigest()]
+
+
+class BuildGraph:
+    """由节点的输入输出关系推导依赖，执行增量构建"""
+
+    def __init__(self, nodes, root=REPO_ROOT, state_path=STATE_PATH):
+        self.nodes = {node.name: node for node in nodes}
+        self.root = root
+        self.state_path = os.path.join(root, state_path)
+
+        self.producers = {}
+        for node in nodes:
+            for output in node.outputs:
+                if output in self.producers:
+                    raise ValueError(f"输出 {output} 同时由 {self.producers[output]} 和 {node.name} 生成")
+                self.producers[output] = node.name
+
+        self.deps = {
+            node.name: sorted({self.producers[i] for i in node.inputs if i in self.producers} - {node.name})
+            for node in nodes
+        }
+        self.order = self._topological_order()
+        self.state = self._load_state()
+
+    def _topological_order(self):
+        order, visiting, done = [], set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"构建图存在循环依赖: {name}")
+            visiting.add(name)
+            for dep in self.deps[name]:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in self.nodes:
+            visit(name)
+        return order
+
+    def _load_state(self):
+        try:
+            with open(self.state_path) as f:
+                self._saved = f.read()
+            return json.loads(self._saved)
+        except (OSError, ValueError):
+            self._saved = None
+            return {}
+
+    def _save_state(self):
+        text = json.dumps(self.state, indent=1)
+        # 全部命中时状态不变，不重写文件
+        if text == self._saved:
+            return
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(text)
+        os.replace(tmp_path, self.state_path)
+        self._saved = text
+
+    def _path(self, relative):
+        return os.path.join(self.root, relative)
+
+    def _snapshot(self, paths, previous):
+        return {path: fingerprint(self._path(path), previous.get(path)) for path in paths}
+
+    def stale_reason(self, name):
+        """返回节点需要重建的原因，已是最新时返回None"""
+        node = self.nodes[name]
+        record = self.state.get(name)
+        if not record:
+            return "从未构建"
+        if record.get("command") != node.command[1:]:
+            return "命令已变化"
+
+        for path, current in self._snapshot(node.inputs, record["inputs"]).items():
+            if current is None:
+                return f"缺少输入 {path}"
+            recorded = record["inputs"].get(path)
+            if not recorded or recorded[2] != current[2]:
+                return f"输入已变化 {path}"
+            record["inputs"][path] = current
+
+        for path, current in self._snapshot(node.outputs, record["outputs"]).items():
+            if current is None:
+                return f"缺少输出 {path}"
+            recorded = record["outputs"].get(path)
+            if not recorded or recorded[2] != current[2]:
+                return f"输出被修改 {path}"
+            record["outputs"][path] = current
+        return None
+
+    def _record(self, name):
+        node = self.nodes[name]
+        previous = self.state.get(name, {})
+        self.state[name] = {
+            "command": node.command[1:],
+            "inputs": self._snapshot(node.inputs, previous.get("inputs", {})),
+            "outputs": self._snapshot(node.outputs, previous.get("outputs", {})),
+        }
+
+    def _selected(self, targets):
+        if not targets:
+            return list(self.order)
+        unknown = [t for t in targets if t not in self.nodes]
+        if unknown:
+            raise ValueError(f"未知的构建目标: {', '.join(unknown)}")
+        wanted = set()
+
+        def collect(name):
+            if name not in wanted:
+                wanted.add(name)
+                for dep in self.deps[name]:
+                    collect(dep)
+
+        for target in targets:
+            collect(target)
+        return [name for name in self.order if name in wanted]
+
+    def _run_node(self, name, optimize=False):
+        node = self.nodes[name]
+        start = time.perf_counter()
+        with span(name, "subprocess"):
+            result = subprocess.run(node.command, cwd=self.root, capture_output=True, text=True)
+        elapsed = time.perf_counter() - start
+        missing = [path for path in node.outputs if not os.path.exists(self._path(path))]
+        if result.returncode != 0 or missing:
+            detail = result.stderr.strip().splitlines()[-1:] if result.stderr.strip() else []
+            if missing:
+                detail.append(f"未生成: {', '.join(missing)}")
+            return False, elapsed, "; ".join(detail) or f"退出码 {result.returncode}"
+        if optimize:
+            # 在记录输出哈希之前压缩，避免优化后的文件被判定为"输出被修改"
+            from png_optimize import optimize_file
+            for path in node.outputs:
+                if path.endswith(".png"):
+                    with span(path, "optimize"):
+                        optimize_file(self._path(path))
+            elapsed = time.perf_counter() - start
+        return True, elapsed, None
+
+    def build(self, targets=None, jobs=None, force=False, dry_run=False, optimize=False):
+        """增量构建，返回是否全部成功；optimize为True时对重建出的PNG做无损压缩"""
+        selected = self._selected(targets)
+        status = {}
+
+        if dry_run:
+            for name in selected:
+                reason = "强制重建" if force else self.stale_reason(name)
+                if reason is None and any(status[dep] for dep in self.deps[name]):
+                    reason = "上游需要重建"
+                status[name] = reason
+                print(f"  {'🔄' if reason else '✅'} {name}: {reason or '已是最新'}")
+            return True
+
+        pending = set(selected)
+        running = {}
+        workers = resolve_jobs(jobs, len(selected))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while pending or running:
+                for name in [n for n in self.order if n in pending]:
+                    deps = self.deps[name]
+                    if any(d in pending or d in running.values() for d in deps):
+                        continue
+                    pending.discard(name)
+                    if any(status[d] == "failed" for d in deps):
+                        status[name] = "failed"
+                        print(f"  ⏭️ {name}: 上游失败，跳过")
+                        continue
+                    reason = "强制重建" if force else self.stale_reason(name)
+                    if reason is None:
+                        status[name] = "fresh"
+                        print(f"  ✅ {name}: 已是最新")
+                        continue
+                    print(f"  🔄 {name}: {reason}")
+                    running[pool.submit(self._run_node, name, optimize)] = name
+
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    ok, elapsed, error = future.result()
+                    if ok:
+                        self._record(name)
+                        status[name] = "built"
+                        print(f"  ✅ {name}: 重建完成 ({elapsed:.2f}s)")
+                    else:
+                        status[name] = "failed"
+                        print(f"  ❌ {name}: 失败 ({error})")
+
+        self._save_state()
+        return all(status[name] != "failed" for name in selected)
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="增量构建全部资源（图标、截图）")
+    parser.add_argument("targets", nargs="*", help="只构建指定节点及其上游（默认全部）")
+    add_jobs_argument(parser)
+    parser.add_argument("--force", action="store_true", help="忽略缓存状态，全部重建")
+    parser.add_argument("--dry-run", action="store_true", help="只显示需要重建的节点")
+    parser.add_argument("--list", action="store_true", help="列出全部节点及依赖")
+    parser.add_argument("--optimize", action="store_true", help="重建后对输出的PNG做无损压缩")
+    add_trace_arguments(parser)
+    args = parser.parse_args(argv)
+    enable_from_args(args)
+
+    graph = BuildGraph(ASSET_NODES)
+    if args.list:
+        for name in graph.order:
+            deps = ", ".join(graph.deps[name]) or "-"
+            print(f"  {name} <- {deps}")
+        return 0
+
+    print("🏗️ 增量构建资源...")
+    try:
+        ok = graph.build(args.targets, args.jobs, args.force, args.dry_run, args.optimize)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    print("🎉 资源构建完成！" if ok else "⚠️ 部分节点构建失败，请检查错误信息")
+    trace_path = export_trace()
+    if trace_path:
+        totals = ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in summarize(trace_path))
+        print(f"📊 性能追踪: {trace_path}（{totals}）")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
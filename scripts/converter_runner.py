@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+SVG转换工具并发执行器
+对 (SVG, 尺寸) 去重后以有限并发启动外部转换进程；Inkscape使用批处理模式一次导出多个尺寸
+"""
+
+import os
+import re
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from converter_tools import converter_version
+from export_scheduler import ExportResult, resolve_jobs
+from profiling import span
+from render_cache import link_file, render_key
+
+
+def inkscape_major_version():
+    """返回Inkscape主版本号（0.92的命令行参数与1.x不兼容），版本号来自转换工具缓存"""
+    match = re.search(r"Inkscape (\d+)\.", converter_version("inkscape"))
+    return int(match.group(1)) if match else 1
+
+
+def build_command(converter, svg_path, size, output_path):
+    """生成单个尺寸的转换命令"""
+    if converter == "librsvg":
+        return ["rsvg-convert", "-w", str(size), "-h", str(size), svg_path, "-o", output_path]
+    if converter == "inkscape":
+        if inkscape_major_version() < 1:
+            return ["inkscape", f"--export-png={output_path}",
+                    f"--export-width={size}", f"--export-height={size}", svg_path]
+        return ["inkscape", "--export-type=png", f"--export-filename={output_path}",
+                f"--export-width={size}", f"--export-height={size}", svg_path]
+    if converter == "imagemagick":
+        return ["convert", "-background", "transparent", svg_path,
+                "-resize", f"{size}x{size}", output_path]
+    raise ValueError(f"未知的转换工具: {converter}")
+
+
+def _remove_output(output_path):
+    """删除旧的输出文件：它可能是指向缓存对象的硬链接，转换工具就地写入会改写缓存"""
+    if os.path.lexists(output_path):
+        os.unlink(output_path)
+
+
+def convert(converter, svg_path, size, output_path):
+    """转换单个尺寸，失败时抛出异常，成功返回输出路径"""
+    _remove_output(output_path)
+    with span(f"{converter} {size}", "subprocess" if converter != "cairosvg" else "render"):
+        if converter == "cairosvg":
+            import cairosvg
+            cairosvg.svg2png(url=svg_path, write_to=output_path,
+                             output_width=size, output_height=size)
+        else:
+            subprocess.run(build_command(converter, svg_path, size, output_path),
+                           check=True, capture_output=True)
+
+    if not os.path.exists(output_path):
+        raise FileNotFoundError(f"转换工具未生成文件: {output_path}")
+    return output_path
+
+
+def inkscape_batch(svg_path, exports):
+    """用一个Inkscape进程导出同一SVG的多个尺寸，exports为 [(尺寸, 输出路径)]"""
+    with span(f"inkscape x{len(exports)}", "subprocess"):
+        _inkscape_batch(svg_path, exports)
+
+
+def _inkscape_batch(svg_path, exports):
+    for _, output in exports:
+        _remove_output(output)
+    if inkscape_major_version() < 1:
+        # 0.92: --shell 模式，每行一条命令
+        script = "".join(
+            f'"{svg_path}" --export-png="{output}" --export-width={size} --export-height={size}\n'
+            for size, output in exports) + "quit\n"
+        subprocess.run(["inkscape", "--shell"], input=script, text=True,
+                       check=True, capture_output=True)
+    else:
+        # 1.x: 一次打开文件，用 --actions 连续导出
+        actions = "".join(
+            f"export-filename:{output};export-width:{size};export-height:{size};export-do;"
+            for size, output in exports)
+        subprocess.run(["inkscape", f"--actions={actions}", svg_path],
+                       check=True, capture_output=True)
+
+
+def run_conversions(jobs, converter, max_parallel=None, cache=None, code_version=""):
+    """
+    执行一批转换任务，jobs为 [(SVG路径, 尺寸, 输出路径)]
+    相同 (SVG, 尺寸) 只转换一次，其余输出直接复制；结果顺序与jobs一致
+    提供cache（RenderCache）时，命中的任务直接从缓存放置，不再启动转换工具
+    """
+    unique = {}
+    for svg_path, size, output_path in jobs:
+        unique.setdefault((os.path.abspath(svg_path), size), output_path)
+
+    cached = set()
+    keys = {}
+    if cache is not None:
+        version = converter_version(converter)
+        for key in list(unique):
+            keys[key] = render_key(key[0], key[1], converter, version, code_version)
+            if cache.fetch(keys[key], unique[key]):
+                cached.add(key)
+
+    errors = {}
+
+    def run_one(key):
+        svg_path, size = key
+        try:
+            convert(converter, svg_path, size, unique[key])
+        except Exception as e:
+            errors[key] = _describe(e)
+
+    def run_batch(svg_path, keys):
+        try:
+            inkscape_batch(svg_path, [(size, unique[(svg_path, size)]) for _, size in keys])
+        except Exception as e:
+            for key in keys:
+                errors[key] = _describe(e)
+            return
+        for key in keys:
+            if not os.path.exists(unique[key]):
+                errors[key] = f"转换工具未生成文件: {unique[key]}"
+
+    pending = [key for key in unique if key not in cached]
+    workers = resolve_jobs(max_parallel, len(pending))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        if converter == "inkscape":
+            by_svg = {}
+            for key in pending:
+                by_svg.setdefault(key[0], []).append(key)
+            futures = [pool.submit(run_batch, svg_path, batch) for svg_path, batch in by_svg.items()]
+        else:
+            # 大尺寸优先启动，缩短整体耗时
+            ordered = sorted(pending, key=lambda key: key[1], reverse=True)
+            futures = [pool.submit(run_one, key) for key in ordered]
+        for future in futures:
+            future.result()
+
+    if cache is not None:
+        for key in pending:
+            if key not in errors:
+                cache.store(keys[key], unique[key])
+        cache.save()
+
+    results = []
+    for svg_path, size, output_path in jobs:
+        key = (os.path.abspath(svg_path), size)
+        label = os.path.basename(output_path)
+        if key in errors:
+            results.append(ExportResult(label, False, error=errors[key]))
+            continue
+        try:
+            if unique[key] != output_path:
+                link_file(unique[key], output_path)
+            results.append(ExportResult(label, True, output_path))
+        except Exception as e:
+            results.append(ExportResult(label, False, error=_describe(e)))
+    return results
+
+
+def _describe(error):
+    if isinstance(error, subprocess.CalledProcessError) and error.stderr:
+        stderr = error.stderr.decode(errors="replace") if isinstance(error.stderr, bytes) else error.stderr
+        return f"{error} {stderr.strip()}"
+    return f"{type(error).__name__}: {error}"
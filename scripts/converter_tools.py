@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+SVG转换工具的发现与版本缓存
+用 shutil.which 查找外部工具（不再启动 which 进程），cairosvg 只查找模块而不导入；
+版本号只在首次发现或可执行文件变化（路径、mtime）时查询一次，结果保存在 .xgdd-assets/tools.json
+"""
+
+import json
+import os
+import shutil
+import subprocess
+from functools import lru_cache
+from importlib.util import find_spec
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATE_PATH = os.path.join(REPO_ROOT, ".xgdd-assets", "tools.json")
+
+# 按优先级排列的转换工具及其可执行文件（cairosvg是Python库）
+CONVERTERS = [
+    ("cairosvg", None),
+    ("librsvg", "rsvg-convert"),
+    ("inkscape", "inkscape"),
+    ("imagemagick", "convert"),
+]
+EXECUTABLES = dict(CONVERTERS)
+# shell脚本中rsvg-convert也以工具名出现
+ALIASES = {"rsvg-convert": "librsvg"}
+
+
+def _locate(name):
+    """返回工具的 (路径, mtime_ns)，未安装时返回None"""
+    executable = EXECUTABLES[name]
+    if executable is None:
+        spec = find_spec(name)
+        path = spec.origin if spec else None
+    else:
+        path = shutil.which(executable)
+    if not path:
+        return None
+    try:
+        return path, os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _probe_version(name, path):
+    """查询工具版本（只在缓存失效时调用）"""
+    if EXECUTABLES[name] is None:
+        from importlib.metadata import PackageNotFoundError, version
+        try:
+            return version(name)
+        except PackageNotFoundError:
+            return ""
+    try:
+        output = subprocess.run([path, "--version"], capture_output=True, text=True).stdout
+    except OSError:
+        return ""
+    return output.strip().splitlines()[0] if output.strip() else ""
+
+
+class ToolRegistry:
+    """转换工具的状态文件：记录每个工具的路径、mtime和版本"""
+
+    def __init__(self, state_path=STATE_PATH):
+        self.state_path = state_path
+        self.state = self._load_state()
+        self._dirty = False
+
+    def _load_state(self):
+        try:
+            with open(self.state_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def lookup(self, name):
+        """返回 {"path", "mtime", "version"}，未安装时返回None"""
+        name = ALIASES.get(name, name)
+        if name not in EXECUTABLES:
+            return None
+        located = _locate(name)
+        if located is None:
+            if self.state.pop(name, None) is not None:
+                self._dirty = True
+            return None
+        path, mtime = located
+        cached = self.state.get(name)
+        if cached and cached["path"] == path and cached["mtime"] == mtime:
+            return cached
+        self.state[name] = {"path": path, "mtime": mtime, "version": _probe_version(name, path)}
+        self._dirty = True
+        return self.state[name]
+
+    def save(self):
+        """有变化时原子写回状态文件"""
+        if not self._dirty:
+            return
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        tmp_path = f"{self.state_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.state, f, indent=1)
+        os.replace(tmp_path, self.state_path)
+        self._dirty = False
+
+
+@lru_cache(maxsize=None)
+def tool_info(name):
+    """查找转换工具（带缓存），未安装时返回None"""
+    registry = ToolRegistry()
+    info = registry.lookup(name)
+    try:
+        registry.save()
+    except OSError:
+        pass  # 状态文件只是缓存，写不进去时下次重新查询
+    return info
+
+
+def converter_version(converter):
+    """返回转换工具的版本字符串（作为渲染缓存键的一部分）"""
+    info = tool_info(converter)
+    return info["version"] if info else ""
+
+
+def find_converter():
+    """按优先级返回第一个可用的SVG转换工具，都不可用时返回None"""
+    for name, _ in CONVERTERS:
+        if tool_info(name) is not None:
+            return name
+    return None
+
+
+def available_converters():
+    """返回 [(工具名, 信息或None)]，供状态显示"""
+    return [(name, tool_info(name)) for name, _ in CONVERTERS]
@@ -4,23 +4,52 @@
 遵循Apple Human Interface Guidelines
 """
 
+import argparse
 import os
-from PIL import Image, ImageDraw, ImageFilter
+import sys
+from PIL import Image, ImageFilter
 import math
 
-def create_professional_icon(size=1024):
-    """创建专业级的macOS应用图标"""
+from export_scheduler import ExportTask, add_jobs_argument, run_exports, save_png
+from icon_pyramid import IconPyramid
+from png_stream import add_png_mode_argument, render_to_png, set_png_mode
+from supersample import AADraw
+
+try:
+    import numpy as np
+    import fill_engine
+except ImportError:  # 未安装NumPy时退回逐行绘制
+    fill_engine = None
+
+try:
+    from linear_light import LinearPyramid
+    from resample import add_kernel_argument
+except ImportError:  # 未安装NumPy时在sRGB空间中用Pillow缩放
+    LinearPyramid = None
+
+# 设置 XGDD_VECTOR_FILLS=0 可强制使用原来的逐行绘制
+USE_VECTOR_FILLS = fill_engine is not None and os.environ.get("XGDD_VECTOR_FILLS", "1") != "0"
+
+def create_professional_icon(size=1024, vectorized=None, rows=None):
+    """创建专业级的macOS应用图标；rows=(起始行, 行数) 时只绘制整幅图标中的这一水平条带"""
+    
+    if vectorized is None:
+        vectorized = USE_VECTOR_FILLS
+    top, height = rows or (0, size)
     
-    # 创建画布，使用透明背景
-    img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
+    # 创建画布，使用透明背景（绘制坐标仍是整幅图标坐标，由AADraw平移到条带内）
+    img = Image.new('RGBA', (size, height), (0, 0, 0, 0))
+    draw = AADraw(img, factor=1, origin=(0, top))
     
     # 圆角矩形参数（macOS图标标准）
     corner_radius = int(size * 0.2237)  # macOS标准圆角比例
     
     # 创建圆角矩形背景
-    create_rounded_rectangle(draw, 0, 0, size, size, corner_radius, 
-                           gradient_colors=['#007AFF', '#0051D5'])
+    if vectorized:
+        fill_rounded_gradient(img, corner_radius, gradient_colors=['#007AFF', '#0051D5'], top=top)
+    else:
+        create_rounded_rectangle(draw, 0, 0, size, size, corner_radius, 
+                               gradient_colors=['#007AFF', '#0051D5'])
     
     # 云朵设计 - 更现代的设计
     cloud_y_offset = int(size * 0.25)
@@ -40,7 +69,10 @@ def create_professional_icon(size=1024):
     draw_download_arrow(draw, arrow_x, arrow_y, arrow_size)
     
     # 添加微妙的光泽效果（macOS风格）
-    add_gloss_effect(draw, size, corner_radius)
+    if vectorized:
+        fill_gloss_effect(img, corner_radius, top=top)
+    else:
+        add_gloss_effect(draw, size, corner_radius)
     
     return img
 
@@ -164,6 +196,40 @@ def add_gloss_effect(draw, size, corner_radius):
             else:
                 draw.line([(0, i), (size, i)], fill=color, width=1)
 
+def fill_rounded_gradient(img, radius, gradient_colors, top=0):
+    """向量化版本的 create_rounded_rectangle：整块生成渐变和圆角蒙版后一次写入（img为从top行开始的条带）"""
+    
+    width = height = img.width
+    rows = np.arange(top, top + img.height)
+    
+    # 顶部与底部圆角区域的每行缩进（与逐行绘制的计算方式保持一致）
+    top_insets = fill_engine.corner_insets(rows, radius)
+    bottom_insets = fill_engine.corner_insets(rows - (height - radius), radius)
+    insets = np.where(rows < radius, top_insets,
+                      np.where(rows > height - radius, bottom_insets, 0))
+    
+    colors = fill_engine.linear_gradient(width, height, gradient_colors[0], gradient_colors[1])[rows]
+    mask = fill_engine.span_mask(width, insets, width - insets)
+    fill_engine.fill_replace(img, colors, mask)
+
+def fill_gloss_effect(img, corner_radius, top=0):
+    """向量化版本的 add_gloss_effect（img为从top行开始的条带）"""
+    
+    size = img.width
+    gloss_height = size // 3
+    
+    # 只处理顶部光泽区域与条带的交集
+    rows = np.arange(top, min(gloss_height, top + img.height))
+    if not len(rows):
+        return
+    alphas = fill_engine.alpha_ramp(gloss_height, 40)[rows]
+    insets = fill_engine.corner_insets(rows, corner_radius)
+    
+    mask = fill_engine.span_mask(size, insets, size - insets) & (alphas > 0)[:, None]
+    colors = np.full((len(rows), 1, 4), 255, dtype=np.uint8)
+    colors[:, 0, 3] = np.maximum(alphas, 0)
+    fill_engine.fill_replace(img, colors, mask)
+
 def interpolate_color(color1, color2, t):
     """在两种颜色之间插值"""
     def hex_to_rgb(hex_color):
@@ -182,34 +248,74 @@ def interpolate_color(color1, color2, t):
     
     return (int(r), int(g), int(b), 255)
 
-def generate_all_icon_sizes():
-    """生成macOS应用所需的所有图标尺寸"""
+def save_icon_tiled(path, size, vectorized=None):
+    """按水平条带绘制并流式编码超大尺寸图标，峰值内存与尺寸无关"""
+    return render_to_png(path, size, size,
+                         lambda top, rows: create_professional_icon(size, vectorized, (top, rows)))
+
+def generate_all_icon_sizes(jobs=None, showcase_only=False, kernel="auto"):
+    """生成macOS应用所需的所有图标尺寸（showcase_only时只生成screenshots展示图标）"""
     
-    sizes = [16, 32, 64, 128, 256, 512, 1024]
+    sizes = [1024] if showcase_only else [16, 32, 64, 128, 256, 512, 1024]
     icon_dir = "macos/Runner/Assets.xcassets/AppIcon.appiconset"
     
     print("🎨 生成专业级macOS应用图标...")
     
+    # 只绘制一次1024母版，其余尺寸在线性光预乘空间中逐级缩小（保证质量）
+    if LinearPyramid is not None:
+        pyramid = LinearPyramid.from_renderer(create_professional_icon, max(sizes), kernel)
+    else:
+        pyramid = IconPyramid.from_renderer(create_professional_icon, max(sizes))
+    pyramid.build(sizes)
+    
+    # PNG编码在进程池中并行执行
+    tasks = []
     for size in sizes:
-        print(f"  - 生成 {size}x{size} 图标...")
-        
-        # 生成高分辨率图标然后缩放（保证质量）
-        if size < 512:
-            base_icon = create_professional_icon(1024)
-            icon = base_icon.resize((size, size), Image.Resampling.LANCZOS)
-        else:
-            icon = create_professional_icon(size)
-        
-        # 保存到正确位置
         filename = f"app_icon_{size}.png"
         filepath = os.path.join(icon_dir, filename)
-        icon.save(filepath, "PNG", quality=95, optimize=True)
+        if not showcase_only:
+            tasks.append(ExportTask(f"{size}x{size}", save_png, (pyramid.get(size), filepath),
+                                    weight=size * size))
         
         # 也保存到screenshots目录用于展示
         if size == 1024:
-            icon.save("screenshots/app_icon_new.png", "PNG", quality=95)
+            tasks.append(ExportTask("app_icon_new", save_png,
+                                    (pyramid.get(size), "screenshots/app_icon_new.png"),
+                                    weight=size * size))
+    
+    failed = 0
+    for result in run_exports(tasks, jobs):
+        if result.ok:
+            print(f"  - 生成 {result.label} 图标 ({result.value.describe()})")
+        else:
+            print(f"  ❌ 生成 {result.label} 失败: {result.error}")
+            failed += 1
+    
+    if failed:
+        print(f"⚠️ 部分图标生成失败 ({len(tasks) - failed}/{len(tasks)})")
+        return False
     
     print("✅ 专业级图标生成完成！")
+    return True
 
 if __name__ == "__main__":
-    generate_all_icon_sizes()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="生成专业级macOS应用图标")
+    add_jobs_argument(parser)
+    parser.add_argument("--showcase-only", action="store_true",
+                        help="只生成 screenshots/app_icon_new.png，不写入AppIcon.appiconset")
+    parser.add_argument("--master-size", type=int,
+                        help="按条带流式渲染指定尺寸的单张大图（如营销横幅用的16384）")
+    parser.add_argument("-o", "--output", help="--master-size 的输出路径")
+    if LinearPyramid is not None:
+        add_kernel_argument(parser)
+    add_png_mode_argument(parser)
+    args = parser.parse_args()
+    set_png_mode(args.png_mode)
+    if args.master_size:
+        output = args.output or f"generated_icons/app_icon_{args.master_size}.png"
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+        stats = save_icon_tiled(output, args.master_size)
+        print(f"✅ 已生成 {args.master_size}x{args.master_size} 图标: {output} ({stats.describe()})")
+        sys.exit(0)
+    kernel = getattr(args, "kernel", "auto")
+    sys.exit(0 if generate_all_icon_sizes(args.jobs, args.showcase_only, kernel) else 1)
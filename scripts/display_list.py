@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+图标显示列表与按尺寸编译的绘制计划
+图标设计只记录一次：形状、填充色和不透明度都用设计坐标（默认1024）描述，与输出尺寸无关；
+compile() 把它编译成某个尺寸的绘制计划：同色且中间没有被其他颜色遮挡的形状合并为一批，
+每批在超采样蒙版上一次画完并缩小为覆盖率蒙版，渲染时每批只做一次向量化的按覆盖率填色。
+计划按 (尺寸, 超采样倍数) 缓存；没有NumPy、关闭超采样或按条带渲染时逐个形状交给 AADraw 绘制
+"""
+
+import math
+from collections import namedtuple
+
+from PIL import Image, ImageColor, ImageDraw
+
+from profiling import span
+from supersample import DEFAULT_FACTOR, DEFAULT_TILE, AADraw, blend_coverage
+
+try:
+    import numpy as np
+except ImportError:  # 没有NumPy时只能逐个形状绘制
+    np = None
+
+# 坐标约定与 AADraw 在设计尺寸下一致：包围盒右下角是包含在内的像素，多边形/线段的顶点指向像素中心；
+# width>0 的包围盒形状和多边形表示描边，line 的 width 是线宽
+Shape = namedtuple("Shape", "kind coords color width radius")
+
+BOX_KINDS = ("ellipse", "rectangle", "rounded_rectangle")
+
+
+def _rgba(color):
+    if isinstance(color, str):
+        return ImageColor.getcolor(color, "RGBA")
+    return tuple(color) + (255,) * (4 - len(color))
+
+
+def _flatten(xy):
+    values = []
+    for item in xy:
+        if isinstance(item, (tuple, list)):
+            values.extend(item)
+        else:
+            values.append(item)
+    return tuple(values)
+
+
+def scale_shape(shape, scale):
+    """设计坐标 -> 输出像素坐标（包围盒按像素边界缩放，顶点按像素中心缩放）"""
+    values = shape.coords
+    if shape.kind in BOX_KINDS:
+        x0, y0, x1, y1 = values
+        coords = (x0 * scale, y0 * scale, (x1 + 1) * scale - 1, (y1 + 1) * scale - 1)
+    else:
+        coords = tuple((v + 0.5) * scale - 0.5 for v in values)
+    return shape._replace(coords=coords, width=shape.width * scale, radius=shape.radius * scale)
+
+
+def _pixel_bounds(shape, width, height):
+    """形状在输出图像中影响到的像素范围 (x0, y0, x1, y1)，已裁剪到画布"""
+    values = shape.coords
+    if shape.kind in BOX_KINDS:
+        x0, y0, x1, y1 = values[0], values[1], values[2] + 1, values[3] + 1
+    else:
+        margin = shape.width / 2 + 1
+        xs, ys = values[0::2], values[1::2]
+        x0, y0 = min(xs) - margin, min(ys) - margin
+        x1, y1 = max(xs) + margin + 1, max(ys) + margin + 1
+    return (max(0, math.floor(x0)), max(0, math.floor(y0)),
+            min(width, math.ceil(x1)), min(height, math.ceil(y1)))
+
+
+def _overlaps(a, b):
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def _draw_mask(draw, shape, k, offset):
+    """把像素坐标的形状以k倍分辨率画进单通道蒙版（offset为蒙版左上角的k倍坐标）"""
+    ox, oy = offset
+    values = shape.coords
+    if shape.kind in BOX_KINDS:
+        x0, y0, x1, y1 = values
+        box = (x0 * k - ox, y0 * k - oy, (x1 + 1) * k - 1 - ox, (y1 + 1) * k - 1 - oy)
+        kwargs = {"radius": shape.radius * k} if shape.kind == "rounded_rectangle" else {}
+        if shape.width > 0:
+            kwargs.update(outline=255, width=max(1, round(shape.width * k)))
+        else:
+            kwargs.update(fill=255)
+        getattr(draw, shape.kind)(box, **kwargs)
+        return
+    points = [((x + 0.5) * k - 0.5 - ox, (y + 0.5) * k - 0.5 - oy)
+              for x, y in zip(values[0::2], values[1::2])]
+    if shape.kind == "line":
+        draw.line(points, fill=255, width=max(1, round(shape.width * k)))
+    elif shape.width > 0:
+        draw.polygon(points, outline=255, width=max(1, round(shape.width * k)))
+    else:
+        draw.polygon(points, fill=255)
+
+
+class Batch:
+    """
+    一种颜色的一批形状；编译后保存覆盖率蒙版在画布中的位置，
+    并预先分出完全覆盖的像素（直接赋值）和部分覆盖的像素（按覆盖率插值）
+    """
+
+    def __init__(self, color, bounds):
+        self.color = color
+        self.bounds = bounds
+        self.shapes = []
+        self.box = None
+
+    def add(self, shape, bounds):
+        self.shapes.append(shape)
+        b = self.bounds
+        self.bounds = (min(b[0], bounds[0]), min(b[1], bounds[1]),
+                       max(b[2], bounds[2]), max(b[3], bounds[3]))
+
+    def rasterize(self, k):
+        x0, y0, x1, y1 = self.bounds
+        if x1 <= x0 or y1 <= y0:
+            return False
+        # 与AADraw一样逐块绘制k倍蒙版，大尺寸时蒙版内存有固定上限
+        coverage = Image.new("L", (x1 - x0, y1 - y0), 0)
+        for ty in range(y0, y1, DEFAULT_TILE):
+            for tx in range(x0, x1, DEFAULT_TILE):
+                w, h = min(DEFAULT_TILE, x1 - tx), min(DEFAULT_TILE, y1 - ty)
+                mask = Image.new("L", (w * k, h * k), 0)
+                draw = ImageDraw.Draw(mask)
+                for shape in self.shapes:
+                    _draw_mask(draw, shape, k, (tx * k, ty * k))
+                coverage.paste(mask.reduce(k), (tx - x0, ty - y0))
+        bbox = coverage.getbbox()
+        if bbox is None:
+            return False
+        left, top = x0 + bbox[0], y0 + bbox[1]
+        self.box = (slice(top, top + bbox[3] - bbox[1]), slice(left, left + bbox[2] - bbox[0]))
+        values = np.asarray(coverage.crop(bbox))
+        self.full = values == 255  # 布尔蒙版配合 copyto，不生成整幅的下标数组
+        self.partial = np.nonzero((values > 0) & (values < 255))
+        self.partial_coverage = values[self.partial][:, None].astype(np.float32) / 255
+        # 覆盖率为1时插值的结果（即替换为该颜色）
+        self.solid = blend_coverage(np.zeros((1, 4), np.uint8), np.ones((1, 1), np.float32), self.color)[0]
+        return True
+
+
+class Plan:
+    """某个尺寸的绘制计划：按绘制顺序排列的批次，每批一次填色"""
+
+    def __init__(self, size, background, batches):
+        self.size = size
+        self.background = background
+        self.batches = batches
+
+    def render(self):
+        pixels = np.empty((self.size, self.size, 4), dtype=np.uint8)
+        pixels[...] = self.background
+        for batch in self.batches:
+            region = pixels[batch.box]
+            np.copyto(region, batch.solid, where=batch.full[..., None])
+            region[batch.partial] = blend_coverage(region[batch.partial], batch.partial_coverage, batch.color)
+        return Image.fromarray(pixels, "RGBA")
+
+    def describe(self):
+        return f"{len(self.batches)} 批"
+
+
+class DisplayList:
+    """
+    与设计尺寸无关的图标显示列表；绘制方法与 ImageDraw/AADraw 一致，只记录形状不立即绘制，
+    render(size) 输出正方形RGBA图像
+    """
+
+    def __init__(self, design_size=1024, background=(0, 0, 0, 0)):
+        self.design_size = design_size
+        self.background = _rgba(background)
+        self.shapes = []
+        self._plans = {}
+
+    # ---------------------------------------------------------- 记录形状
+
+    def ellipse(self, xy, fill=None, outline=None, width=1):
+        self._box_shape("ellipse", xy, fill, outline, width)
+
+    def rectangle(self, xy, fill=None, outline=None, width=1):
+        self._box_shape("rectangle", xy, fill, outline, width)
+
+    def rounded_rectangle(self, xy, radius=0, fill=None, outline=None, width=1):
+        self._box_shape("rounded_rectangle", xy, fill, outline, width, radius)
+
+    def polygon(self, xy, fill=None, outline=None, width=1):
+        coords = _flatten(xy)
+        if fill is not None:
+            self._add("polygon", coords, fill, 0)
+        if outline is not None and width > 0:
+            self._add("polygon", coords, outline, width)
+
+    def line(self, xy, fill=None, width=0):
+        if fill is not None:
+            self._add("line", _flatten(xy), fill, max(1, width))
+
+    def _box_shape(self, kind, xy, fill, outline, width, radius=0):
+        coords = _flatten(xy)
+        if fill is not None:
+            self._add(kind, coords, fill, 0, radius)
+        if outline is not None and width > 0:
+            self._add(kind, coords, outline, width, radius)
+
+    def _add(self, kind, coords, color, width, radius=0):
+        self.shapes.append(Shape(kind, coords, _rgba(color), width, radius))
+        self._plans.clear()
+
+    # ---------------------------------------------------------- 编译与渲染
+
+    def compile(self, size, factor=None):
+        """编译（并缓存）指定尺寸的绘制计划"""
+        factor = DEFAULT_FACTOR if factor is None else factor
+        key = (size, factor)
+        if key not in self._plans:
+            with span(f"compile {size}", "compile", batches_from=len(self.shapes)):
+                self._plans[key] = self._compile(size, factor)
+        return self._plans[key]
+
+    def _compile(self, size, factor):
+        scale = size / self.design_size
+        batches = []
+        for shape in self.shapes:
+            shape = scale_shape(shape, scale)
+            bounds = _pixel_bounds(shape, size, size)
+            # 并入最近的同色批次，前提是之后画的其他颜色都不与它重叠（保持绘制顺序的结果不变）
+            target = None
+            for batch in reversed(batches):
+                if batch.color == shape.color:
+                    target = batch
+                    break
+                if _overlaps(batch.bounds, bounds):
+                    break
+            if target is None:
+                target = Batch(shape.color, bounds)
+                batches.append(target)
+            target.add(shape, bounds)
+        return Plan(size, self.background, [batch for batch in batches if batch.rasterize(factor)])
+
+    def replay(self, draw, size):
+        """逐个形状交给 draw（AADraw 或 ImageDraw）按 size 绘制"""
+        scale = size / self.design_size
+        for shape in self.shapes:
+            shape = scale_shape(shape, scale)
+            width = max(1, round(shape.width))
+            if shape.kind == "line":
+                draw.line(shape.coords, fill=shape.color, width=width)
+                continue
+            paint = {"outline": shape.color, "width": width} if shape.width > 0 else {"fill": shape.color}
+            if shape.kind == "rounded_rectangle":
+                draw.rounded_rectangle(shape.coords, shape.radius, **paint)
+            else:
+                getattr(draw, shape.kind)(shape.coords, **paint)
+
+    def render(self, size, supersample=None, rows=None):
+        """
+        渲染 size×size 的图像（supersample为超采样倍数，默认读取XGDD_SUPERSAMPLE）；
+        rows=(起始行, 行数) 时只绘制这一水平条带（逐个形状分块绘制，内存占用有上限）
+        """
+        factor = DEFAULT_FACTOR if supersample is None else supersample
+        if rows is None and np is not None and factor > 1:
+            plan = self.compile(size, factor)
+            with span(f"{size}x{size}", "render", batches=len(plan.batches)):
+                return plan.render()
+        top, height = rows or (0, size)
+        with span(f"{size}x{height}", "render", top=top):
+            image = Image.new("RGBA", (size, height), self.background)
+            self.replay(AADraw(image, factor, origin=(0, top)), size)
+        return image
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+多尺寸导出调度器
+把各尺寸的绘制/编码任务分发到进程池，按提交顺序返回结果并逐个报告错误
+"""
+
+import os
+import traceback
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from profiling import span
+
+
+@dataclass
+class ExportTask:
+    """一个独立的导出任务（函数和参数必须可以被pickle）"""
+    label: str
+    func: Callable
+    args: tuple = ()
+    kwargs: dict = field(default_factory=dict)
+    # 预估开销（如像素数），开销大的任务优先提交，缩短整体耗时
+    weight: float = 0
+
+
+@dataclass
+class ExportResult:
+    """导出任务的执行结果"""
+    label: str
+    ok: bool
+    value: Any = None
+    error: Optional[str] = None
+
+
+def add_jobs_argument(parser):
+    """为命令行解析器添加统一的 --jobs 选项"""
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=None,
+        help="并行任务数（默认使用全部CPU核心，1表示串行）")
+    return parser
+
+
+def resolve_jobs(jobs, task_count):
+    """计算实际使用的进程数"""
+    if jobs is None or jobs <= 0:
+        jobs = os.cpu_count() or 1
+    return max(1, min(jobs, task_count))
+
+
+def _init_worker():
+    # 工作进程已经按CPU核心数并行，进程内的PNG编码不再另开线程池
+    from png_stream import set_deflate_jobs
+    set_deflate_jobs(1)
+
+
+def _run_task(task):
+    try:
+        with span(task.label, "task"):
+            value = task.func(*task.args, **task.kwargs)
+        return ExportResult(task.label, True, value)
+    except Exception as e:
+        detail = traceback.format_exception_only(type(e), e)[-1].strip()
+        return ExportResult(task.label, False, error=detail)
+
+
+def run_exports(tasks, jobs=None):
+    """执行全部任务，结果顺序与任务顺序一致；单个任务失败不影响其他任务"""
+    tasks = list(tasks)
+    if not tasks:
+        return []
+
+    workers = resolve_jobs(jobs, len(tasks))
+    if workers == 1:
+        return [_run_task(task) for task in tasks]
+
+    # 进程池和PNG编码器按需导入，只解析参数或全部命中缓存时不加载
+    from concurrent.futures import ProcessPoolExecutor
+
+    order = sorted(range(len(tasks)), key=lambda i: tasks[i].weight, reverse=True)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = {i: pool.submit(_run_task, tasks[i]) for i in order}
+        return [futures[i].result() for i in range(len(tasks))]
+
+
+def save_png(image, path, **options):
+    """在工作进程中编码并保存PNG，返回EncodeStats（字节数和编码耗时）"""
+    from png_stream import write_png
+    return write_png(image, path, **options)
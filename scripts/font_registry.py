@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+进程级字体注册表
+FreeTypeFont 按 (路径, 字号, 索引) 只加载一次；字体角色（标题、正文、中文、等宽、表情）的路径只查找一次，
+macOS 系统字体缺失时通过 fontconfig（或扫描字体目录）找到 Linux 上的真实字体，最后才退回 load_default；
+渲染好的文字位图放在LRU缓存中，重复出现的文字不再重新光栅化
+"""
+
+import os
+import shutil
+import subprocess
+from functools import lru_cache
+
+from PIL import Image, ImageDraw, ImageFont
+
+# 每个角色依次尝试的 (路径, 索引)
+FONT_ROLES = {
+    "title": [("/System/Library/Fonts/Helvetica.ttc", 0),
+              ("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 0)],
+    "body": [("/System/Library/Fonts/Helvetica.ttc", 0),
+             ("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 0)],
+    "bold": [("/System/Library/Fonts/Supplemental/Arial Bold.ttf", 0),
+             ("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 0),
+             ("/System/Library/Fonts/Helvetica.ttc", 1)],
+    "chinese": [("/System/Library/Fonts/PingFang.ttc", 0),
+                ("/System/Library/Fonts/STHeiti Light.ttc", 0),
+                ("/System/Library/Fonts/Hiragino Sans GB.ttc", 0),
+                # Noto CJK 集合中索引2为简体中文
+                ("/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc", 2),
+                ("/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc", 2),
+                ("/usr/share/fonts/truetype/wqy/wqy-microhei.ttc", 0),
+                ("/usr/share/fonts/truetype/droid/DroidSansFallbackFull.ttf", 0)],
+    "code": [("/System/Library/Fonts/Monaco.ttf", 0),
+             ("/System/Library/Fonts/Courier New.ttf", 0),
+             ("/usr/share/fonts/truetype/dejavu/DejaVuSansMono.ttf", 0)],
+    # 彩色位图字体只有固定字号，由 text_layout 按最近的字号加载后缩放
+    "emoji": [("/System/Library/Fonts/Apple Color Emoji.ttc", 0),
+              ("/usr/share/fonts/truetype/noto/NotoColorEmoji.ttf", 0),
+              ("/usr/share/fonts/truetype/noto/NotoEmoji-Regular.ttf", 0),
+              ("/usr/share/fonts/truetype/ancient-scripts/Symbola_hint.ttf", 0)],
+}
+
+# 候选路径都不存在时交给 fontconfig 匹配的模式
+FONTCONFIG_PATTERNS = {
+    "title": "sans-serif",
+    "body": "sans-serif",
+    "bold": "sans-serif:bold",
+    "chinese": "sans-serif:lang=zh-cn",
+    "code": "monospace",
+    "emoji": "emoji",
+}
+# 没有 fontconfig 时按文件名关键字扫描字体目录
+SCAN_KEYWORDS = {
+    "title": ["DejaVuSans.", "LiberationSans-Regular", "NotoSans-Regular"],
+    "body": ["DejaVuSans.", "LiberationSans-Regular", "NotoSans-Regular"],
+    "bold": ["DejaVuSans-Bold.", "LiberationSans-Bold", "NotoSans-Bold"],
+    "chinese": ["NotoSansCJK-Regular", "NotoSansCJKsc-Regular", "SourceHanSans", "wqy-microhei",
+                "wqy-zenhei", "DroidSansFallback"],
+    "code": ["DejaVuSansMono.", "LiberationMono-Regular", "NotoSansMono-Regular"],
+    "emoji": ["NotoColorEmoji", "NotoEmoji-Regular", "Symbola", "Apple Color Emoji"],
+}
+FONT_DIRS = ["/usr/share/fonts", "/usr/local/share/fonts",
+             os.path.expanduser("~/.local/share/fonts"), os.path.expanduser("~/.fonts"),
+             "/Library/Fonts", os.path.expanduser("~/Library/Fonts")]
+
+# 文字位图缓存的条目数上限
+GLYPH_CACHE_SIZE = 2048
+
+
+@lru_cache(maxsize=None)
+def get_font(path, size, index=0):
+    """加载并缓存字体（失败时抛出OSError，且不缓存）"""
+    return ImageFont.truetype(path, size, index=index)
+
+
+@lru_cache(maxsize=None)
+def default_font(size):
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:  # Pillow < 10.1 不支持指定字号
+        return ImageFont.load_default()
+
+
+def _fontconfig_match(pattern):
+    """用 fc-match 查找字体，返回 (路径, 索引)；需要语言覆盖的模式确认结果确实支持该语言"""
+    if shutil.which("fc-match") is None:
+        return None
+    try:
+        output = subprocess.run(["fc-match", "--format=%{file}\t%{index}", pattern],
+                                capture_output=True, text=True, timeout=10).stdout
+        if ":lang=" in pattern:
+            lang = pattern.split(":lang=")[1].split(":")[0]
+            covered = subprocess.run(["fc-list", f":lang={lang}", "--format=%{file}\n"],
+                                     capture_output=True, text=True, timeout=10).stdout
+            if output.split("\t")[0] not in covered.splitlines():
+                return None
+    except (OSError, subprocess.SubprocessError):
+        return None
+    path, _, index = output.partition("\t")
+    if not path or not os.path.exists(path):
+        return None
+    return path, int(index or 0)
+
+
+def _scan_font_dirs(keywords):
+    """按关键字优先级在字体目录中查找字体文件"""
+    files = []
+    for root in FONT_DIRS:
+        for directory, _, names in os.walk(root):
+            files.extend(os.path.join(directory, name) for name in names
+                         if name.lower().endswith((".ttf", ".ttc", ".otf")))
+    for keyword in keywords:
+        for path in sorted(files):
+            if os.path.basename(path).startswith(keyword):
+                return path, 2 if "NotoSansCJK-" in path and path.endswith(".ttc") else 0
+    return None
+
+
+@lru_cache(maxsize=None)
+def find_font(role):
+    """返回角色对应的 (路径, 索引)，找不到时返回None；每个角色只查找一次"""
+    if role not in FONT_ROLES:
+        raise ValueError(f"未知的字体角色: {role}")
+    for path, index in FONT_ROLES[role]:
+        if os.path.exists(path):
+            return path, index
+    return _fontconfig_match(FONTCONFIG_PATTERNS[role]) or _scan_font_dirs(SCAN_KEYWORDS[role])
+
+
+def load_font(role, size):
+    """按角色加载字体，系统中没有可用字体时退回 load_default"""
+    found = find_font(role)
+    if found is not None:
+        try:
+            return get_font(found[0], size, found[1])
+        except OSError:
+            pass
+    return default_font(size)
+
+
+def get_system_fonts():
+    """返回 {角色: 路径}（只包含找到的角色）"""
+    return {role: found[0] for role in FONT_ROLES if (found := find_font(role))}
+
+
+# ---------------------------------------------------------------- 文字位图缓存
+
+@lru_cache(maxsize=GLYPH_CACHE_SIZE)
+def text_bbox(font, text, anchor=None, mode=""):
+    """与 draw.textbbox((0, 0), text, font, anchor) 相同的包围盒（彩色字体用 mode="RGBA" 测量）"""
+    return font.getbbox(text, mode=mode, anchor=anchor)
+
+
+@lru_cache(maxsize=GLYPH_CACHE_SIZE)
+def text_bitmap(font, text, anchor=None):
+    """返回 (覆盖率蒙版, 相对绘制位置的偏移)"""
+    left, top, right, bottom = text_bbox(font, text, anchor)
+    mask = Image.new("L", (max(1, right - left), max(1, bottom - top)), 0)
+    ImageDraw.Draw(mask).text((-left, -top), text, font=font, fill=255, anchor=anchor)
+    return mask, (left, top)
+
+
+def draw_text(image, xy, text, font, fill, anchor=None):
+    """与 draw.text(xy, text, fill, font, anchor) 效果相同，但复用缓存的文字位图"""
+    mask, (dx, dy) = text_bitmap(font, text, anchor)
+    x = int(round(xy[0])) + dx
+    y = int(round(xy[1])) + dy
+    image.paste(fill, (x, y, x + mask.width, y + mask.height), mask)
+
+
+def cache_info():
+    """返回字体和文字位图缓存的命中统计"""
+    return {"fonts": get_font.cache_info(), "bitmaps": text_bitmap.cache_info()}
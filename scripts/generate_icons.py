@@ -4,13 +4,20 @@ App图标生成脚本
 从SVG源文件生成macOS应用所需的各种尺寸图标
 """
 
+import argparse
 import os
 import sys
-import subprocess
 import json
 from pathlib import Path
 
-def main():
+import converter_runner
+from converter_runner import run_conversions
+from converter_tools import converter_version, find_converter
+from export_scheduler import add_jobs_argument
+from render_cache import RenderCache, code_fingerprint, copy_file
+
+def main(jobs=None, use_cache=True, converter=None):
+    """生成全部尺寸的图标，全部成功时返回True（converter为None时使用第一个可用的转换工具）"""
     print("🎨 开始生成应用图标...")
     
     # 配置路径
@@ -45,7 +52,7 @@ def main():
     ]
     
     # 尝试找到可用的转换工具
-    converter = find_converter()
+    converter = converter or find_converter()
     if not converter:
         print("❌ 错误: 未找到可用的SVG转换工具")
         print("建议安装以下工具之一:")
@@ -55,27 +62,40 @@ def main():
         print("  brew install inkscape")
         sys.exit(1)
     
-    print(f"✅ 使用转换工具: {converter}")
+    print(f"✅ 使用转换工具: {converter} {converter_version(converter)}".rstrip())
     
     # 生成图标
     print("\n🔄 开始生成各种尺寸的图标...")
     success_count = 0
     
-    for size, filename in sizes:
+    # DMG用高分辨率图标和README用图标与各尺寸一起转换，相同尺寸只转换一次
+    extras = [
+        (1024, "app_icon_1024.png"),
+        (128, "user_icon.png"),
+    ]
+    jobs_list = [(svg_source, size, os.path.join(output_dir, filename))
+                 for size, filename in sizes + extras]
+    
+    # SVG内容、尺寸、转换工具版本和本脚本代码都未变化时直接复用缓存
+    cache = RenderCache() if use_cache else None
+    code_version = code_fingerprint(__file__, converter_runner.__file__)
+    results = run_conversions(jobs_list, converter, jobs, cache=cache, code_version=code_version)
+    
+    for (size, filename), result in zip(sizes, results):
         print(f"📐 生成 {size}x{size} -> {filename}")
-        if generate_icon(svg_source, size, output_dir, filename, converter):
-            # 复制到最终位置
-            src_path = os.path.join(output_dir, filename)
+        if result.ok:
+            # 复制到最终位置（图标集中的文件可能被就地编辑，不与缓存共享硬链接）
+            src_path = result.value
             dst_path = os.path.join(icons_dir, filename)
             
             try:
-                import shutil
-                shutil.copy2(src_path, dst_path)
+                copy_file(src_path, dst_path)
                 print(f"  ✅ 成功生成: {dst_path}")
                 success_count += 1
             except Exception as e:
                 print(f"  ❌ 复制失败: {e}")
         else:
+            print(f"    错误: {result.error}")
             print(f"  ❌ 生成失败: {filename}")
     
     # 生成Contents.json
@@ -85,11 +105,13 @@ def main():
     # 生成额外图标
     print("\n🎯 创建额外图标文件...")
     
-    # DMG用高分辨率图标
-    generate_icon(svg_source, 1024, output_dir, "app_icon_1024.png", converter)
+    extra_results = dict(zip([filename for _, filename in extras], results[len(sizes):]))
+    for filename, result in extra_results.items():
+        if not result.ok:
+            print(f"❌ 生成 {filename} 失败: {result.error}")
     
     # README用图标
-    if generate_icon(svg_source, 128, output_dir, "user_icon.png", converter):
+    if extra_results["user_icon.png"].ok:
         try:
             import shutil
             shutil.copy2(os.path.join(output_dir, "user_icon.png"), "user_icon.png")
@@ -111,71 +133,7 @@ def main():
         print("3. 如需创建DMG，运行 ./create_dmg.sh")
     else:
         print("⚠️ 部分图标生成失败，请检查错误信息")
-
-def find_converter():
-    """查找可用的SVG转换工具"""
-    # 检查Python库
-    try:
-        import cairosvg
-        return "cairosvg"
-    except ImportError:
-        pass
-    
-    # 检查系统工具
-    tools = [
-        ("rsvg-convert", "librsvg"),
-        ("inkscape", "inkscape"), 
-        ("convert", "imagemagick")
-    ]
-    
-    for tool, name in tools:
-        if subprocess.run(["which", tool], capture_output=True, text=True).returncode == 0:
-            return name
-    
-    return None
-
-def generate_icon(svg_path, size, output_dir, filename, converter):
-    """生成指定尺寸的图标"""
-    output_path = os.path.join(output_dir, filename)
-    
-    try:
-        if converter == "cairosvg":
-            import cairosvg
-            cairosvg.svg2png(
-                url=svg_path,
-                write_to=output_path,
-                output_width=size,
-                output_height=size
-            )
-        elif converter == "librsvg":
-            subprocess.run([
-                "rsvg-convert",
-                "-w", str(size),
-                "-h", str(size), 
-                svg_path,
-                "-o", output_path
-            ], check=True, capture_output=True)
-        elif converter == "inkscape":
-            subprocess.run([
-                "inkscape",
-                f"--export-png={output_path}",
-                f"--export-width={size}",
-                f"--export-height={size}",
-                svg_path
-            ], check=True, capture_output=True)
-        elif converter == "imagemagick":
-            subprocess.run([
-                "convert",
-                "-background", "transparent",
-                svg_path,
-                "-resize", f"{size}x{size}",
-                output_path
-            ], check=True, capture_output=True)
-        
-        return os.path.exists(output_path)
-    except Exception as e:
-        print(f"    错误: {e}")
-        return False
+    return success_count == len(sizes)
 
 def generate_contents_json(icons_dir):
     """生成Contents.json配置文件"""
@@ -254,5 +212,13 @@ def generate_contents_json(icons_dir):
     
     print("✅ Contents.json 生成完成")
 
+def cli(argv=None, prog=None):
+    """命令行入口（xgdd-assets svg 也经由这里）"""
+    parser = argparse.ArgumentParser(prog=prog, description="从SVG源文件生成macOS应用图标")
+    add_jobs_argument(parser)  # 同时运行的转换进程数上限
+    parser.add_argument("--no-cache", action="store_true", help="忽略渲染缓存，全部重新转换")
+    args = parser.parse_args(argv)
+    return 0 if main(args.jobs, use_cache=not args.no_cache) else 1
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(cli())
\ No newline at end of file
@@ -56,6 +56,13 @@ else
     exit 1
 fi
 
+# 渲染缓存（需要python3，键包含SVG内容、尺寸、转换工具版本和本脚本内容）
+RENDER_CACHE="scripts/render_cache.py"
+USE_CACHE=0
+if command -v python3 &> /dev/null && [ -f "$RENDER_CACHE" ]; then
+    USE_CACHE=1
+fi
+
 # 生成图标函数
 generate_icon() {
     local size=$1
@@ -64,21 +71,32 @@ generate_icon() {
     
     echo "📐 生成 ${size}x${size} -> $filename"
     
-    case $CONVERTER in
-        "rsvg-convert")
-            rsvg-convert -w $size -h $size "$SVG_SOURCE" -o "$output_path"
-            ;;
-        "inkscape")
-            inkscape --export-png="$output_path" --export-width=$size --export-height=$size "$SVG_SOURCE"
-            ;;
-        "imagemagick")
-            convert -background transparent "$SVG_SOURCE" -resize ${size}x${size} "$output_path"
-            ;;
-    esac
+    if [ $USE_CACHE -eq 1 ] && python3 "$RENDER_CACHE" fetch "$SVG_SOURCE" "$size" "$CONVERTER" "$output_path" --code "$0" 2>/dev/null; then
+        echo "  ♻️ 使用缓存"
+    else
+        # 旧输出可能是指向缓存对象的硬链接，先删除再让转换工具写入新文件
+        rm -f "$output_path"
+        case $CONVERTER in
+            "rsvg-convert")
+                rsvg-convert -w $size -h $size "$SVG_SOURCE" -o "$output_path"
+                ;;
+            "inkscape")
+                inkscape --export-png="$output_path" --export-width=$size --export-height=$size "$SVG_SOURCE"
+                ;;
+            "imagemagick")
+                convert -background transparent "$SVG_SOURCE" -resize ${size}x${size} "$output_path"
+                ;;
+        esac
+        
+        if [ $USE_CACHE -eq 1 ] && [ -f "$output_path" ]; then
+            python3 "$RENDER_CACHE" store "$SVG_SOURCE" "$size" "$CONVERTER" "$output_path" --code "$0" || true
+        fi
+    fi
     
     if [ -f "$output_path" ]; then
         echo "  ✅ 成功生成: $output_path"
-        # 复制到最终位置
+        # 复制到最终位置（图标集中的文件可能被就地编辑，不与缓存共享硬链接）
+        rm -f "$ICONS_DIR/$filename"
         cp "$output_path" "$ICONS_DIR/$filename"
     else
         echo "  ❌ 生成失败: $filename"
@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
 """
 简化版图标生成脚本
-使用macOS自带的qlmanage工具转换SVG
+使用macOS自带的qlmanage工具转换SVG，各尺寸由 resample 引擎在线性光预乘空间中缩放
 """
 
+import argparse
 import os
 import sys
 import subprocess
@@ -11,7 +12,11 @@ import json
 import tempfile
 from pathlib import Path
 
-def main():
+from export_scheduler import ExportTask, add_jobs_argument, run_exports, save_png
+from linear_light import LinearPyramid
+from resample import add_kernel_argument
+
+def main(jobs=None, kernel="auto"):
     print("🎨 开始生成应用图标 (使用macOS内置工具)...")
     
     # 配置路径
@@ -62,9 +67,20 @@ def main():
     print("\n🔄 开始生成各种尺寸的图标...")
     success_count = 0
     
-    for size, filename in sizes:
+    # 基础图像只解码一次并逐级缩小，PNG编码在进程池中并行执行，结果按原顺序输出
+    try:
+        pyramid = LinearPyramid.from_file(base_png, 1024, kernel)
+        pyramid.build([size for size, _ in sizes] + [128])
+    except Exception as e:
+        print(f"❌ 无法读取基础PNG图像: {e}")
+        sys.exit(1)
+    tasks = [ExportTask(filename, save_png, (pyramid.get(size), os.path.join(output_dir, filename)),
+                        weight=size * size)
+             for size, filename in sizes]
+    
+    for (size, filename), result in zip(sizes, run_exports(tasks, jobs)):
         print(f"📐 生成 {size}x{size} -> {filename}")
-        if resize_image_with_sips(base_png, size, output_dir, filename):
+        if result.ok:
             # 复制到最终位置
             src_path = os.path.join(output_dir, filename)
             dst_path = os.path.join(icons_dir, filename)
@@ -77,6 +93,7 @@ def main():
             except Exception as e:
                 print(f"  ❌ 复制失败: {e}")
         else:
+            print(f"    调整尺寸错误: {result.error}")
             print(f"  ❌ 生成失败: {filename}")
     
     # 生成Contents.json
@@ -94,13 +111,13 @@ def main():
         pass
     
     # README用图标 (128px)
-    if resize_image_with_sips(base_png, 128, output_dir, "user_icon.png"):
-        try:
-            import shutil
-            shutil.copy2(os.path.join(output_dir, "user_icon.png"), "user_icon.png")
-            print("✅ README图标已复制到根目录")
-        except Exception as e:
-            print(f"❌ 复制README图标失败: {e}")
+    try:
+        import shutil
+        save_png(pyramid.get(128), os.path.join(output_dir, "user_icon.png"))
+        shutil.copy2(os.path.join(output_dir, "user_icon.png"), "user_icon.png")
+        print("✅ README图标已复制到根目录")
+    except Exception as e:
+        print(f"❌ 生成README图标失败: {e}")
     
     # 显示结果
     print(f"\n🎉 图标生成完成！")
@@ -213,6 +230,7 @@ def create_fallback_icon(output_path):
         # 使用Python PIL创建简单图标
         try:
             from PIL import Image, ImageDraw
+            from png_stream import write_png
             
             # 创建1024x1024的图像
             img = Image.new('RGBA', (1024, 1024), (255, 255, 255, 0))
@@ -239,7 +257,7 @@ def create_fallback_icon(output_path):
             # 箭头头部
             draw.polygon([(497, 785), (512, 800), (527, 785), (522, 785), (512, 795), (502, 785)], fill='white')
             
-            img.save(output_path, 'PNG')
+            write_png(img, output_path)
             print("✅ 使用PIL创建备用图标")
             return True
             
@@ -252,27 +270,6 @@ def create_fallback_icon(output_path):
         print(f"    备用图标创建错误: {e}")
         return False
 
-def resize_image_with_sips(input_path, size, output_dir, filename):
-    """使用macOS的sips工具调整图像尺寸"""
-    output_path = os.path.join(output_dir, filename)
-    
-    try:
-        subprocess.run([
-            "sips",
-            "-Z", str(size),
-            input_path,
-            "--out", output_path
-        ], check=True, capture_output=True)
-        
-        return os.path.exists(output_path) and os.path.getsize(output_path) > 100
-        
-    except subprocess.CalledProcessError as e:
-        print(f"    sips错误: {e}")
-        return False
-    except Exception as e:
-        print(f"    调整尺寸错误: {e}")
-        return False
-
 def generate_contents_json(icons_dir):
     """生成Contents.json配置文件"""
     contents = {
@@ -298,4 +295,8 @@ def generate_contents_json(icons_dir):
     print("✅ Contents.json 生成完成")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="使用macOS内置工具生成应用图标")
+    add_jobs_argument(parser)
+    add_kernel_argument(parser)
+    args = parser.parse_args()
+    main(args.jobs, args.kernel)
\ No newline at end of file
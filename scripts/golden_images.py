@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+资源生成器的金标准图像回归测试
+每个生成器（图标绘制函数、SVG光栅化器、截图场景）按全部尺寸在内存中渲染，与保存的参考图比较：
+感知指标是向量化的SSIM（预乘RGBA各通道）和CIELAB ΔE（分别合成到白底和黑底，取较大者，透明度差异也能体现），
+超出容差时输出 参考图 | 新结果 | ΔE热力图 的对比图；全部用例在进程池中并行执行。
+图标用例的参考图提交在 test/goldens/，由 test/test_golden_images.py 在CI中检查
+（svg_icon 含一行文字，fonts.json 记录参考图使用的字体，本机字体不同时跳过这些用例）；
+截图依赖本机字体，只在加 --screenshots 时运行，参考图保存在本地的 .xgdd-assets/goldens/（不提交），
+改动截图渲染前先用 --screenshots --update 记录参考图，改完后再运行比较
+"""
+
+import argparse
+import fnmatch
+import glob
+import json
+import os
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image
+
+from export_scheduler import ExportTask, add_jobs_argument, run_exports
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 根目录下的生成脚本（user_provided_icon.py 等）也需要能导入
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
+
+# 提交到仓库的图标参考图，以及只保存在本机的截图参考图
+REFERENCE_DIR = os.path.join("test", "goldens")
+LOCAL_REFERENCE_DIR = os.path.join(".xgdd-assets", "goldens")
+DIFF_DIR = os.path.join(".xgdd-assets", "golden-diffs")
+ICON_SIZES = [16, 32, 64, 128, 256, 512, 1024]
+SVG_SOURCE = "assets/x-google-drive-downloader-concrete.svg"
+SCENE_GLOB = "assets/scenes/*.json"
+SCREENSHOT_SCALES = [1, 2]
+ICON_GENERATORS = ("user_icon", "simple_icon", "showcase_icon", "svg_icon")
+# 渲染结果随系统字体变化的生成器：用例需要显式启用，参考图只保存在本地
+LOCAL_GENERATORS = ("screenshot",)
+
+# SSIM 的窗口边长和稳定常数（动态范围为1）
+SSIM_WINDOW = 7
+SSIM_C1 = 0.01 ** 2
+SSIM_C2 = 0.03 ** 2
+# ΔE 热力图中颜色饱和对应的差异
+HEATMAP_MAX_DELTA_E = 10.0
+# 对比图中每一栏的最小边长（小图标放大显示）
+PREVIEW_MIN_SIZE = 128
+
+
+@dataclass(frozen=True)
+class Tolerance:
+    """通过条件：SSIM不低于 min_ssim，ΔE均值和99分位数不超过上限"""
+    min_ssim: float = 0.995
+    max_mean_delta_e: float = 0.5
+    max_p99_delta_e: float = 2.3
+
+
+@dataclass(frozen=True)
+class GoldenCase:
+    """一个回归用例：生成器名称 + 参数（尺寸或 (场景文件, 缩放倍数)）"""
+    name: str
+    generator: str
+    param: object
+    weight: float = 0
+
+
+@dataclass
+class GoldenResult:
+    name: str
+    status: str  # passed / failed / missing / updated / skipped
+    ssim: float = None
+    mean_delta_e: float = None
+    p99_delta_e: float = None
+    max_delta_e: float = None
+    reason: str = ""
+    diff_path: str = None
+
+    def describe(self):
+        if self.ssim is None:
+            return self.reason
+        text = (f"SSIM {self.ssim:.4f}, ΔE 均值 {self.mean_delta_e:.3f} / "
+                f"p99 {self.p99_delta_e:.2f} / 最大 {self.max_delta_e:.1f}")
+        return f"{text} ({self.reason})" if self.reason else text
+
+
+# ---------------------------------------------------------------- 生成器
+
+def _render_user_icon(size):
+    import user_provided_icon
+    return user_provided_icon.create_professional_icon(size)
+
+
+def _render_simple_icon(size):
+    import create_simple_icons
+    return create_simple_icons.create_app_icon(size)
+
+
+def _render_showcase_icon(size):
+    import create_professional_icon
+    return create_professional_icon.create_professional_icon(size)
+
+
+@lru_cache(maxsize=None)
+def _svg_document():
+    import svg_raster
+    return svg_raster.SvgDocument(SVG_SOURCE)
+
+
+def _render_svg_icon(size):
+    return _svg_document().render(size)
+
+
+def _render_screenshot(param):
+    from scene_render import load_scene, render_scene
+    path, scale = param
+    scene = load_scene(path)
+    return render_scene(scene, scene.default_variant(scale))
+
+
+def _svg_font():
+    import svg_raster
+    return svg_raster.load_font(20).path
+
+
+# 含文字的图标生成器 -> 返回本机实际使用的字体文件
+FONT_PROBES = {"svg_icon": _svg_font}
+FONT_MANIFEST = "fonts.json"
+
+
+GENERATORS = {
+    "user_icon": _render_user_icon,
+    "simple_icon": _render_simple_icon,
+    "showcase_icon": _render_showcase_icon,
+    "svg_icon": _render_svg_icon,
+    "screenshot": _render_screenshot,
+}
+
+
+def golden_cases(screenshots=False):
+    """回归用例：图标按全部尺寸；screenshots为True时加上全部场景 × 缩放倍数的截图"""
+    cases = []
+    for generator in ICON_GENERATORS:
+        for size in ICON_SIZES:
+            cases.append(GoldenCase(f"{generator}/{size}", generator, size, size * size))
+    if not screenshots:
+        return cases
+    for path in sorted(glob.glob(SCENE_GLOB)):
+        scene = os.path.splitext(os.path.basename(path))[0]
+        for scale in SCREENSHOT_SCALES:
+            suffix = "" if scale == 1 else f"@{scale}x"
+            # 截图约 1200x800，按像素数估计开销
+            cases.append(GoldenCase(f"screenshot/{scene}{suffix}", "screenshot", (path, scale),
+                                    1_000_000 * scale * scale))
+    return cases
+
+
+def select_cases(cases, patterns):
+    """按通配符筛选用例名称，例如 user_icon/* 或 */1024"""
+    if not patterns:
+        return cases
+    return [case for case in cases if any(fnmatch.fnmatch(case.name, p) for p in patterns)]
+
+
+# ---------------------------------------------------------------- 感知指标
+
+def _premultiplied(image):
+    """8位RGBA -> 0~1 的预乘RGBA float64数组"""
+    pixels = np.asarray(image.convert("RGBA"), dtype=np.float64) / 255
+    pixels[..., :3] *= pixels[..., 3:]
+    return pixels
+
+
+def _box_mean(values, window):
+    """用积分图计算最后两维上每个 window×window 窗口的均值（只取完整窗口）"""
+    integral = np.zeros(values.shape[:-2] + (values.shape[-2] + 1, values.shape[-1] + 1))
+    integral[..., 1:, 1:] = values.cumsum(-2).cumsum(-1)
+    total = (integral[..., window:, window:] - integral[..., :-window, window:]
+             - integral[..., window:, :-window] + integral[..., :-window, :-window])
+    return total / (window * window)
+
+
+def ssim(reference, actual):
+    """预乘RGBA四个通道的平均SSIM（窗口为均匀窗口），返回 (均值, SSIM图)"""
+    # 通道放在最前面，积分图沿连续的内存方向累加
+    x = np.ascontiguousarray(_premultiplied(reference).transpose(2, 0, 1))
+    y = np.ascontiguousarray(_premultiplied(actual).transpose(2, 0, 1))
+    window = max(1, min(SSIM_WINDOW, x.shape[1], x.shape[2]))
+    mu_x, mu_y = _box_mean(x, window), _box_mean(y, window)
+    var_x = _box_mean(x * x, window) - mu_x ** 2
+    var_y = _box_mean(y * y, window) - mu_y ** 2
+    cov = _box_mean(x * y, window) - mu_x * mu_y
+    score = (((2 * mu_x * mu_y + SSIM_C1) * (2 * cov + SSIM_C2))
+             / ((mu_x ** 2 + mu_y ** 2 + SSIM_C1) * (var_x + var_y + SSIM_C2)))
+    return float(score.mean()), score.mean(axis=0)
+
+
+def _srgb_to_lab(rgb):
+    """0~1 的sRGB -> CIELAB（D65）"""
+    linear = np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+    xyz = linear @ np.array([[0.4124, 0.2126, 0.0193],
+                             [0.3576, 0.7152, 0.1192],
+                             [0.1805, 0.0722, 0.9505]])
+    xyz /= np.array([0.95047, 1.0, 1.08883])
+    f = np.where(xyz > (6 / 29) ** 3, np.cbrt(xyz), xyz / (3 * (6 / 29) ** 2) + 4 / 29)
+    return np.stack([116 * f[..., 1] - 16,
+                     500 * (f[..., 0] - f[..., 1]),
+                     200 * (f[..., 1] - f[..., 2])], axis=-1)
+
+
+def delta_e(reference, actual):
+    """逐像素的CIE76 ΔE：分别合成到白底和黑底后计算，取较大者"""
+    x, y = _premultiplied(reference), _premultiplied(actual)
+    result = None
+    for backdrop in (1.0, 0.0):
+        lab_x = _srgb_to_lab(x[..., :3] + backdrop * (1 - x[..., 3:]))
+        lab_y = _srgb_to_lab(y[..., :3] + backdrop * (1 - y[..., 3:]))
+        distance = np.linalg.norm(lab_x - lab_y, axis=-1)
+        result = distance if result is None else np.maximum(result, distance)
+    return result
+
+
+def compare(reference, actual, tolerance=Tolerance()):
+    """比较两幅图像，返回 (GoldenResult, ΔE图)；尺寸不同时直接判定失败"""
+    if reference.size != actual.size:
+        return GoldenResult("", "failed", reason=f"尺寸不同: 参考 {reference.size}, 新结果 {actual.size}"), None
+    if reference.mode == actual.mode and reference.tobytes() == actual.tobytes():
+        return GoldenResult("", "passed", 1.0, 0.0, 0.0, 0.0), None
+    score, _ = ssim(reference, actual)
+    distance = delta_e(reference, actual)
+    result = GoldenResult("", "passed", score, float(distance.mean()),
+                          float(np.percentile(distance, 99)), float(distance.max()))
+    problems = []
+    if score < tolerance.min_ssim:
+        problems.append(f"SSIM < {tolerance.min_ssim}")
+    if result.mean_delta_e > tolerance.max_mean_delta_e:
+        problems.append(f"ΔE均值 > {tolerance.max_mean_delta_e}")
+    if result.p99_delta_e > tolerance.max_p99_delta_e:
+        problems.append(f"ΔE p99 > {tolerance.max_p99_delta_e}")
+    if problems:
+        result.status = "failed"
+        result.reason = ", ".join(problems)
+    return result, distance
+
+
+# ---------------------------------------------------------------- 差异图
+
+def heatmap(distance):
+    """ΔE图 -> 热力图（黑 -> 红 -> 黄 -> 白）"""
+    t = np.clip(distance / HEATMAP_MAX_DELTA_E, 0, 1)
+    rgb = np.stack([np.clip(t * 3, 0, 1), np.clip(t * 3 - 1, 0, 1), np.clip(t * 3 - 2, 0, 1)], axis=-1)
+    return Image.fromarray((rgb * 255 + 0.5).astype(np.uint8), "RGB")
+
+
+def _checkerboard(size, cell=8):
+    width, height = size
+    ys, xs = np.indices((height, width))
+    shade = np.where((xs // cell + ys // cell) % 2, 204, 255).astype(np.uint8)
+    return Image.fromarray(np.repeat(shade[..., None], 3, axis=-1), "RGB")
+
+
+def save_diff(path, reference, actual, distance):
+    """保存 参考图 | 新结果 | 热力图 的三栏对比图（透明区域显示为棋盘格）"""
+    width, height = actual.size
+    zoom = max(1, -(-PREVIEW_MIN_SIZE // min(width, height)))
+    panels = []
+    for image in (reference, actual):
+        image = image.convert("RGBA")
+        backdrop = _checkerboard(image.size, max(1, 8 // zoom))
+        backdrop.paste(image, (0, 0), image)
+        panels.append(backdrop)
+    panels.append(heatmap(distance))
+    gap = 4
+    sheet = Image.new("RGB", (3 * width * zoom + 2 * gap, height * zoom), (128, 128, 128))
+    for i, panel in enumerate(panels):
+        sheet.paste(panel.resize((width * zoom, height * zoom), Image.Resampling.NEAREST),
+                    (i * (width * zoom + gap), 0))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    sheet.save(path)
+    return path
+
+
+# ---------------------------------------------------------------- 执行
+
+def default_reference_dir(case):
+    """用例的默认参考图目录（依赖字体的用例使用本地目录）"""
+    return LOCAL_REFERENCE_DIR if case.generator in LOCAL_GENERATORS else REFERENCE_DIR
+
+
+def reference_path(reference_dir, case):
+    return os.path.join(reference_dir, *case.name.split("/")) + ".png"
+
+
+def _load_font_manifest(reference_dir):
+    try:
+        with open(os.path.join(reference_dir, FONT_MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def font_mismatch(case, reference_dir):
+    """含文字的用例在本机字体与参考图记录的字体不同时返回说明，否则返回None"""
+    probe = FONT_PROBES.get(case.generator)
+    if probe is None:
+        return None
+    expected = _load_font_manifest(reference_dir).get(case.generator)
+    actual = os.path.basename(probe())
+    if expected and expected != actual:
+        return f"参考图使用 {expected} 渲染，本机字体为 {actual}"
+    return None
+
+
+def record_fonts(cases, reference_dir=None):
+    """更新参考图后记录含文字用例使用的字体"""
+    updates = {}
+    for case in cases:
+        if case.generator in FONT_PROBES:
+            directory = reference_dir or default_reference_dir(case)
+            updates.setdefault(directory, {})[case.generator] = os.path.basename(FONT_PROBES[case.generator]())
+    for directory, fonts in updates.items():
+        manifest = _load_font_manifest(directory)
+        manifest.update(fonts)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, FONT_MANIFEST), "w") as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+            f.write("\n")
+
+
+def check_case(case, reference_dir=None, diff_dir=DIFF_DIR, tolerance=Tolerance(), update=False):
+    """在工作进程中渲染一个用例并与参考图比较（update时改为写入参考图）"""
+    reference_dir = reference_dir or default_reference_dir(case)
+    if not update:
+        mismatch = font_mismatch(case, reference_dir)
+        if mismatch:
+            return GoldenResult(case.name, "skipped", reason=mismatch)
+    actual = GENERATORS[case.generator](case.param)
+    path = reference_path(reference_dir, case)
+    if update:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        actual.save(path)
+        return GoldenResult(case.name, "updated", reason=f"已写入 {path}")
+    if not os.path.exists(path):
+        return GoldenResult(case.name, "missing", reason="没有参考图（先运行 --update）")
+    with Image.open(path) as source:
+        reference = source.copy()
+    result, distance = compare(reference, actual, tolerance)
+    result.name = case.name
+    if result.status == "failed" and distance is not None:
+        result.diff_path = save_diff(reference_path(diff_dir, case), reference, actual, distance)
+    return result
+
+
+def run_cases(cases, jobs=None, reference_dir=None, diff_dir=DIFF_DIR,
+              tolerance=Tolerance(), update=False):
+    """并行执行用例，返回与输入顺序一致的GoldenResult列表（渲染出错的用例记为失败）"""
+    tasks = [ExportTask(case.name, check_case, (case, reference_dir, diff_dir, tolerance, update),
+                        weight=case.weight) for case in cases]
+    results = []
+    for case, outcome in zip(cases, run_exports(tasks, jobs)):
+        results.append(outcome.value if outcome.ok else
+                       GoldenResult(case.name, "failed", reason=f"渲染出错: {outcome.error}"))
+    if update:
+        record_fonts([case for case, result in zip(cases, results) if result.status == "updated"],
+                     reference_dir)
+    return results
+
+
+STATUS_ICONS = {"passed": "✅", "failed": "❌", "missing": "⚠️", "updated": "📝", "skipped": "⏭️"}
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="资源生成器的金标准图像回归测试")
+    parser.add_argument("patterns", nargs="*", help="只运行名称匹配的用例，例如 'user_icon/*' '*/1024'")
+    parser.add_argument("--update", action="store_true", help="用当前渲染结果覆盖参考图")
+    parser.add_argument("--list", action="store_true", help="列出全部用例")
+    parser.add_argument("--screenshots", action="store_true",
+                        help=f"同时运行依赖本机字体的截图用例（参考图在 {LOCAL_REFERENCE_DIR}）")
+    parser.add_argument("--reference-dir", default=None,
+                        help=f"参考图目录（默认图标为 {REFERENCE_DIR}，截图为 {LOCAL_REFERENCE_DIR}）")
+    parser.add_argument("--diff-dir", default=DIFF_DIR, help=f"差异图输出目录（默认 {DIFF_DIR}）")
+    parser.add_argument("--min-ssim", type=float, default=Tolerance.min_ssim, help="SSIM下限")
+    parser.add_argument("--max-mean-delta-e", type=float, default=Tolerance.max_mean_delta_e,
+                        help="ΔE均值上限")
+    parser.add_argument("--max-p99-delta-e", type=float, default=Tolerance.max_p99_delta_e,
+                        help="ΔE 99分位数上限")
+    add_jobs_argument(parser)
+    args = parser.parse_args(argv)
+
+    # 生成器使用相对仓库根目录的资源路径
+    os.chdir(REPO_ROOT)
+    cases = select_cases(golden_cases(args.screenshots), args.patterns)
+    if args.list:
+        for case in cases:
+            print(f"  {case.name}")
+        return 0
+    if not cases:
+        print("❌ 没有匹配的用例")
+        return 1
+
+    tolerance = Tolerance(args.min_ssim, args.max_mean_delta_e, args.max_p99_delta_e)
+    print(f"🔍 {'更新参考图' if args.update else '比较参考图'}: {len(cases)} 个用例")
+    results = run_cases(cases, args.jobs, args.reference_dir, args.diff_dir, tolerance, args.update)
+
+    counts = {}
+    for result in results:
+        counts[result.status] = counts.get(result.status, 0) + 1
+        print(f"  {STATUS_ICONS[result.status]} {result.name}: {result.describe()}")
+        if result.diff_path:
+            print(f"     差异图: {result.diff_path}")
+
+    print("")
+    if args.update:
+        print(f"📝 已更新 {counts.get('updated', 0)} 张参考图")
+        return 0 if counts.get("failed", 0) == 0 else 1
+    summary = ", ".join(f"{status} {count}" for status, count in sorted(counts.items()))
+    if counts.get("failed", 0) or counts.get("missing", 0):
+        print(f"⚠️ 回归测试未通过 ({summary})")
+        return 1
+    if counts.get("skipped", 0):
+        print(f"🎉 回归测试通过 ({summary})")
+        return 0
+    print(f"🎉 全部 {len(results)} 个用例通过")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
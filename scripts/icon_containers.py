@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+桌面平台图标容器
+从同一个尺寸金字塔一次性生成 macOS .icns、Windows 多分辨率 .ico 和 Linux freedesktop hicolor 图标目录；
+每个尺寸只编码一次PNG，三种容器共用同一份数据，不写出再读回中间文件
+"""
+
+import argparse
+import os
+import struct
+import sys
+
+from export_scheduler import ExportTask, add_jobs_argument, run_exports
+from linear_light import LinearPyramid
+from png_stream import add_png_mode_argument, encode_png, set_png_mode
+
+# (OSType, 像素尺寸)：@2x 条目与更大的 1x 条目共用同一份PNG
+ICNS_ENTRIES = [
+    (b"icp4", 16), (b"icp5", 32), (b"icp6", 64),
+    (b"ic07", 128), (b"ic08", 256), (b"ic09", 512), (b"ic10", 1024),
+    (b"ic11", 32), (b"ic12", 64), (b"ic13", 256), (b"ic14", 512),
+]
+ICO_SIZES = [16, 24, 32, 48, 64, 128, 256]
+HICOLOR_SIZES = [16, 22, 24, 32, 48, 64, 128, 256, 512]
+
+DEFAULT_SOURCE = "user_icon.png"
+DEFAULT_ICNS = "generated_icons/AppIcon.icns"
+DEFAULT_ICO = "windows/runner/resources/app_icon.ico"
+DEFAULT_HICOLOR = "linux/icons/hicolor"
+# 与 linux/CMakeLists.txt 中的 APPLICATION_ID 一致
+DEFAULT_ICON_NAME = "com.example.gdrive_downloader_flutter"
+FORMATS = ("icns", "ico", "hicolor")
+
+
+def required_sizes(formats=FORMATS):
+    """返回所选容器需要的全部像素尺寸"""
+    sizes = set()
+    if "icns" in formats:
+        sizes.update(size for _, size in ICNS_ENTRIES)
+    if "ico" in formats:
+        sizes.update(ICO_SIZES)
+    if "hicolor" in formats:
+        sizes.update(HICOLOR_SIZES)
+    return sorted(sizes)
+
+
+def encode_sizes(pyramid, sizes, jobs=None):
+    """并行把金字塔中的各尺寸编码为PNG字节，返回 {尺寸: bytes}"""
+    pyramid.build(sizes)
+    tasks = [ExportTask(f"{size}x{size}", encode_png, (pyramid.get(size),), weight=size * size)
+             for size in sizes]
+    pngs = {}
+    for size, result in zip(sizes, run_exports(tasks, jobs)):
+        if not result.ok:
+            raise RuntimeError(f"编码 {result.label} 失败: {result.error}")
+        pngs[size] = result.value
+    return pngs
+
+
+def build_icns(pngs):
+    """组装 .icns：'icns' 文件头后依次是 (类型, 长度, PNG数据) 条目"""
+    body = b"".join(struct.pack(">4sI", ostype, len(pngs[size]) + 8) + pngs[size]
+                    for ostype, size in ICNS_ENTRIES)
+    return struct.pack(">4sI", b"icns", len(body) + 8) + body
+
+
+def build_ico(pngs):
+    """组装多分辨率 .ico（各条目均为PNG数据，Windows Vista起支持）"""
+    header = struct.pack("<HHH", 0, 1, len(ICO_SIZES))
+    offset = len(header) + 16 * len(ICO_SIZES)
+    directory, images = [], []
+    for size in ICO_SIZES:
+        data = pngs[size]
+        # 宽高字段为0表示256
+        directory.append(struct.pack("<BBBBHHII", size % 256, size % 256, 0, 0, 1, 32,
+                                     len(data), offset))
+        images.append(data)
+        offset += len(data)
+    return header + b"".join(directory) + b"".join(images)
+
+
+def write_hicolor(pngs, root, name=DEFAULT_ICON_NAME):
+    """写出 hicolor/<尺寸>x<尺寸>/apps/<name>.png，返回写入的路径列表"""
+    paths = []
+    for size in HICOLOR_SIZES:
+        directory = os.path.join(root, f"{size}x{size}", "apps")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{name}.png")
+        _write_bytes(path, pngs[size])
+        paths.append(path)
+    return paths
+
+
+def _write_bytes(path, data):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def write_containers(pyramid, icns_path=DEFAULT_ICNS, ico_path=DEFAULT_ICO,
+                     hicolor_dir=DEFAULT_HICOLOR, name=DEFAULT_ICON_NAME, jobs=None):
+    """从金字塔一次生成全部容器，路径为None的容器跳过；返回 {格式: 写入的路径列表}"""
+    formats = [fmt for fmt, target in zip(FORMATS, (icns_path, ico_path, hicolor_dir)) if target]
+    pngs = encode_sizes(pyramid, required_sizes(formats), jobs)
+    written = {}
+    if icns_path:
+        _write_bytes(icns_path, build_icns(pngs))
+        written["icns"] = [icns_path]
+    if ico_path:
+        _write_bytes(ico_path, build_ico(pngs))
+        written["ico"] = [ico_path]
+    if hicolor_dir:
+        written["hicolor"] = write_hicolor(pngs, hicolor_dir, name)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成 .icns / .ico / hicolor 桌面图标")
+    parser.add_argument("--source", default=DEFAULT_SOURCE, help="源图标（只解码一次作为母版）")
+    parser.add_argument("--icns", default=DEFAULT_ICNS, help="macOS .icns 输出路径")
+    parser.add_argument("--ico", default=DEFAULT_ICO, help="Windows .ico 输出路径")
+    parser.add_argument("--hicolor", default=DEFAULT_HICOLOR, help="freedesktop hicolor 目录")
+    parser.add_argument("--name", default=DEFAULT_ICON_NAME, help="hicolor 中的图标名")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS),
+                        help="只生成指定的容器")
+    add_jobs_argument(parser)
+    add_png_mode_argument(parser)
+    args = parser.parse_args()
+    set_png_mode(args.png_mode)
+
+    if not os.path.exists(args.source):
+        print(f"❌ 源图标不存在: {args.source}")
+        return 1
+
+    print("🖼️ 生成桌面图标容器...")
+    pyramid = LinearPyramid.from_file(args.source, 1024)
+    written = write_containers(
+        pyramid,
+        args.icns if "icns" in args.formats else None,
+        args.ico if "ico" in args.formats else None,
+        args.hicolor if "hicolor" in args.formats else None,
+        args.name, args.jobs)
+    for fmt, paths in written.items():
+        total = sum(os.path.getsize(path) for path in paths)
+        target = paths[0] if len(paths) == 1 else f"{args.hicolor}/ ({len(paths)} 个尺寸)"
+        print(f"  ✅ {fmt}: {target} ({total / 1024:.1f}KB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+小尺寸图标的像素对齐（hinting）
+把1024设计坐标映射到目标尺寸时，边缘吸附到像素边界、笔画宽度取整且不小于下限，
+居中的元素按自身宽度的奇偶对齐，保证两侧边缘都落在整像素上；每个尺寸可用覆盖表单独指定关键尺寸
+"""
+
+DESIGN_SIZE = 1024
+
+
+class Hinter:
+    """
+    一个目标尺寸的对齐器；返回值都是像素边界坐标（整数或 .5），
+    box() 转换为 ImageDraw/AADraw 的包含式包围盒，vertex() 转换为多边形/线段使用的像素中心坐标
+    """
+
+    def __init__(self, size, overrides=None, design_size=DESIGN_SIZE):
+        self.size = size
+        self.scale = size / design_size
+        self.overrides = overrides or {}
+
+    def edge(self, value):
+        """设计坐标 -> 最近的像素边界"""
+        return round(value * self.scale)
+
+    def length(self, name, value, minimum=1):
+        """尺寸（笔画宽度、半径等）：覆盖表优先，否则取整且不小于 minimum"""
+        if name in self.overrides:
+            return self.overrides[name]
+        return max(minimum, round(value * self.scale))
+
+    def start(self, center, extent):
+        """宽度为 extent 像素、以设计坐标 center 居中的元素的起始边界"""
+        return round(center * self.scale - extent / 2)
+
+    def span(self, center, extent):
+        """返回居中元素的 (起始边界, 结束边界)"""
+        start = self.start(center, extent)
+        return start, start + extent
+
+    def box(self, left, top, right, bottom):
+        """像素边界 -> 包含式包围盒（至少1像素）"""
+        return [left, top, max(left, right - 1), max(top, bottom - 1)]
+
+    def design_box(self, x0, y0, x1, y1):
+        """设计坐标的矩形 -> 吸附后的包含式包围盒"""
+        return self.box(self.edge(x0), self.edge(y0), self.edge(x1), self.edge(y1))
+
+    @staticmethod
+    def vertex(x, y):
+        """像素边界坐标 -> 顶点坐标（AADraw 的顶点指向像素中心）"""
+        return (x - 0.5, y - 0.5)
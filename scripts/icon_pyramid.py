@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+图标尺寸金字塔
+母版只渲染/解码一次，其余尺寸从最近的更大层级逐级缩小得到
+"""
+
+from PIL import Image
+
+from profiling import span
+
+
+class IconPyramid:
+    """按需生成并缓存各个尺寸层级的图像金字塔"""
+
+    def __init__(self, master):
+        if master.width != master.height:
+            raise ValueError(f"母版必须是正方形: {master.size}")
+        self.master = master
+        self.levels = {master.width: master}
+        # 2x盒式缩小产生的中间层级，只作为缩小的起点，不直接输出
+        self._mips = {}
+
+    @classmethod
+    def from_renderer(cls, render, master_size=1024):
+        """调用一次绘制函数生成母版"""
+        with span(f"master {master_size}", "render"):
+            return cls(render(master_size))
+
+    @classmethod
+    def from_file(cls, path, master_size=None, mode='RGBA'):
+        """只解码一次源文件作为母版（必要时先统一调整为正方形母版尺寸）"""
+        with Image.open(path) as source:
+            master = source.convert(mode)
+        if master_size is None and master.width != master.height:
+            master_size = max(master.size)
+        if master_size is not None and master.size != (master_size, master_size):
+            master = master.resize((master_size, master_size), Image.Resampling.LANCZOS)
+        return cls(master)
+
+    def get(self, size):
+        """返回指定尺寸的图像（从最近的更大层级逐级缩小）"""
+        if size in self.levels:
+            return self.levels[size]
+
+        candidates = {**self._mips, **self.levels}
+        larger = [level for level in candidates if level > size]
+        if not larger:
+            raise ValueError(f"尺寸 {size} 超过母版尺寸 {self.master.width}")
+
+        base_size = min(larger)
+        base = candidates[base_size]
+
+        with span(f"{base_size} -> {size}", "resize"):
+            # 差距超过2倍时先用快速的2x盒式缩小，中间层级留给后续尺寸复用
+            while base_size >= size * 4:
+                base = base.reduce(2)
+                base_size = base.width
+                self._mips.setdefault(base_size, base)
+
+            # 最后一步使用高质量Lanczos算法
+            image = base.resize((size, size), Image.Resampling.LANCZOS)
+        self.levels[size] = image
+        return image
+
+    def build(self, sizes):
+        """按从大到小的顺序生成全部尺寸，返回 {尺寸: 图像}"""
+        for size in sorted(set(sizes), reverse=True):
+            self.get(size)
+        return {size: self.levels[size] for size in sizes}
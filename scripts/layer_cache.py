@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+静态图层合成缓存
+窗口背景、标题栏、交通灯等静态图层按 (宽, 高, 主题, ...) 只渲染一次，以预乘alpha的RGBA（Pillow的 "RGBa" 模式）保存；
+每个截图变体只重绘动态内容，静态图层和图标用预乘的 over 运算合成到画布上（有NumPy时向量化，否则退回 Image.alpha_composite）
+"""
+
+import os
+from collections import OrderedDict
+
+from PIL import Image
+
+try:
+    import numpy as np
+except ImportError:  # 没有NumPy时用Pillow合成
+    np = None
+
+# 内存中保留的图层数上限
+LAYER_CACHE_SIZE = 64
+
+
+def premultiply(image):
+    """转换为预乘alpha的 "RGBa" 图像"""
+    if image.mode == "RGBa":
+        return image
+    return image.convert("RGBA").convert("RGBa")
+
+
+def composite(canvas, layer, dest=(0, 0)):
+    """把预乘图层 over 到画布（RGB或RGBA，直接修改画布）的 dest 位置，超出画布的部分被裁掉"""
+    x, y = dest
+    left, top = max(0, x), max(0, y)
+    right, bottom = min(canvas.width, x + layer.width), min(canvas.height, y + layer.height)
+    if right <= left or bottom <= top:
+        return canvas
+    box = (left, top, right, bottom)
+    layer = premultiply(layer).crop((left - x, top - y, right - x, bottom - y))
+    if np is None:
+        below = canvas.crop(box).convert("RGBA")
+        canvas.paste(Image.alpha_composite(below, layer.convert("RGBA")).convert(canvas.mode), box)
+        return canvas
+    src = np.asarray(layer)
+    result = np.asarray(canvas.crop(box).convert("RGBA"))
+    src_alpha = src[..., 3]
+    # 不透明像素直接覆盖（预乘与非预乘相同），全透明像素保持不变，只有半透明像素需要混合
+    partial = np.nonzero((src_alpha > 0) & (src_alpha < 255))
+    blended = _over(src[partial].astype(np.uint32), result[partial].astype(np.uint32))
+    result = np.where((src_alpha == 255)[..., None], src, result)
+    result[partial] = blended
+    canvas.paste(Image.fromarray(result, "RGBA").convert(canvas.mode), box)
+    return canvas
+
+
+def _over(src, dst):
+    """预乘的src over 非预乘的dst（N×4 数组），返回非预乘结果"""
+    dst_alpha = dst[:, 3:]
+    dst_pre = np.concatenate([(dst[:, :3] * dst_alpha + 127) // 255, dst_alpha], axis=-1)
+    out = src + (dst_pre * (255 - src[:, 3:]) + 127) // 255
+    alpha = out[:, 3:]
+    color = np.where(alpha > 0, (out[:, :3] * 255 + alpha // 2) // np.maximum(alpha, 1), 0)
+    return np.concatenate([np.minimum(color, 255), alpha], axis=-1).astype(np.uint8)
+
+
+class LayerCache:
+    """按键缓存预乘图层的LRU；render() 只在未命中时调用"""
+
+    def __init__(self, capacity=LAYER_CACHE_SIZE):
+        self.capacity = capacity
+        self.layers = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, render):
+        if key in self.layers:
+            self.hits += 1
+            self.layers.move_to_end(key)
+            return self.layers[key]
+        self.misses += 1
+        layer = premultiply(render())
+        self.layers[key] = layer
+        if len(self.layers) > self.capacity:
+            self.layers.popitem(last=False)
+        return layer
+
+    def __contains__(self, key):
+        return key in self.layers
+
+    def info(self):
+        return {"hits": self.hits, "misses": self.misses, "layers": len(self.layers)}
+
+
+_default_cache = LayerCache()
+
+
+def default_cache():
+    """进程内共享的图层缓存"""
+    return _default_cache
+
+
+def load_image_layer(path, size, cache=None):
+    """读取图片并在预乘空间缩放到 size，按 (路径, 修改时间, 尺寸) 缓存，不再每次从磁盘重新打开"""
+    key = ("image", os.path.abspath(path), os.path.getmtime(path), tuple(size))
+
+    def render():
+        with Image.open(path) as source:
+            return premultiply(source).resize(tuple(size), Image.Resampling.LANCZOS)
+
+    return (cache or _default_cache).get(key, render)
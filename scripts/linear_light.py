@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+线性光、预乘alpha的浮点图像管线
+源图只解码一次并转换为 float32 的线性光预乘RGBA数组，缩放（resample 引擎）和背景合成都在这个空间中完成
+（避免sRGB空间缩放变暗、非预乘alpha在透明边缘产生暗边），只在编码前转换回8位sRGB
+"""
+
+import numpy as np
+from PIL import Image
+
+import resample
+from profiling import span
+
+# 8位sRGB -> 线性光的查找表
+SRGB_TO_LINEAR = np.where(
+    np.arange(256) / 255.0 <= 0.04045,
+    np.arange(256) / 255.0 / 12.92,
+    ((np.arange(256) / 255.0 + 0.055) / 1.055) ** 2.4,
+).astype(np.float32)
+# 线性光 -> 8位sRGB 的查找表（线性值量化为16位后查表，暗部精度也足够）
+_ENCODE_STEPS = 65535
+_levels = np.arange(_ENCODE_STEPS + 1) / _ENCODE_STEPS
+LINEAR_TO_SRGB = np.round(255 * np.where(
+    _levels <= 0.0031308, _levels * 12.92, 1.055 * _levels ** (1 / 2.4) - 0.055)).astype(np.uint8)
+del _levels
+
+
+def linear_to_srgb(values):
+    """线性光浮点值（0~1）转换为8位sRGB"""
+    index = np.clip(values * _ENCODE_STEPS + 0.5, 0, _ENCODE_STEPS).astype(np.int32)
+    return LINEAR_TO_SRGB[index]
+
+
+def from_image(image):
+    """PIL图像 -> 线性光预乘 float32 数组 (H, W, 4)"""
+    rgba = np.asarray(image.convert("RGBA"))
+    pixels = np.empty(rgba.shape, dtype=np.float32)
+    pixels[..., 3] = rgba[..., 3] * np.float32(1 / 255)
+    pixels[..., :3] = SRGB_TO_LINEAR[rgba[..., :3]] * pixels[..., 3:]
+    return pixels
+
+
+def to_image(pixels, mode="RGBA"):
+    """线性光预乘数组 -> 8位sRGB的PIL图像（RGB模式直接丢弃alpha，与 convert('RGB') 一致）"""
+    alpha = pixels[..., 3:]
+    alpha8 = np.clip(alpha * 255 + 0.5, 0, 255).astype(np.uint8)
+    # 量化后alpha为0的像素按全透明处理，避免极小的alpha还原出可见的颜色
+    with np.errstate(divide="ignore", invalid="ignore"):
+        color = np.where(alpha8 > 0, pixels[..., :3] / alpha, 0)
+    rgb = linear_to_srgb(color)
+    if mode == "RGB":
+        return Image.fromarray(rgb, "RGB")
+    out = np.concatenate([rgb, alpha8], axis=-1)
+    image = Image.fromarray(out, "RGBA")
+    return image if mode == "RGBA" else image.convert(mode)
+
+
+def background(color):
+    """把8位sRGB的纯色背景转换为线性光预乘的4元向量（所有尺寸共用，无需分配整幅背景图像）"""
+    r, g, b, *a = color
+    alpha = (a[0] if a else 255) / 255
+    return np.array([*(SRGB_TO_LINEAR[[r, g, b]] * alpha), alpha], dtype=np.float32)
+
+
+def over(pixels, color):
+    """把图像合成到纯色背景上（预乘 over：src + bg * (1 - src_alpha)）"""
+    return pixels + color * (1 - pixels[..., 3:])
+
+
+def reduce2(pixels):
+    """精确的2x盒式缩小（预乘线性光中取平均）"""
+    height, width = pixels.shape[0] // 2 * 2, pixels.shape[1] // 2 * 2
+    view = pixels[:height, :width].reshape(height // 2, 2, width // 2, 2, 4)
+    return view.mean(axis=(1, 3), dtype=np.float32)
+
+
+def resize(pixels, size, kernel="auto", threads=None):
+    """用 resample 引擎缩放到 size=(宽, 高)，结果限制在合法的预乘范围内"""
+    return clamp(resample.resize(pixels, size, kernel, threads))
+
+
+def resize_image(image, size, kernel="auto", mode="RGBA"):
+    """在线性光预乘空间中缩放PIL图像，返回8位图像"""
+    return to_image(resize(from_image(image), size, kernel), mode)
+
+
+def clamp(pixels):
+    """去掉Lanczos振铃产生的越界值：alpha限制在0~1，颜色不超过alpha"""
+    pixels[..., 3] = np.clip(pixels[..., 3], 0, 1)
+    np.clip(pixels[..., :3], 0, pixels[..., 3:], out=pixels[..., :3])
+    return pixels
+
+
+class LinearPyramid:
+    """
+    线性光预乘空间中的图标尺寸金字塔，接口与 IconPyramid 一致：
+    get() 返回8位RGBA图像（按需转换并缓存），pixels() 返回浮点数组供后续合成
+    """
+
+    def __init__(self, master, kernel="auto", master_image=None):
+        if master.shape[0] != master.shape[1]:
+            raise ValueError(f"母版必须是正方形: {master.shape[1]}x{master.shape[0]}")
+        self.size = master.shape[0]
+        self.kernel = kernel
+        self.levels = {self.size: master}
+        self._mips = {}
+        # 母版本身已是8位图像时直接输出，不经过浮点往返
+        self._images = {self.size: master_image} if master_image is not None else {}
+
+    @classmethod
+    def from_renderer(cls, render, master_size=1024, kernel="auto"):
+        """调用一次绘制函数生成母版"""
+        with span(f"master {master_size}", "render"):
+            image = render(master_size).convert("RGBA")
+        return cls(from_image(image), kernel, image)
+
+    @classmethod
+    def from_file(cls, path, master_size=None, kernel="auto"):
+        """只解码一次源文件作为母版（必要时先在线性光中统一调整为正方形母版尺寸）"""
+        with Image.open(path) as source:
+            master = from_image(source)
+        height, width = master.shape[:2]
+        if master_size is None and width != height:
+            master_size = max(width, height)
+        if master_size is not None and (width, height) != (master_size, master_size):
+            master = resize(master, (master_size, master_size), kernel)
+        return cls(master, kernel)
+
+    def pixels(self, size):
+        """返回指定尺寸的浮点数组（从最近的更大层级逐级缩小）"""
+        if size in self.levels:
+            return self.levels[size]
+        candidates = {**self._mips, **self.levels}
+        larger = [level for level in candidates if level > size]
+        if not larger:
+            raise ValueError(f"尺寸 {size} 超过母版尺寸 {self.size}")
+        base_size = min(larger)
+        base = candidates[base_size]
+        with span(f"{base_size} -> {size}", "resize"):
+            while base_size >= size * 4:
+                base = reduce2(base)
+                base_size = base.shape[0]
+                self._mips.setdefault(base_size, base)
+            pixels = resize(base, (size, size), self.kernel)
+        self.levels[size] = pixels
+        return pixels
+
+    def get(self, size):
+        """返回指定尺寸的8位RGBA图像"""
+        if size not in self._images:
+            self._images[size] = to_image(self.pixels(size))
+        return self._images[size]
+
+    def build(self, sizes):
+        """按从大到小的顺序生成全部尺寸，返回 {尺寸: 浮点数组}"""
+        for size in sorted(set(sizes), reverse=True):
+            self.pixels(size)
+        return {size: self.levels[size] for size in sizes}
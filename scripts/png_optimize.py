@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+无损PNG体积优化
+导出完成后对图标集和截图逐个尝试：无损调色板、位深缩减（灰度/低位调色板）、
+去除元数据块，以及多种行过滤 × deflate策略的组合（并行试压缩），保留最小且像素完全一致的结果
+"""
+
+import argparse
+import glob
+import io
+import os
+import struct
+import sys
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+from PIL import Image
+
+from export_scheduler import ExportTask, add_jobs_argument, resolve_jobs, run_exports
+from png_stream import FILTERS, PNG_SIGNATURE, filter_rows, png_chunk
+
+DEFAULT_TARGETS = [
+    "macos/Runner/Assets.xcassets/AppIcon.appiconset/*.png",
+    "screenshots/*.png",
+]
+
+# 影响颜色显示的辅助块予以保留，其余（文本、时间、物理尺寸等）全部去除
+COLOR_CHUNKS = (b"gAMA", b"cHRM", b"sRGB", b"iCCP")
+TRIAL_FILTERS = (*FILTERS, "adaptive")
+STRATEGIES = {
+    "default": zlib.Z_DEFAULT_STRATEGY,
+    "filtered": zlib.Z_FILTERED,
+    "rle": zlib.Z_RLE,
+}
+
+
+@dataclass
+class Representation:
+    """一种无损的像素编码方式：PNG颜色类型、位深和打包后的扫描行"""
+    label: str
+    color_type: int
+    bit_depth: int
+    rows: np.ndarray
+    bpp: int
+    chunks: tuple = ()
+
+
+@dataclass
+class OptimizeResult:
+    """单个文件的优化结果"""
+    path: str
+    before: int
+    after: int
+    encoding: str = ""
+
+
+def read_chunks(data):
+    """解析PNG文件为 [(类型, 数据)]"""
+    if not data.startswith(PNG_SIGNATURE):
+        raise ValueError("不是PNG文件")
+    chunks, offset = [], len(PNG_SIGNATURE)
+    while offset < len(data):
+        length, tag = struct.unpack(">I4s", data[offset:offset + 8])
+        chunks.append((tag, data[offset + 8:offset + 8 + length]))
+        offset += 12 + length
+    return chunks
+
+
+def pack_bits(values, depth):
+    """把 (高, 宽) 的小整数按位深打包为扫描行字节"""
+    if depth == 8:
+        return values.astype(np.uint8)
+    per_byte = 8 // depth
+    height, width = values.shape
+    padded = np.zeros((height, -(-width // per_byte) * per_byte), dtype=np.uint8)
+    padded[:, :width] = values
+    groups = padded.reshape(height, -1, per_byte)
+    shifts = (8 - depth * (np.arange(per_byte) + 1)).astype(np.uint8)
+    return (groups << shifts).sum(axis=2).astype(np.uint8)
+
+
+def _depth_for_count(count):
+    for depth in (1, 2, 4):
+        if count <= 1 << depth:
+            return depth
+    return 8
+
+
+def representations(image):
+    """列出图像所有可行的无损编码方式"""
+    rgba = np.asarray(image.convert("RGBA"))
+    height, width, _ = rgba.shape
+    opaque = bool((rgba[..., 3] == 255).all())
+    gray = bool(((rgba[..., 0] == rgba[..., 1]) & (rgba[..., 1] == rgba[..., 2])).all())
+    options = []
+
+    if opaque:
+        options.append(Representation("RGB", 2, 8, rgba[..., :3].reshape(height, -1), 3))
+    else:
+        options.append(Representation("RGBA", 6, 8, rgba.reshape(height, -1), 4))
+
+    if gray and opaque:
+        levels = rgba[..., 0]
+        depth = 8
+        for candidate in (1, 2, 4):
+            step = 255 // ((1 << candidate) - 1)
+            if not (levels % step).any():
+                depth = candidate
+                break
+        values = levels // (255 // ((1 << depth) - 1))
+        options.append(Representation(f"灰度 {depth}位", 0, depth, pack_bits(values, depth), 1))
+    elif gray:
+        options.append(Representation("灰度+透明", 4, 8, rgba[..., [0, 3]].reshape(height, -1), 2))
+
+    # 颜色数不超过256时可以无损转为调色板
+    packed = rgba.view(np.uint32).reshape(height, width)
+    colors = np.unique(packed)
+    if len(colors) <= 256:
+        palette = colors.view(np.uint8).reshape(-1, 4)
+        # 半透明颜色排在前面，tRNS只需覆盖到最后一个非不透明项
+        order = np.argsort(palette[:, 3] == 255, kind="stable")
+        palette, colors = palette[order], colors[order]
+        lookup = np.argsort(colors)
+        indices = lookup[np.searchsorted(colors[lookup], packed)]
+        depth = _depth_for_count(len(colors))
+        chunks = [(b"PLTE", palette[:, :3].tobytes())]
+        translucent = int((palette[:, 3] < 255).sum())
+        if translucent:
+            chunks.append((b"tRNS", palette[:translucent, 3].tobytes()))
+        options.append(Representation(f"调色板 {len(colors)}色 {depth}位", 3, depth,
+                                      pack_bits(indices, depth), 1, tuple(chunks)))
+    return options
+
+
+def _compress(filtered, strategy):
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 15, 9, strategy)
+    return compressor.compress(filtered) + compressor.flush()
+
+
+def encode(representation, width, height, idat, extra_chunks=()):
+    """组装PNG文件字节"""
+    header = struct.pack(">IIBBBBB", width, height, representation.bit_depth,
+                         representation.color_type, 0, 0, 0)
+    parts = [PNG_SIGNATURE, png_chunk(b"IHDR", header)]
+    parts += [png_chunk(tag, data) for tag, data in extra_chunks]
+    parts += [png_chunk(tag, data) for tag, data in representation.chunks]
+    parts += [png_chunk(b"IDAT", idat), png_chunk(b"IEND", b"")]
+    return b"".join(parts)
+
+
+def optimize_bytes(data, threads=1):
+    """返回 (最小的无损编码, 编码说明)；没有更小的结果时返回原数据"""
+    image = Image.open(io.BytesIO(data))
+    image.load()
+    if image.mode not in ("1", "L", "LA", "P", "RGB", "RGBA"):
+        return data, "跳过（不支持的模式）"
+    reference = np.asarray(image.convert("RGBA"))
+    kept = [(tag, body) for tag, body in read_chunks(data) if tag in COLOR_CHUNKS]
+
+    trials = []
+    for rep in representations(image):
+        prior = np.zeros(rep.rows.shape[1], dtype=np.uint8)
+        for name in TRIAL_FILTERS:
+            filtered = filter_rows(rep.rows, prior, rep.bpp, name).tobytes()
+            for strategy_name, strategy in STRATEGIES.items():
+                trials.append((rep, f"{rep.label}, {name}, {strategy_name}", filtered, strategy))
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        idats = list(pool.map(lambda t: _compress(t[2], t[3]), trials))
+
+    best, label = data, "保持原样"
+    # 从小到大验证，第一个解码后像素完全一致的就是结果
+    for index in sorted(range(len(trials)), key=lambda i: len(idats[i])):
+        rep, description = trials[index][:2]
+        candidate = encode(rep, image.width, image.height, idats[index], kept)
+        if len(candidate) >= len(best):
+            break
+        decoded = Image.open(io.BytesIO(candidate))
+        if np.array_equal(np.asarray(decoded.convert("RGBA")), reference):
+            best, label = candidate, description
+            break
+    return best, label
+
+
+def optimize_file(path, threads=1, dry_run=False):
+    """优化单个文件（原地替换），返回OptimizeResult"""
+    with open(path, "rb") as f:
+        data = f.read()
+    optimized, label = optimize_bytes(data, threads)
+    if optimized is not data and not dry_run:
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(optimized)
+        os.replace(tmp_path, path)
+    return OptimizeResult(path, len(data), len(optimized), label)
+
+
+def optimize_files(paths, jobs=None, dry_run=False):
+    """并行优化多个文件，返回与paths顺序一致的ExportResult列表"""
+    paths = list(paths)
+    workers = resolve_jobs(jobs, len(paths))
+    threads = max(1, resolve_jobs(jobs, 64) // workers)
+    tasks = [ExportTask(os.path.basename(path), optimize_file, (path, threads, dry_run),
+                        weight=os.path.getsize(path)) for path in paths]
+    return run_exports(tasks, jobs)
+
+
+def print_report(results):
+    """打印优化前后的字节对比"""
+    before = after = 0
+    for result in results:
+        if not result.ok:
+            print(f"  ❌ {result.label}: {result.error}")
+            continue
+        r = result.value
+        before += r.before
+        after += r.after
+        saved = (1 - r.after / r.before) * 100 if r.before else 0
+        print(f"  {'✅' if r.after < r.before else '➖'} {r.path}: "
+              f"{r.before / 1024:.1f}KB -> {r.after / 1024:.1f}KB (-{saved:.1f}%) [{r.encoding}]")
+    if before:
+        print(f"📦 合计: {before / 1024:.1f}KB -> {after / 1024:.1f}KB "
+              f"(节省 {(before - after) / 1024:.1f}KB, {(1 - after / before) * 100:.1f}%)")
+
+
+def expand_targets(targets):
+    paths = []
+    for target in targets:
+        if os.path.isdir(target):
+            target = os.path.join(target, "*.png")
+        paths.extend(sorted(glob.glob(target)))
+    return list(dict.fromkeys(paths))
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="无损压缩PNG资源（图标集、截图）")
+    parser.add_argument("targets", nargs="*", help="文件、目录或通配符（默认图标集和screenshots）")
+    add_jobs_argument(parser)
+    parser.add_argument("--dry-run", action="store_true", help="只报告可节省的字节数，不修改文件")
+    args = parser.parse_args(argv)
+
+    paths = expand_targets(args.targets or DEFAULT_TARGETS)
+    if not paths:
+        print("❌ 没有找到PNG文件")
+        return 1
+    print(f"🗜️ 无损优化 {len(paths)} 个PNG文件...")
+    results = optimize_files(paths, args.jobs, args.dry_run)
+    print_report(results)
+    return 0 if all(result.ok for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
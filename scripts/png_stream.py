@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+流式PNG编码
+所有生成脚本共用的PNG输出后端：可指定zlib压缩级别和行过滤策略，
+大图按数据块并行deflate（pigz方式），并报告每个文件的编码耗时和字节数；
+图像可按水平条带渲染，像素行立即送入压缩流，整幅图像从不同时驻留内存
+"""
+
+import io
+import os
+import struct
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+try:
+    import numpy as np
+except ImportError:  # 未安装NumPy时只支持不过滤（filter=none）
+    np = None
+
+from profiling import span
+
+# 每个条带的像素数上限（RGBA约16MB），条带高度 = BAND_PIXELS // 宽度
+BAND_PIXELS = 4 * 1024 * 1024
+# 超过该尺寸时默认走分块渲染路径
+STREAM_THRESHOLD = 4096
+
+# 编码模式：fast用于开发时反复构建，max用于发布
+# 过滤方式除PNG的五种外：adaptive=逐行按libpng启发式选择，
+# trial=每组行用快速压缩试出最小的方式，exhaustive=按实际压缩级别试压缩
+PNG_MODES = {
+    "fast": {"level": 1, "filter": "none"},
+    "default": {"level": 6, "filter": "trial"},
+    "max": {"level": 9, "filter": "exhaustive"},
+}
+STRATEGIES = ("adaptive", "trial", "exhaustive")
+PNG_MODE_ENV = "XGDD_PNG_MODE"
+# 未指定jobs时并行deflate的线程数（默认CPU核心数；导出进程池的工作进程中为1，避免线程数超额）
+DEFLATE_JOBS_ENV = "XGDD_DEFLATE_JOBS"
+
+# 并行deflate的数据块大小，以及启用并行的最小原始数据量
+DEFLATE_BLOCK = 256 * 1024
+PARALLEL_MIN_BYTES = 2 * 1024 * 1024
+# 每个块用前一块末尾32KB作为预设字典，压缩率接近单线程
+DICTIONARY_SIZE = 32 * 1024
+# 行过滤每次处理的原始数据量（限制中间数组的内存）
+FILTER_CHUNK_BYTES = 1024 * 1024
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+COLOR_TYPES = {"L": (0, 1), "RGB": (2, 3), "RGBA": (6, 4)}
+FILTERS = {"none": 0, "sub": 1, "up": 2, "average": 3, "paeth": 4}
+
+
+@dataclass
+class EncodeStats:
+    """单个文件的编码结果"""
+    path: str
+    bytes: int
+    seconds: float
+    mode: str
+
+    def describe(self):
+        return f"{self.bytes / 1024:.1f}KB, {self.seconds * 1000:.0f}ms"
+
+
+def add_png_mode_argument(parser):
+    """为命令行解析器添加统一的 --png-mode 选项"""
+    parser.add_argument(
+        "--png-mode", choices=sorted(PNG_MODES), default=None,
+        help=f"PNG编码模式：fast=开发快速构建，max=发布最小体积（默认读取{PNG_MODE_ENV}，否则为default）")
+    return parser
+
+
+def set_png_mode(mode):
+    """设置默认编码模式（写入环境变量，进程池中的工作进程同样生效）"""
+    if mode:
+        os.environ[PNG_MODE_ENV] = mode
+
+
+def set_deflate_jobs(jobs):
+    """设置本进程（及其子进程）未指定jobs时的并行deflate线程数"""
+    os.environ[DEFLATE_JOBS_ENV] = str(jobs)
+
+
+def resolve_deflate_jobs(jobs=None):
+    if jobs is None or jobs <= 0:
+        jobs = int(os.environ.get(DEFLATE_JOBS_ENV, 0))
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    return jobs
+
+
+def resolve_mode(mode=None):
+    mode = mode or os.environ.get(PNG_MODE_ENV, "default")
+    if mode not in PNG_MODES:
+        raise ValueError(f"未知的PNG编码模式: {mode}")
+    return mode
+
+
+def png_chunk(tag, data):
+    return (struct.pack(">I", len(data)) + tag + data
+            + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF))
+
+
+# ---------------------------------------------------------------- 行过滤
+
+def filter_rows(rows, prior, bpp, method, level=6):
+    """
+    对 (行数, 行字节数) 的uint8数组做PNG行过滤，prior为上一行（首行为全0）
+    返回每行前带过滤类型字节的数据
+    """
+    height, stride = rows.shape
+    raw = rows.astype(np.int16)
+    up = np.vstack([prior[None, :], rows[:-1]]).astype(np.int16)
+    left = np.zeros_like(raw)
+    left[:, bpp:] = raw[:, :-bpp]
+    upper_left = np.zeros_like(raw)
+    upper_left[:, bpp:] = up[:, :-bpp]
+
+    def paeth():
+        p = left + up - upper_left
+        pa, pb, pc = np.abs(p - left), np.abs(p - up), np.abs(p - upper_left)
+        predictor = np.where((pa <= pb) & (pa <= pc), left, np.where(pb <= pc, up, upper_left))
+        return raw - predictor
+
+    candidates = {
+        "none": lambda: raw,
+        "sub": lambda: raw - left,
+        "up": lambda: raw - up,
+        "average": lambda: raw - ((left + up) >> 1),
+        "paeth": paeth,
+    }
+
+    out = np.empty((height, stride + 1), dtype=np.uint8)
+    if method in ("trial", "exhaustive"):
+        # 每组行分别用各过滤方式试压缩，取压缩结果最小的一种
+        trial_level = 1 if method == "trial" else level
+        trials = [filter_rows(rows, prior, bpp, name) for name in (*FILTERS, "adaptive")]
+        return min(trials, key=lambda data: len(zlib.compress(data.tobytes(), trial_level)))
+    if method == "adaptive":
+        # 逐行选择有符号字节绝对值之和最小的过滤方式（libpng的启发式规则）
+        names = list(FILTERS)
+        filtered = np.stack([candidates[name]().astype(np.uint8) for name in names])
+        cost = np.minimum(filtered, 256 - filtered.astype(np.int16)).sum(axis=2)
+        best = cost.argmin(axis=0)
+        out[:, 0] = [FILTERS[names[i]] for i in best]
+        out[:, 1:] = filtered[best, np.arange(height)]
+    else:
+        out[:, 0] = FILTERS[method]
+        out[:, 1:] = candidates[method]().astype(np.uint8)
+    return out
+
+
+# ---------------------------------------------------------------- deflate
+
+def _deflate_block(block, dictionary, level, final):
+    if dictionary:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15, zdict=dictionary)
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return compressor.compress(block) + compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class ParallelDeflate:
+    """
+    pigz方式的并行zlib流：数据切成固定大小的块分别压缩（zlib压缩时释放GIL），
+    非末尾块以sync flush对齐字节后直接拼接，adler32按原始数据顺序累计
+    """
+
+    def __init__(self, level, jobs, pool):
+        self.level = level
+        self.jobs = jobs
+        self._pool = pool
+        self._pending = bytearray()
+        self._dictionary = b""
+        self._adler = 1
+        self._header = zlib.compress(b"", level)[:2]
+
+    def compress(self, data):
+        self._pending += data
+        ready = len(self._pending) // (DEFLATE_BLOCK * self.jobs) * DEFLATE_BLOCK * self.jobs
+        if not ready:
+            return b""
+        return self._emit(ready, final=False)
+
+    def flush(self):
+        return self._emit(len(self._pending), final=True)
+
+    def _emit(self, length, final):
+        data = bytes(self._pending[:length])
+        del self._pending[:length]
+        self._adler = zlib.adler32(data, self._adler)
+
+        starts = list(range(0, len(data), DEFLATE_BLOCK)) or [0]
+        futures = []
+        for index, start in enumerate(starts):
+            if start >= DICTIONARY_SIZE:
+                dictionary = data[start - DICTIONARY_SIZE:start]
+            else:
+                dictionary = (self._dictionary + data[:start])[-DICTIONARY_SIZE:]
+            last = final and index == len(starts) - 1
+            futures.append(self._pool.submit(_deflate_block, data[start:start + DEFLATE_BLOCK],
+                                             dictionary, self.level, last))
+        self._dictionary = (self._dictionary + data)[-DICTIONARY_SIZE:]
+
+        out = self._header + b"".join(f.result() for f in futures)
+        self._header = b""
+        if final:
+            out += struct.pack(">I", self._adler & 0xFFFFFFFF)
+        return out
+
+
+# ---------------------------------------------------------------- 写入
+
+class PngStreamWriter:
+    """逐行写入PNG文件（8位 L/RGB/RGBA）；path也可以是已打开的二进制文件对象"""
+
+    def __init__(self, path, width, height, mode="RGBA", level=None, filter=None,
+                 png_mode=None, jobs=None):
+        if mode not in COLOR_TYPES:
+            raise ValueError(f"不支持的图像模式: {mode}")
+        self.png_mode = resolve_mode(png_mode)
+        preset = PNG_MODES[self.png_mode]
+        self.level = preset["level"] if level is None else level
+        self.filter = preset["filter"] if filter is None else filter
+        if self.filter not in STRATEGIES and self.filter not in FILTERS:
+            raise ValueError(f"未知的行过滤方式: {self.filter}")
+        if np is None:
+            self.filter = "none"
+
+        self.path = path
+        self.width = width
+        self.height = height
+        self.mode = mode
+        self.rows_written = 0
+        self._bpp = COLOR_TYPES[mode][1]
+        self._prior = bytes(width * self._bpp)
+        self._start = time.perf_counter()
+
+        raw_size = height * (width * self._bpp + 1)
+        jobs = resolve_deflate_jobs(jobs)
+        # 大图的行过滤和deflate都在线程池中按块并行（zlib和NumPy运算时释放GIL）
+        self._pool = None
+        if jobs > 1 and raw_size >= PARALLEL_MIN_BYTES:
+            self._pool = ThreadPoolExecutor(max_workers=jobs)
+            self._compressor = ParallelDeflate(self.level, jobs, self._pool)
+        else:
+            self._compressor = zlib.compressobj(self.level)
+
+        self._owns_file = not hasattr(path, "write")
+        self._file = open(path, "wb") if self._owns_file else path
+        self._offset = 0 if self._owns_file else self._file.tell()
+        color_type, _ = COLOR_TYPES[mode]
+        self._file.write(PNG_SIGNATURE)
+        self._file.write(png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0)))
+
+    def write(self, band):
+        """写入一个条带（PIL图像，宽度必须与整幅图像一致）"""
+        if band.mode != self.mode:
+            band = band.convert(self.mode)
+        if band.width != self.width:
+            raise ValueError(f"条带宽度 {band.width} 与图像宽度 {self.width} 不一致")
+        if self.rows_written + band.height > self.height:
+            raise ValueError("写入的行数超过图像高度")
+
+        stride = self.width * self._bpp
+        pixels = band.tobytes()
+        if self.filter == "none":
+            raw = bytearray(band.height * (stride + 1))
+            for row in range(band.height):
+                start = row * (stride + 1)
+                raw[start + 1:start + 1 + stride] = pixels[row * stride:(row + 1) * stride]
+            self._write_idat(self._compressor.compress(bytes(raw)))
+        else:
+            rows = np.frombuffer(pixels, dtype=np.uint8).reshape(band.height, stride)
+            prior = np.frombuffer(self._prior, dtype=np.uint8)
+            step = max(1, FILTER_CHUNK_BYTES // stride)
+            # 每组行的上一行都是原始数据，各组可以独立过滤
+            chunks = [(rows[top:top + step], rows[top - 1] if top else prior)
+                      for top in range(0, band.height, step)]
+            run = lambda chunk: filter_rows(chunk[0], chunk[1], self._bpp, self.filter, self.level)
+            for filtered in (self._pool.map(run, chunks) if self._pool else map(run, chunks)):
+                self._write_idat(self._compressor.compress(filtered.tobytes()))
+        self._prior = pixels[-stride:]
+        self.rows_written += band.height
+
+    def _write_idat(self, data):
+        if data:
+            self._file.write(png_chunk(b"IDAT", data))
+
+    def close(self):
+        """结束压缩流并返回编码统计"""
+        if self._compressor is None:
+            return None
+        try:
+            if self.rows_written != self.height:
+                raise ValueError(f"只写入了 {self.rows_written}/{self.height} 行")
+            self._write_idat(self._compressor.flush())
+            self._file.write(png_chunk(b"IEND", b""))
+            size = self._file.tell() - self._offset
+        finally:
+            self._release()
+        path = self.path if self._owns_file else getattr(self.path, "name", "<memory>")
+        return EncodeStats(path, size, time.perf_counter() - self._start, self.png_mode)
+
+    def _release(self):
+        self._compressor = None
+        if self._owns_file:
+            self._file.close()
+        if self._pool:
+            self._pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.stats = self.close()
+        elif self._compressor is not None:
+            self._release()
+
+
+def band_height(width, band_pixels=BAND_PIXELS):
+    """按像素预算计算条带高度"""
+    return max(1, band_pixels // width)
+
+
+def write_png(image, path, png_mode=None, level=None, filter=None, jobs=None):
+    """把内存中的图像编码为PNG，返回EncodeStats"""
+    if image.mode not in COLOR_TYPES:
+        image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+    step = band_height(image.width)
+    label = os.path.basename(path) if isinstance(path, str) else "buffer"
+    with span(label, "encode", size=f"{image.width}x{image.height}"), \
+            PngStreamWriter(path, image.width, image.height, image.mode, level, filter,
+                            png_mode, jobs) as writer:
+        for top in range(0, image.height, step):
+            writer.write(image.crop((0, top, image.width, min(image.height, top + step))))
+    return writer.stats
+
+
+def encode_png(image, png_mode=None, level=None, filter=None, jobs=None):
+    """把内存中的图像编码为PNG字节（用于嵌入.icns/.ico等容器）"""
+    buffer = io.BytesIO()
+    write_png(image, buffer, png_mode, level, filter, jobs)
+    return buffer.getvalue()
+
+
+def render_to_png(path, width, height, render_band, mode="RGBA", band_pixels=BAND_PIXELS,
+                  png_mode=None):
+    """
+    按水平条带渲染并流式编码为PNG，返回EncodeStats
+    render_band(top, rows) 返回 width x rows 的条带图像
+    """
+    step = band_height(width, band_pixels)
+    with PngStreamWriter(path, width, height, mode, png_mode=png_mode) as writer:
+        for top in range(0, height, step):
+            with span(f"rows {top}", "render"):
+                band = render_band(top, min(step, height - top))
+            with span(f"rows {top}", "encode"):
+                writer.write(band)
+    return writer.stats
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+轻量的性能埋点
+span(名称, 阶段) 标记 render / resize / encode / copy / subprocess 等阶段；未启用时 span() 直接返回共享的空上下文，没有额外开销。
+设置 XGDD_TRACE=trace.json（或命令行 --trace）后，每个进程把事件逐条追加到 trace.json.parts/<pid>.jsonl，
+子进程和工作进程通过环境变量自动加入；启用追踪的第一个进程退出时合并为 Chrome trace-event JSON
+（可用 chrome://tracing 或 Perfetto 打开）。
+设置 XGDD_PROFILE=目录（或 --profile）时，每个阶段的最外层 span 还会用 cProfile 采样，
+按 阶段-pid.prof 写入该目录；XGDD_PROFILER=pyinstrument 且已安装时改用 pyinstrument 输出HTML
+"""
+
+import atexit
+import contextlib
+import cProfile
+import glob
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from importlib.util import find_spec
+
+TRACE_ENV = "XGDD_TRACE"
+PROFILE_ENV = "XGDD_PROFILE"
+PROFILER_ENV = "XGDD_PROFILER"
+# 负责合并事件文件的进程（第一个启用追踪的进程）
+OWNER_ENV = "XGDD_TRACE_OWNER"
+
+_NULL_SPAN = contextlib.nullcontext()
+
+
+class Tracer:
+    """把本进程的事件逐条写入 parts 目录（每条立即落盘，工作进程被直接结束也不会丢失）"""
+
+    def __init__(self, trace_path=None, profile_dir=None, profiler="cprofile"):
+        self.trace_path = trace_path
+        self.profile_dir = profile_dir
+        # pyinstrument 只在选用且已安装时才导入，未启用分析时不增加启动时间
+        self.profiler = "pyinstrument" if profiler == "pyinstrument" and find_spec("pyinstrument") else "cprofile"
+        self._lock = threading.Lock()
+        self._pid = None
+        self._file = None
+        self._profiles = {}
+        self._active = threading.local()
+
+    @property
+    def parts_dir(self):
+        return self.trace_path + ".parts"
+
+    def _output(self):
+        # fork出的子进程继承了父进程的文件句柄，按pid重新打开
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            os.makedirs(self.parts_dir, exist_ok=True)
+            self._file = open(os.path.join(self.parts_dir, f"{self._pid}.jsonl"), "a", encoding="utf-8")
+            self._profiles = {}
+            self._write({"name": "process_name", "ph": "M", "pid": self._pid,
+                         "args": {"name": os.path.basename(sys.argv[0]) or "python"}})
+        return self._file
+
+    def _write(self, event):
+        self._file.write(json.dumps(event, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def record(self, name, category, start_us, duration_us, args):
+        if self.trace_path is None:
+            return
+        with self._lock:
+            self._output()
+            self._write({"name": name, "cat": category, "ph": "X", "ts": start_us, "dur": duration_us,
+                         "pid": self._pid, "tid": threading.get_native_id(), "args": args})
+
+    @contextlib.contextmanager
+    def span(self, name, category, args):
+        profiler = self._start_profile(category)
+        start = time.time_ns() // 1000
+        began = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            duration = (time.perf_counter_ns() - began) // 1000
+            if profiler is not None:
+                self._stop_profile(category, profiler)
+            self.record(name, category, start, duration, args)
+
+    def _start_profile(self, category):
+        # 同一时间只能有一个性能分析器工作，只分析最外层的span（并且只在主线程）
+        if self.profile_dir is None or getattr(self._active, "profiling", False) \
+                or threading.current_thread() is not threading.main_thread():
+            return None
+        self._active.profiling = True
+        if self.profiler == "pyinstrument":
+            import pyinstrument
+            profiler = pyinstrument.Profiler()
+            profiler.start()
+        else:
+            profiler = self._profiles.setdefault((os.getpid(), category), cProfile.Profile())
+            profiler.enable()
+        return profiler
+
+    def _stop_profile(self, category, profiler):
+        self._active.profiling = False
+        os.makedirs(self.profile_dir, exist_ok=True)
+        path = os.path.join(self.profile_dir, f"{category}-{os.getpid()}")
+        if self.profiler == "pyinstrument":
+            profiler.stop()
+            # 每次span单独一份报告
+            with open(f"{path}-{time.time_ns()}.html", "w", encoding="utf-8") as f:
+                f.write(profiler.output_html())
+        else:
+            # 同一阶段的多次span累计在一个 .prof 中
+            profiler.disable()
+            profiler.dump_stats(path + ".prof")
+
+
+_tracer = None
+
+
+def _configure_from_env():
+    global _tracer
+    trace_path = os.environ.get(TRACE_ENV) or None
+    profile_dir = os.environ.get(PROFILE_ENV) or None
+    if trace_path is None and profile_dir is None:
+        _tracer = None
+        return
+    _tracer = Tracer(os.path.abspath(trace_path) if trace_path else None,
+                     os.path.abspath(profile_dir) if profile_dir else None,
+                     os.environ.get(PROFILER_ENV, "cprofile"))
+    if trace_path and not os.environ.get(OWNER_ENV):
+        # 被中断的上一次追踪可能留下事件文件，接管时先清空，以免合并进本次的trace
+        shutil.rmtree(_tracer.parts_dir, ignore_errors=True)
+        os.environ[OWNER_ENV] = str(os.getpid())
+        atexit.register(export_trace)
+
+
+def enable(trace_path=None, profile_dir=None, profiler=None):
+    """在本进程启用追踪/性能分析；写入环境变量，之后启动的子进程自动加入"""
+    if trace_path:
+        os.environ[TRACE_ENV] = os.path.abspath(trace_path)
+        os.environ.pop(OWNER_ENV, None)
+    if profile_dir:
+        os.environ[PROFILE_ENV] = os.path.abspath(profile_dir)
+    if profiler:
+        os.environ[PROFILER_ENV] = profiler
+    _configure_from_env()
+
+
+def enabled():
+    return _tracer is not None
+
+
+def span(name, category="stage", **args):
+    """标记一个阶段：with span("1024x1024", "encode"): ...（未启用时没有开销）"""
+    if _tracer is None:
+        return _NULL_SPAN
+    return _tracer.span(name, category, args)
+
+
+def export_trace():
+    """合并各进程的事件文件为 Chrome trace JSON（只有第一个启用追踪的进程负责合并），返回输出路径"""
+    if _tracer is None or _tracer.trace_path is None or os.environ.get(OWNER_ENV) != str(os.getpid()):
+        return None
+    if _tracer._file is not None:
+        _tracer._file.close()
+        _tracer._pid = None
+    events = []
+    for path in sorted(glob.glob(os.path.join(_tracer.parts_dir, "*.jsonl"))):
+        with open(path, encoding="utf-8") as f:
+            events.extend(json.loads(line) for line in f if line.strip())
+    if not events:
+        return None
+    with open(_tracer.trace_path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+    shutil.rmtree(_tracer.parts_dir, ignore_errors=True)
+    os.environ.pop(OWNER_ENV, None)
+    return _tracer.trace_path
+
+
+def summarize(trace_path):
+    """按阶段汇总trace文件中的总耗时（秒），从大到小排列"""
+    with open(trace_path, encoding="utf-8") as f:
+        events = json.load(f)["traceEvents"]
+    totals = {}
+    for event in events:
+        if event.get("ph") == "X":
+            totals[event["cat"]] = totals.get(event["cat"], 0) + event["dur"] / 1e6
+    return sorted(totals.items(), key=lambda item: -item[1])
+
+
+def add_trace_arguments(parser):
+    """为命令行解析器添加统一的 --trace / --profile 选项"""
+    parser.add_argument("--trace", metavar="PATH", help="把各阶段耗时导出为Chrome trace JSON")
+    parser.add_argument("--profile", metavar="DIR", help="按阶段输出cProfile（或pyinstrument）分析结果")
+    return parser
+
+
+def enable_from_args(args):
+    """根据 add_trace_arguments 添加的选项启用追踪"""
+    if getattr(args, "trace", None) or getattr(args, "profile", None):
+        enable(args.trace, args.profile)
+
+
+_configure_from_env()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+内容寻址的渲染缓存
+缓存键由SVG内容、目标尺寸、转换工具及其版本、生成代码版本共同决定；
+命中时以reflink/硬链接放置到目标位置（转换工具写入前先删除旧输出，避免改写缓存对象），按最近使用时间淘汰超出容量的条目
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from profiling import span
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "xgdd-assets", "renders")
+DEFAULT_MAX_MB = 256
+
+
+def file_digest(path):
+    """计算文件内容的SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def code_fingerprint(*paths):
+    """由生成代码文件内容得到代码版本（代码修改后缓存自动失效）"""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def render_key(svg_path, size, converter, converter_version, code_version):
+    """计算渲染结果的缓存键"""
+    digest = hashlib.sha256()
+    with open(svg_path, "rb") as f:
+        digest.update(f.read())
+    for part in (str(size), converter, converter_version or "", code_version or ""):
+        digest.update(b"\0" + part.encode())
+    return digest.hexdigest()
+
+
+def _reflink(src, dst):
+    """尝试写时复制克隆文件（Linux FICLONE / macOS clonefile），不支持时返回False"""
+    if sys.platform == "darwin":
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        if not hasattr(libc, "clonefile"):
+            return False
+        return libc.clonefile(os.fsencode(src), os.fsencode(dst), 0) == 0
+    if sys.platform.startswith("linux"):
+        import fcntl
+        FICLONE = 0x40049409
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            try:
+                fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+                return True
+            except OSError:
+                pass
+        os.unlink(dst)
+    return False
+
+
+def link_file(src, dst):
+    """把文件放到目标位置：优先reflink，其次硬链接，最后普通复制"""
+    with span(os.path.basename(dst), "copy"):
+        return _place_file(src, dst)
+
+
+def copy_file(src, dst):
+    """复制到会被就地编辑的位置：优先reflink，否则普通复制，不与缓存对象共享硬链接"""
+    with span(os.path.basename(dst), "copy"):
+        return _place_file(src, dst, hardlink=False)
+
+
+def _place_file(src, dst, hardlink=True):
+    if os.path.lexists(dst):
+        os.unlink(dst)
+    try:
+        if _reflink(src, dst):
+            return "reflink"
+    except OSError:
+        pass
+    if hardlink:
+        try:
+            os.link(src, dst)
+            return "hardlink"
+        except OSError:
+            pass
+    shutil.copy2(src, dst)
+    return "copy"
+
+
+class RenderCache:
+    """磁盘渲染缓存，索引记录内容摘要、大小和最近使用时间"""
+
+    def __init__(self, root=None, max_bytes=None):
+        self.root = root or os.environ.get("XGDD_CACHE_DIR", DEFAULT_CACHE_DIR)
+        if max_bytes is None:
+            max_bytes = int(os.environ.get("XGDD_CACHE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(self.root, "index.json")
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+        self.index = self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _entry_path(self, key):
+        return os.path.join(self.root, "objects", key[:2], f"{key}.png")
+
+    def fetch(self, key, dst):
+        """缓存命中时把结果放到dst并返回True"""
+        with self._lock:
+            meta = self.index.get(key)
+            entry = self._entry_path(key)
+            if not meta or not os.path.exists(entry):
+                return False
+            # 硬链接出去的文件可能被就地修改过，校验内容后再使用
+            if file_digest(entry) != meta["digest"]:
+                self._remove(key)
+                return False
+            meta["used"] = time.time()
+        link_file(entry, dst)
+        return True
+
+    def store(self, key, src):
+        """把新渲染的结果存入缓存"""
+        entry = self._entry_path(key)
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(entry), suffix=".tmp")
+        os.close(fd)
+        shutil.copyfile(src, tmp_path)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, entry)
+        with self._lock:
+            self.index[key] = {
+                "digest": file_digest(entry),
+                "bytes": os.path.getsize(entry),
+                "used": time.time(),
+            }
+
+    def _remove(self, key):
+        self.index.pop(key, None)
+        try:
+            os.unlink(self._entry_path(key))
+        except OSError:
+            pass
+
+    def evict(self):
+        """按最近使用时间淘汰条目，直到总大小不超过上限"""
+        with self._lock:
+            total = sum(meta["bytes"] for meta in self.index.values())
+            for key in sorted(self.index, key=lambda k: self.index[k]["used"]):
+                if total <= self.max_bytes:
+                    break
+                total -= self.index[key]["bytes"]
+                self._remove(key)
+
+    def save(self):
+        """淘汰超额条目并原子写回索引"""
+        self.evict()
+        with self._lock:
+            fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(self.index, f)
+            os.replace(tmp_path, self.index_path)
+
+
+def main():
+    """供shell脚本使用的命令行接口：fetch命中返回0，未命中返回1"""
+    from converter_runner import converter_version
+
+    parser = argparse.ArgumentParser(description="SVG渲染缓存")
+    parser.add_argument("action", choices=["fetch", "store"])
+    parser.add_argument("svg")
+    parser.add_argument("size", type=int)
+    parser.add_argument("converter")
+    parser.add_argument("output")
+    parser.add_argument("--code", action="append", default=[],
+                        help="参与缓存键计算的生成脚本（可重复）")
+    args = parser.parse_args()
+
+    cache = RenderCache()
+    key = render_key(args.svg, args.size, args.converter,
+                     converter_version(args.converter), code_fingerprint(*args.code))
+    if args.action == "fetch":
+        hit = cache.fetch(key, args.output)
+        cache.save()
+        return 0 if hit else 1
+    cache.store(key, args.output)
+    cache.save()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
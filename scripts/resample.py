@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+可分离卷积重采样引擎
+每个 (源尺寸, 目标尺寸, 卷积核) 的权重预先计算为 目标×源 的矩阵（进程内缓存，并写入磁盘缓存供后续运行复用），
+先纵向、后横向各做一遍矩阵乘法，每个输出块只乘权重非零的源区间；两遍都按行分块在线程池中执行（NumPy矩阵乘法会释放GIL）。
+输入是 float32 数组（通常是 linear_light 的线性光预乘RGBA），颜色空间由调用方负责
+"""
+
+import hashlib
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+
+DEFAULT_WEIGHT_DIR = os.path.join(os.path.expanduser("~"), ".cache", "xgdd-assets", "resample")
+# 权重算法变化时递增，旧的磁盘缓存自动失效
+WEIGHTS_VERSION = 1
+# 每个线程处理的最少行数，行数太少时不值得分发
+MIN_ROWS_PER_THREAD = 32
+# 输出按块做矩阵乘法，每块只乘权重非零的源区间（权重矩阵是带状的）
+BLOCK = 64
+
+
+def _box(x):
+    return ((x >= -0.5) & (x < 0.5)).astype(np.float64)
+
+
+def _lanczos3(x):
+    return np.where(np.abs(x) < 3, np.sinc(x) * np.sinc(x / 3), 0.0)
+
+
+def _mitchell(x, b=1 / 3, c=1 / 3):
+    x = np.abs(x)
+    near = ((12 - 9 * b - 6 * c) * x ** 3 + (-18 + 12 * b + 6 * c) * x ** 2 + (6 - 2 * b)) / 6
+    far = ((-b - 6 * c) * x ** 3 + (6 * b + 30 * c) * x ** 2 + (-12 * b - 48 * c) * x + (8 * b + 24 * c)) / 6
+    return np.where(x < 1, near, np.where(x < 2, far, 0.0))
+
+
+# 卷积核: (函数, 支撑半径)
+KERNELS = {
+    "box": (_box, 0.5),
+    "lanczos3": (_lanczos3, 3.0),
+    "mitchell": (_mitchell, 2.0),
+}
+
+
+def choose_kernel(src, dst, kernel="auto"):
+    """auto：正好缩小2倍时用盒式滤波（精确平均），其余用Lanczos3"""
+    if kernel != "auto":
+        if kernel not in KERNELS:
+            raise ValueError(f"未知的卷积核: {kernel}（可选: auto, {', '.join(KERNELS)}）")
+        return kernel
+    return "box" if src == dst * 2 else "lanczos3"
+
+
+def compute_weights(src, dst, kernel):
+    """计算 dst×src 的权重矩阵（每行归一化，超出边界的采样点直接丢弃）"""
+    func, support = KERNELS[kernel]
+    scale = src / dst
+    filter_scale = max(scale, 1.0)
+    centers = (np.arange(dst) + 0.5) * scale
+    distance = (np.arange(src) + 0.5)[None, :] - centers[:, None]
+    weights = func(distance / filter_scale)
+    weights[np.abs(distance) >= support * filter_scale] = 0
+    totals = weights.sum(axis=1, keepdims=True)
+    weights = np.divide(weights, totals, out=np.zeros_like(weights), where=totals != 0)
+    return weights.astype(np.float32)
+
+
+def _weight_dir():
+    return os.environ.get("XGDD_WEIGHT_CACHE_DIR", DEFAULT_WEIGHT_DIR)
+
+
+def _cache_path(src, dst, kernel):
+    name = f"v{WEIGHTS_VERSION}-{kernel}-{src}-{dst}"
+    return os.path.join(_weight_dir(), hashlib.sha1(name.encode()).hexdigest()[:2], f"{name}.npy")
+
+
+@lru_cache(maxsize=256)
+def weights(src, dst, kernel):
+    """取得权重矩阵：先查进程内缓存，再查磁盘缓存，最后计算并写回磁盘（写入失败不影响结果）"""
+    path = _cache_path(src, dst, kernel)
+    try:
+        cached = np.load(path)
+        if cached.shape == (dst, src):
+            return cached
+    except (OSError, ValueError):
+        pass
+    result = compute_weights(src, dst, kernel)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, result)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+    return result
+
+
+@lru_cache(maxsize=256)
+def plan(src, dst, kernel):
+    """返回 (权重矩阵, [(输出起点, 输出终点, 源起点, 源终点)])"""
+    matrix = weights(src, dst, kernel)
+    blocks = []
+    for start in range(0, dst, BLOCK):
+        stop = min(dst, start + BLOCK)
+        columns = np.flatnonzero(matrix[start:stop].any(axis=0))
+        low, high = (columns[0], columns[-1] + 1) if len(columns) else (0, 1)
+        blocks.append((start, stop, int(low), int(high)))
+    return matrix, blocks
+
+
+def _chunks(total, threads, minimum=MIN_ROWS_PER_THREAD):
+    """把 [0, total) 分成最多 threads 段，每段至少 minimum 个"""
+    count = max(1, min(threads, total // minimum or 1))
+    bounds = np.linspace(0, total, count + 1).astype(int)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _run(chunks, work):
+    if len(chunks) == 1:
+        work(*chunks[0])
+        return
+    with ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+        list(pool.map(lambda bounds: work(*bounds), chunks))
+
+
+def resize(pixels, size, kernel="auto", threads=None):
+    """把 (H, W, C) 的 float32 数组缩放到 size=(宽, 高)"""
+    height, width, channels = pixels.shape
+    out_width, out_height = size
+    threads = threads or os.cpu_count() or 1
+    pixels = np.ascontiguousarray(pixels, dtype=np.float32)
+
+    if out_height != height:
+        vertical, blocks = plan(height, out_height, choose_kernel(height, out_height, kernel))
+        flat = pixels.reshape(height, width * channels)
+        columns = np.empty((out_height, width * channels), dtype=np.float32)
+
+        def vertical_pass(first, last):
+            for start, stop, low, high in blocks[first:last]:
+                np.matmul(vertical[start:stop, low:high], flat[low:high], out=columns[start:stop])
+
+        _run(_chunks(len(blocks), threads, 1), vertical_pass)
+        pixels = columns.reshape(out_height, width, channels)
+
+    if out_width != width:
+        horizontal, blocks = plan(width, out_width, choose_kernel(width, out_width, kernel))
+        rows = np.empty((out_height, out_width, channels), dtype=np.float32)
+
+        def horizontal_pass(first, last):
+            for start, stop, low, high in blocks:
+                np.matmul(horizontal[start:stop, low:high], pixels[first:last, low:high],
+                          out=rows[first:last, start:stop])
+
+        _run(_chunks(out_height, threads), horizontal_pass)
+        pixels = rows
+
+    return pixels
+
+
+def add_kernel_argument(parser):
+    """为命令行解析器添加统一的 --kernel 选项"""
+    parser.add_argument("--kernel", default="auto", choices=["auto", *KERNELS],
+                        help="缩放卷积核（auto：2倍缩小用box，其余用lanczos3）")
+    return parser
+
+
+def cache_info():
+    """返回权重缓存的命中统计"""
+    return {"weights": weights.cache_info(), "plans": plan.cache_info()}
@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+"""
+声明式截图场景
+场景文件（JSON，安装了PyYAML时也可用YAML）描述画布、静态图层（窗口背景、交通灯等）和内容图层；
+颜色写作 "$名称" 从主题中取值，文字写作 "@键" 从多语言字符串表中取值，坐标可以是含 W/H 的表达式；
+每个场景只编译一次，变体（主题 × 语言 × 缩放倍数 × 尺寸）在进程池中并行渲染；
+静态图层按内容、尺寸和主题只渲染一次（layer_cache），合成到各变体的画布上，每个变体只重绘动态内容
+"""
+
+import argparse
+import ast
+import copy
+import glob
+import hashlib
+import itertools
+import json
+import os
+import re
+import sys
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from PIL import Image, ImageColor, ImageDraw
+
+from export_scheduler import ExportTask, add_jobs_argument, run_exports
+from layer_cache import composite, default_cache, load_image_layer
+from png_stream import add_png_mode_argument, set_png_mode, write_png
+from profiling import span
+from text_layout import FontSpec, draw_centered, draw_in_box, draw_line, draw_wrapped, measure
+
+try:
+    import yaml
+except ImportError:  # 未安装PyYAML时只支持JSON场景
+    yaml = None
+
+SCENE_DIR = "assets/scenes"
+VARIANT_DIR = "screenshots/variants"
+
+SHAPES = ("rect", "rounded_rect", "ellipse")
+# 坐标参数中下标为偶数的是x，奇数的是y（网格偏移按此叠加）
+POINT_KEYS = ("box", "at", "center")
+TEMPLATE_FIELD = re.compile(r"\{(\w+)\}")
+
+
+@dataclass(frozen=True)
+class Variant:
+    """场景的一个渲染变体"""
+    theme: str
+    locale: str
+    scale: float = 1
+    size: tuple = None
+
+    def suffix(self):
+        scale = f"{self.scale:g}x"
+        size = f"-{self.size[0]}x{self.size[1]}" if self.size else ""
+        return f"{self.theme}-{self.locale}{size}@{scale}"
+
+
+@dataclass
+class Scene:
+    """编译后的场景：图层已展开为绘制指令，表达式保留为字符串（工作进程中按需编译并缓存）"""
+    name: str
+    size: tuple
+    mode: str
+    background: object
+    static: list
+    layers: list
+    themes: dict
+    strings: dict
+    default_locale: str
+    output: str = None
+    variants: dict = field(default_factory=dict)
+    static_digest: str = ""
+    static_uses_strings: bool = False
+
+    def default_variant(self, scale=1):
+        return Variant(next(iter(self.themes), "light"), self.default_locale, scale)
+
+    def static_key(self, variant):
+        """静态图层的缓存键：内容相同的静态图层在不同场景、不同语言的变体之间共用"""
+        palette = json.dumps(self.themes.get(variant.theme, {}), sort_keys=True)
+        locale = variant.locale if self.static_uses_strings else None
+        return (self.static_digest, self._canvas_size(variant), palette, locale, variant.scale)
+
+    def _canvas_size(self, variant):
+        return tuple(variant.size or self.size)
+
+
+# ---------------------------------------------------------------- 编译
+
+def load_scene_source(path):
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            if yaml is None:
+                raise ImportError("读取YAML场景需要安装 PyYAML")
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def _fill_template(value, item):
+    """把模板中的 {字段} 替换为网格条目的值"""
+    if isinstance(value, str):
+        whole = TEMPLATE_FIELD.fullmatch(value)
+        if whole:
+            return item[whole.group(1)]
+        return TEMPLATE_FIELD.sub(lambda m: str(item[m.group(1)]), value)
+    if isinstance(value, list):
+        return [_fill_template(v, item) for v in value]
+    if isinstance(value, dict):
+        return {k: _fill_template(v, item) for k, v in value.items()}
+    return value
+
+
+def _offset_layer(layer, dx, dy):
+    """给图层的坐标加上偏移（表达式字符串形式）"""
+    layer = dict(layer)
+    for key in POINT_KEYS:
+        if key in layer:
+            layer[key] = [f"({value}) + ({dx if i % 2 == 0 else dy})" for i, value in enumerate(layer[key])]
+    if "fallback" in layer:
+        layer["fallback"] = [_offset_layer(child, dx, dy) for child in layer["fallback"]]
+    return layer
+
+
+def _expand(layers, dx=0, dy=0):
+    """展开 group / grid 为扁平的绘制指令列表"""
+    ops = []
+    for layer in layers:
+        kind = layer["type"]
+        if kind == "group":
+            ox, oy = layer.get("offset", [0, 0])
+            ops += _expand(layer["layers"], f"({dx}) + ({ox})", f"({dy}) + ({oy})")
+        elif kind == "grid":
+            ox, oy = layer.get("origin", [0, 0])
+            sx, sy = layer.get("step", [0, 0])
+            columns = layer.get("columns", 1)
+            for index, item in enumerate(layer["items"]):
+                col, row = index % columns, index // columns
+                children = _fill_template(copy.deepcopy(layer["layers"]), item)
+                ops += _expand(children, f"({dx}) + ({ox}) + {col} * ({sx})",
+                               f"({dy}) + ({oy}) + {row} * ({sy})")
+        elif kind in SHAPES or kind in ("text", "image"):
+            op = _offset_layer(layer, dx, dy) if (dx, dy) != (0, 0) else dict(layer)
+            if "fallback" in op:
+                op["fallback"] = _expand(op["fallback"])
+            ops.append(op)
+        else:
+            raise ValueError(f"未知的图层类型: {kind}")
+    return ops
+
+
+def _uses_strings(ops):
+    return any(isinstance(op.get("text"), str) and op["text"].startswith("@") for op in ops)
+
+
+def compile_scene(source, name="scene"):
+    """把场景描述编译为Scene（展开分组和网格、计算静态图层摘要）"""
+    static = _expand(source.get("static", []))
+    digest_source = json.dumps(static, sort_keys=True, ensure_ascii=False)
+    strings = source.get("strings", {})
+    return Scene(
+        name=source.get("name", name),
+        size=tuple(source["size"]),
+        mode=source.get("mode", "RGBA"),
+        background=source.get("background", [0, 0, 0, 0]),
+        static=static,
+        layers=_expand(source.get("layers", [])),
+        themes=source.get("themes", {"light": {}}),
+        strings=strings,
+        default_locale=source.get("default_locale", next(iter(strings), "zh")),
+        output=source.get("output"),
+        variants=source.get("variants", {}),
+        static_digest=hashlib.sha256(digest_source.encode("utf-8")).hexdigest()[:16],
+        static_uses_strings=_uses_strings(static),
+    )
+
+
+@lru_cache(maxsize=None)
+def load_scene(path):
+    """读取并编译场景文件（每个文件只编译一次）"""
+    return compile_scene(load_scene_source(path), os.path.splitext(os.path.basename(path))[0])
+
+
+# ---------------------------------------------------------------- 求值
+
+ALLOWED_NODES = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant, ast.Name, ast.Load,
+                 ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.USub, ast.UAdd)
+
+
+@lru_cache(maxsize=None)
+def _compile_expr(text):
+    tree = ast.parse(text, mode="eval")
+    for node in ast.walk(tree):
+        if not isinstance(node, ALLOWED_NODES) or (isinstance(node, ast.Name) and node.id not in ("W", "H")):
+            raise ValueError(f"不支持的坐标表达式: {text}")
+    return compile(tree, "<scene>", "eval")
+
+
+@lru_cache(maxsize=4096)
+def _evaluate(text, width, height):
+    """按逻辑尺寸求值（与缩放倍数无关），同一布局的各倍数共用求值结果"""
+    return eval(_compile_expr(text), {"__builtins__": {}}, {"W": width, "H": height})
+
+
+class Context:
+    """一个变体的求值环境：画布尺寸、缩放倍数、主题和语言"""
+
+    def __init__(self, scene, variant):
+        self.scene = scene
+        self.variant = variant
+        self.width, self.height = variant.size or scene.size
+        self.scale = variant.scale
+        self.palette = scene.themes.get(variant.theme) or next(iter(scene.themes.values()), {})
+        self.strings = scene.strings.get(variant.locale, {})
+        self.fallback_strings = scene.strings.get(scene.default_locale, {})
+
+    def number(self, value):
+        if isinstance(value, str):
+            value = _evaluate(value, self.width, self.height)
+        scaled = value * self.scale
+        return scaled if isinstance(scaled, int) else int(round(scaled))
+
+    def numbers(self, values):
+        return [self.number(value) for value in values]
+
+    def color(self, value, mode):
+        if isinstance(value, str) and value.startswith("$"):
+            value = self.palette[value[1:]]
+        if isinstance(value, str):
+            return ImageColor.getcolor(value, mode)
+        value = tuple(value)
+        if mode == "RGB":
+            return value[:3]
+        return value + (255,) * (4 - len(value))
+
+    def text(self, value):
+        if value.startswith("@"):
+            key = value[1:]
+            if key in self.strings:
+                return self.strings[key]
+            return self.fallback_strings[key]
+        return value
+
+    def font(self, value):
+        role, size = value
+        return FontSpec(role, self.number(size))
+
+
+# ---------------------------------------------------------------- 绘制
+
+def _draw_op(image, draw, op, ctx):
+    kind = op["type"]
+    mode = image.mode
+    if kind in SHAPES:
+        style = {}
+        if "fill" in op:
+            style["fill"] = ctx.color(op["fill"], mode)
+        if "outline" in op:
+            style["outline"] = ctx.color(op["outline"], mode)
+            style["width"] = ctx.number(op.get("width", 1))
+        box = ctx.numbers(op["box"])
+        if kind == "rect":
+            draw.rectangle(box, **style)
+        elif kind == "rounded_rect":
+            draw.rounded_rectangle(box, ctx.number(op["radius"]), **style)
+        else:
+            draw.ellipse(box, **style)
+    elif kind == "text":
+        text = ctx.text(op["text"])
+        spec = ctx.font(op["font"])
+        fill = ctx.color(op["fill"], mode)
+        if "box" in op:
+            draw_in_box(image, ctx.numbers(op["box"]), text, spec, fill)
+        elif "center" in op:
+            cx, cy = ctx.numbers(op["center"])
+            width, height = measure(text, spec)
+            draw_line(image, (cx - width // 2, cy - height // 2), text, spec, fill)
+        elif "wrap" in op:
+            draw_wrapped(image, ctx.numbers(op["at"]), text, spec, fill, ctx.number(op["wrap"]))
+        elif op.get("align") == "center":
+            cx, y = ctx.numbers(op["at"])
+            draw_centered(image, cx, y, text, spec, fill)
+        else:
+            draw_line(image, ctx.numbers(op["at"]), text, spec, fill)
+    elif kind == "image":
+        try:
+            picture = load_image_layer(op["src"], ctx.numbers(op["size"]))
+        except OSError:
+            for child in op.get("fallback", []):
+                _draw_op(image, draw, child, ctx)
+            return
+        composite(image, picture, ctx.numbers(op["at"]))
+
+
+def draw_layers(image, ops, ctx):
+    draw = ImageDraw.Draw(image)
+    for op in ops:
+        _draw_op(image, draw, op, ctx)
+    return image
+
+
+def _pixel_size(ctx):
+    return ctx.number(ctx.width), ctx.number(ctx.height)
+
+
+def render_static(scene, variant):
+    """在透明图层上渲染静态图层（不含画布背景）"""
+    ctx = Context(scene, variant)
+    return draw_layers(Image.new("RGBA", _pixel_size(ctx), (0, 0, 0, 0)), scene.static, ctx)
+
+
+def static_layer(scene, variant, cache=None):
+    """返回预乘的静态图层，没有静态图层时返回None；同一缓存键只渲染一次"""
+    if not scene.static:
+        return None
+    return (cache or default_cache()).get(("static",) + scene.static_key(variant),
+                                          lambda: render_static(scene, variant))
+
+
+def render_scene(scene, variant=None, base=None):
+    """渲染一个变体；base为 static_layer() 返回的静态图层（不传时从进程内缓存取得）"""
+    variant = variant or scene.default_variant()
+    with span(f"{scene.name} {variant.suffix()}", "render"):
+        ctx = Context(scene, variant)
+        image = Image.new(scene.mode, _pixel_size(ctx), ctx.color(scene.background, scene.mode))
+        base = base if base is not None else static_layer(scene, variant)
+        if base is not None:
+            composite(image, base)
+        return draw_layers(image, scene.layers, ctx)
+
+
+def _render_and_save(scene, variant, base, output):
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    return write_png(render_scene(scene, variant, base), output)
+
+
+def render_batch(jobs_list, jobs=None):
+    """
+    批量渲染 [(场景, 变体, 输出路径)]，静态图层在主进程中按缓存键只渲染一次，随任务传给工作进程；
+    返回与输入顺序一致的ExportResult列表
+    """
+    tasks = []
+    for scene, variant, output in jobs_list:
+        base = static_layer(scene, variant)
+        width, height = (variant.size or scene.size)
+        tasks.append(ExportTask(os.path.basename(output), _render_and_save,
+                                (scene, variant, base, output),
+                                weight=width * height * variant.scale ** 2))
+    return run_exports(tasks, jobs)
+
+
+def render_scene_file(path, output=None, variant=None):
+    """渲染场景文件的一个变体并保存，返回EncodeStats"""
+    scene = load_scene(path)
+    return _render_and_save(scene, variant or scene.default_variant(), None, output or scene.output)
+
+
+def scaled_path(path, scale):
+    """1倍保持原文件名，其他倍数加 @2x 这样的后缀"""
+    if scale == 1:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}@{scale:g}x{ext}"
+
+
+def render_scene_files(paths, scales=(1,), jobs=None):
+    """按各缩放倍数原生渲染场景文件的默认变体（输出到 scaled_path），返回ExportResult列表"""
+    jobs_list = []
+    for path in paths:
+        scene = load_scene(path)
+        for scale in scales:
+            jobs_list.append((scene, scene.default_variant(scale), scaled_path(scene.output, scale)))
+    return render_batch(jobs_list, jobs)
+
+
+def add_scales_argument(parser):
+    """为截图脚本添加统一的 --scales 选项"""
+    parser.add_argument("--scales", nargs="+", type=_parse_scale, default=[1],
+                        help="原生渲染的缩放倍数，例如 1 2 3（非1倍的文件名带 @2x 后缀）")
+    return parser
+
+
+def expand_variants(scene, themes=None, locales=None, scales=None, sizes=None):
+    """按命令行参数或场景中声明的变体轴生成全部变体"""
+    axes = scene.variants
+    themes = themes or axes.get("themes") or list(scene.themes)
+    locales = locales or axes.get("locales") or [scene.default_locale]
+    scales = scales or axes.get("scales") or [1]
+    sizes = sizes or [tuple(s) for s in axes.get("sizes", [])] or [None]
+    return [Variant(theme, locale, scale, size)
+            for theme, locale, scale, size in itertools.product(themes, locales, scales, sizes)]
+
+
+def _parse_size(text):
+    width, _, height = text.lower().partition("x")
+    return int(width), int(height)
+
+
+def _parse_scale(text):
+    value = float(text)
+    return int(value) if value.is_integer() else value
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="批量渲染声明式截图场景的变体")
+    parser.add_argument("scenes", nargs="*", help=f"场景文件（默认 {SCENE_DIR}/ 下全部）")
+    parser.add_argument("--themes", nargs="+", help="主题（默认使用场景中声明的变体）")
+    parser.add_argument("--locales", nargs="+", help="语言")
+    parser.add_argument("--scales", nargs="+", type=_parse_scale, help="缩放倍数，例如 1 2")
+    parser.add_argument("--sizes", nargs="+", type=_parse_size, help="画布尺寸，例如 1280x800")
+    parser.add_argument("-o", "--out-dir", default=VARIANT_DIR, help="输出目录")
+    add_jobs_argument(parser)
+    add_png_mode_argument(parser)
+    args = parser.parse_args(argv)
+    set_png_mode(args.png_mode)
+
+    paths = args.scenes or sorted(glob.glob(os.path.join(SCENE_DIR, "*.json")))
+    if not paths:
+        print("❌ 没有找到场景文件")
+        return 1
+
+    jobs_list = []
+    for path in paths:
+        scene = load_scene(path)
+        for variant in expand_variants(scene, args.themes, args.locales, args.scales, args.sizes):
+            jobs_list.append((scene, variant, os.path.join(args.out_dir, f"{scene.name}-{variant.suffix()}.png")))
+
+    statics = len({scene.static_key(variant) for scene, variant, _ in jobs_list if scene.static})
+    print(f"🎬 渲染 {len(paths)} 个场景的 {len(jobs_list)} 个变体（共用 {statics} 个静态图层）...")
+    results = render_batch(jobs_list, args.jobs)
+    for result in results:
+        if result.ok:
+            print(f"  ✅ {result.label} ({result.value.describe()})")
+        else:
+            print(f"  ❌ {result.label}: {result.error}")
+    return 0 if all(result.ok for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,639 @@
+#!/usr/bin/env python3
+"""
+轻量SVG光栅化器
+支持本项目资源用到的SVG子集：rect(rx/ry)、circle、ellipse、line、polyline、polygon、
+path(M/L/H/V/C/S/Q/T/Z)、linearGradient、opacity、transform 和简单的 text；
+多边形按扫描线填充，水平方向解析计算覆盖率、垂直方向多条子扫描线采样，结果写入NumPy缓冲区
+"""
+
+import math
+import re
+import xml.etree.ElementTree as ET
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from font_registry import get_font, load_font as load_role_font
+from profiling import span
+
+# 每个像素行的子扫描线数量（垂直方向抗锯齿精度）
+SUBSAMPLES = 4
+
+NAMED_COLORS = {
+    "black": (0, 0, 0), "white": (255, 255, 255), "red": (255, 0, 0),
+    "green": (0, 128, 0), "blue": (0, 0, 255), "yellow": (255, 255, 0),
+    "gray": (128, 128, 128), "grey": (128, 128, 128),
+}
+
+# 会被子元素继承的表现属性
+INHERITED = (
+    "fill", "fill-opacity", "fill-rule", "stroke", "stroke-opacity", "stroke-width",
+    "font-family", "font-size", "font-weight", "text-anchor", "dominant-baseline",
+)
+
+FONT_CANDIDATES = {
+    False: ["/System/Library/Fonts/Helvetica.ttc",
+            "/System/Library/Fonts/Supplemental/Arial.ttf",
+            "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+            "DejaVuSans.ttf"],
+    True: ["/System/Library/Fonts/Supplemental/Arial Bold.ttf",
+           "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+           "DejaVuSans-Bold.ttf",
+           "/System/Library/Fonts/Helvetica.ttc"],
+}
+
+NUMBER_RE = r"[-+]?(?:\d*\.\d+|\d+\.?)(?:[eE][-+]?\d+)?"
+PATH_TOKEN_RE = re.compile(r"[MmLlHhVvCcSsQqTtZzAa]|" + NUMBER_RE)
+
+
+# ---------------------------------------------------------------- 解析工具
+
+def local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def parse_length(value, default=0.0):
+    """解析长度（忽略px单位）"""
+    if value is None:
+        return default
+    value = value.strip()
+    if value.endswith("px"):
+        value = value[:-2]
+    return float(value)
+
+
+def parse_fraction(value, default):
+    """解析渐变坐标/偏移量，支持百分比"""
+    if value is None:
+        return default
+    value = value.strip()
+    if value.endswith("%"):
+        return float(value[:-1]) / 100
+    return float(value)
+
+
+def parse_color(value):
+    """解析颜色，返回 0~1 的 (r, g, b, a)，none/transparent返回None"""
+    value = value.strip()
+    if value in ("", "none", "transparent"):
+        return None
+    if value.startswith("#"):
+        hex_color = value[1:]
+        if len(hex_color) == 3:
+            hex_color = "".join(c * 2 for c in hex_color)
+        return tuple(int(hex_color[i:i+2], 16) / 255 for i in (0, 2, 4)) + (1.0,)
+    match = re.match(r"rgba?\(([^)]*)\)", value)
+    if match:
+        parts = [p.strip() for p in match.group(1).split(",")]
+        rgb = [float(p[:-1]) * 2.55 if p.endswith("%") else float(p) for p in parts[:3]]
+        alpha = float(parts[3]) if len(parts) > 3 else 1.0
+        return tuple(c / 255 for c in rgb) + (alpha,)
+    if value in NAMED_COLORS:
+        return tuple(c / 255 for c in NAMED_COLORS[value]) + (1.0,)
+    raise ValueError(f"不支持的颜色: {value}")
+
+
+def parse_style(element):
+    """合并表现属性和style属性（style优先）"""
+    props = dict(element.attrib)
+    for declaration in element.get("style", "").split(";"):
+        if ":" in declaration:
+            key, value = declaration.split(":", 1)
+            props[key.strip()] = value.strip()
+    return props
+
+
+def parse_transform(text):
+    """解析transform属性为3x3仿射矩阵"""
+    matrix = np.eye(3)
+    for name, args in re.findall(r"(\w+)\s*\(([^)]*)\)", text or ""):
+        v = [float(x) for x in re.findall(NUMBER_RE, args)]
+        if name == "translate":
+            step = np.array([[1, 0, v[0]], [0, 1, v[1] if len(v) > 1 else 0], [0, 0, 1]])
+        elif name == "scale":
+            sy = v[1] if len(v) > 1 else v[0]
+            step = np.diag([v[0], sy, 1.0])
+        elif name == "rotate":
+            a = math.radians(v[0])
+            step = np.array([[math.cos(a), -math.sin(a), 0], [math.sin(a), math.cos(a), 0], [0, 0, 1]])
+            if len(v) == 3:
+                step = translation(v[1], v[2]) @ step @ translation(-v[1], -v[2])
+        elif name == "matrix":
+            step = np.array([[v[0], v[2], v[4]], [v[1], v[3], v[5]], [0, 0, 1]])
+        elif name == "skewX":
+            step = np.array([[1, math.tan(math.radians(v[0])), 0], [0, 1, 0], [0, 0, 1]])
+        elif name == "skewY":
+            step = np.array([[1, 0, 0], [math.tan(math.radians(v[0])), 1, 0], [0, 0, 1]])
+        else:
+            raise ValueError(f"不支持的变换: {name}")
+        matrix = matrix @ step
+    return matrix
+
+
+def translation(tx, ty):
+    return np.array([[1, 0, tx], [0, 1, ty], [0, 0, 1]], dtype=np.float64)
+
+
+def apply_matrix(matrix, points):
+    points = np.asarray(points, dtype=np.float64)
+    return points @ matrix[:2, :2].T + matrix[:2, 2]
+
+
+def matrix_scale(matrix):
+    """变换的平均缩放系数（用于线宽、字号和曲线细分）"""
+    return math.sqrt(abs(np.linalg.det(matrix[:2, :2]))) or 1.0
+
+
+# ---------------------------------------------------------------- 几何展开
+
+def _curve_steps(control_points, scale):
+    length = sum(math.dist(a, b) for a, b in zip(control_points, control_points[1:])) * scale
+    return max(2, min(128, math.ceil(length / 3)))
+
+
+def flatten_cubic(p0, p1, p2, p3, scale):
+    t = np.linspace(0, 1, _curve_steps((p0, p1, p2, p3), scale) + 1)[1:, None]
+    p0, p1, p2, p3 = map(np.asarray, (p0, p1, p2, p3))
+    return ((1 - t) ** 3 * p0 + 3 * (1 - t) ** 2 * t * p1
+            + 3 * (1 - t) * t ** 2 * p2 + t ** 3 * p3)
+
+
+def flatten_quadratic(p0, p1, p2, scale):
+    t = np.linspace(0, 1, _curve_steps((p0, p1, p2), scale) + 1)[1:, None]
+    p0, p1, p2 = map(np.asarray, (p0, p1, p2))
+    return (1 - t) ** 2 * p0 + 2 * (1 - t) * t * p1 + t ** 2 * p2
+
+
+def ellipse_points(cx, cy, rx, ry, scale, start=0.0, sweep=2 * math.pi, closed=True):
+    """椭圆（或一段椭圆弧）展开为折线"""
+    steps = max(12, min(256, math.ceil(abs(sweep) * max(rx, ry) * scale / 3)))
+    if closed:
+        angles = start + np.arange(steps) * sweep / steps
+    else:
+        angles = start + np.linspace(0, sweep, max(2, steps // 4) + 1)
+    return np.column_stack([cx + rx * np.cos(angles), cy + ry * np.sin(angles)])
+
+
+def rounded_rect_points(x, y, w, h, rx, ry, scale):
+    if rx <= 0 or ry <= 0:
+        return np.array([[x, y], [x + w, y], [x + w, y + h], [x, y + h]], dtype=np.float64)
+    corners = [
+        (x + w - rx, y + ry, -math.pi / 2),
+        (x + w - rx, y + h - ry, 0.0),
+        (x + rx, y + h - ry, math.pi / 2),
+        (x + rx, y + ry, math.pi),
+    ]
+    return np.vstack([ellipse_points(cx, cy, rx, ry, scale, start, math.pi / 2, closed=False)
+                      for cx, cy, start in corners])
+
+
+def parse_path(d, scale):
+    """解析path的d属性，返回 [(点数组, 是否闭合)]（用户坐标）"""
+    tokens = PATH_TOKEN_RE.findall(d)
+    subpaths, points = [], []
+    current = np.zeros(2)
+    start = np.zeros(2)
+    last_control = None
+    command = None
+    i = 0
+
+    def finish(closed):
+        if len(points) > 1:
+            subpaths.append((np.array(points, dtype=np.float64), closed))
+
+    def take(n):
+        nonlocal i
+        values = [float(t) for t in tokens[i:i + n]]
+        i += n
+        return values
+
+    while i < len(tokens):
+        if re.match(r"[A-Za-z]", tokens[i]):
+            command = tokens[i]
+            i += 1
+            if command in "Aa":
+                raise ValueError("暂不支持椭圆弧路径命令(A)")
+        relative = command.islower()
+        base = current if relative else np.zeros(2)
+        op = command.upper()
+
+        if op == "Z":
+            finish(True)
+            points = []
+            current = start.copy()
+            last_control = None
+            continue
+        if op == "M":
+            finish(False)
+            current = base + take(2)
+            start = current.copy()
+            points = [current]
+            # M之后的隐式坐标按L处理
+            command = "l" if relative else "L"
+            last_control = None
+            continue
+        if not points:
+            points = [current]
+        if op == "L":
+            current = base + take(2)
+            points.append(current)
+            last_control = None
+        elif op == "H":
+            x, = take(1)
+            current = np.array([x + (current[0] if relative else 0), current[1]])
+            points.append(current)
+            last_control = None
+        elif op == "V":
+            y, = take(1)
+            current = np.array([current[0], y + (current[1] if relative else 0)])
+            points.append(current)
+            last_control = None
+        elif op in "CS":
+            if op == "C":
+                values = take(6)
+                c1 = base + values[0:2]
+                c2, end = base + values[2:4], base + values[4:6]
+            else:
+                values = take(4)
+                c1 = 2 * current - last_control if last_control is not None else current
+                c2, end = base + values[0:2], base + values[2:4]
+            points.extend(flatten_cubic(current, c1, c2, end, scale))
+            last_control, current = c2, end
+        elif op in "QT":
+            if op == "Q":
+                values = take(4)
+                c1, end = base + values[0:2], base + values[2:4]
+            else:
+                c1 = 2 * current - last_control if last_control is not None else current
+                end = base + take(2)
+            points.extend(flatten_quadratic(current, c1, end, scale))
+            last_control, current = c1, end
+        else:
+            raise ValueError(f"未知的路径命令: {command}")
+    finish(False)
+    return subpaths
+
+
+def stroke_polygons(subpaths, width):
+    """把折线描边展开为同向多边形（各线段矩形+拐点圆盘），配合nonzero规则得到并集"""
+    half = width / 2
+    polygons = []
+    disc = ellipse_points(0, 0, half, half, 1.0)
+    for points, closed in subpaths:
+        vertices = np.vstack([points, points[:1]]) if closed else points
+        for p, q in zip(vertices[:-1], vertices[1:]):
+            direction = q - p
+            length = math.hypot(*direction)
+            if length == 0:
+                continue
+            normal = np.array([-direction[1], direction[0]]) / length * half
+            polygons.append(np.array([p + normal, q + normal, q - normal, p - normal]))
+        joins = points if closed else points[1:-1]
+        polygons.extend(disc + point for point in joins)
+    return [orient_positive(poly) for poly in polygons]
+
+
+def orient_positive(polygon):
+    x, y = polygon[:, 0], polygon[:, 1]
+    area = np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))
+    return polygon[::-1] if area < 0 else polygon
+
+
+# ---------------------------------------------------------------- 扫描线填充
+
+def rasterize(polygons, width, height, fill_rule="nonzero", samples=SUBSAMPLES):
+    """
+    扫描线填充多边形，返回 (覆盖率数组, (x0, y0)) ，无覆盖时返回None
+    每条子扫描线上的区间端点按精确的小数位置计入像素覆盖率
+    """
+    edges = []
+    for polygon in polygons:
+        polygon = np.asarray(polygon, dtype=np.float64)
+        if len(polygon) >= 2:
+            edges.append(np.hstack([polygon, np.roll(polygon, -1, axis=0)]))
+    if not edges:
+        return None
+    x0, y0, x1, y1 = np.vstack(edges).T
+    keep = y0 != y1
+    x0, y0, x1, y1 = x0[keep], y0[keep], x1[keep], y1[keep]
+    if not len(x0):
+        return None
+
+    # 子扫描线 i 位于 y = (i + 0.5) / samples，边覆盖 [ylo, yhi) 范围内的子扫描线
+    lo = np.minimum(y0, y1) * samples - 0.5
+    hi = np.maximum(y0, y1) * samples - 0.5
+    first = np.clip(np.ceil(lo), 0, height * samples).astype(np.int64)
+    last = np.clip(np.ceil(hi), 0, height * samples).astype(np.int64)
+    counts = np.maximum(last - first, 0)
+    total = int(counts.sum())
+    if not total:
+        return None
+
+    edge = np.repeat(np.arange(len(counts)), counts)
+    sample = first[edge] + np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    ys = (sample + 0.5) / samples
+    xs = x0[edge] + (ys - y0[edge]) * (x1[edge] - x0[edge]) / (y1[edge] - y0[edge])
+    dirs = np.where(y1[edge] > y0[edge], 1, -1)
+
+    order = np.lexsort((xs, sample))
+    sample, xs, dirs = sample[order], xs[order], dirs[order]
+
+    # 每条子扫描线内的累计环绕数
+    winding = np.cumsum(dirs)
+    starts = np.r_[True, sample[1:] != sample[:-1]]
+    group_start = np.maximum.accumulate(np.where(starts, np.arange(total), 0))
+    winding = winding - (winding[group_start] - dirs[group_start])
+    inside = (winding & 1) == 1 if fill_rule == "evenodd" else winding != 0
+
+    valid = inside[:-1] & (sample[:-1] == sample[1:])
+    a = np.clip(xs[:-1][valid], 0, width)
+    b = np.clip(xs[1:][valid], 0, width)
+    rows = sample[:-1][valid] // samples
+    spans = a < b
+    a, b, rows = a[spans], b[spans], rows[spans]
+    if not len(a):
+        return None
+
+    col0 = int(math.floor(a.min()))
+    row0 = int(rows.min())
+    span_w = int(math.ceil(b.max())) - col0
+    span_h = int(rows.max()) - row0 + 1
+    stride = span_w + 1
+
+    a -= col0
+    b -= col0
+    ia = np.floor(a).astype(np.int64)
+    ib = np.floor(b).astype(np.int64)
+    base = (rows - row0) * stride
+    weight = 1.0 / samples
+
+    # 区间 [a, b) 对像素 c 的覆盖 = clamp(b-c, 0, 1) - clamp(a-c, 0, 1)，用差分数组累加
+    size = span_h * stride
+    steps = (np.bincount(base + ia, minlength=size) - np.bincount(base + ib, minlength=size)) * weight
+    partial = (np.bincount(base + ib, weights=(b - ib) * weight, minlength=size)
+               - np.bincount(base + ia, weights=(a - ia) * weight, minlength=size))
+    coverage = np.cumsum(steps.reshape(span_h, stride), axis=1) + partial.reshape(span_h, stride)
+    return np.clip(coverage[:, :span_w], 0, 1).astype(np.float32), (col0, row0)
+
+
+# ---------------------------------------------------------------- 画布与填充
+
+class LinearGradient:
+    """线性渐变，colors() 对设备像素中心求颜色"""
+
+    def __init__(self, element, gradients):
+        href = element.get("{http://www.w3.org/1999/xlink}href") or element.get("href")
+        parent = gradients.get(href[1:]) if href and href.startswith("#") else None
+        self.units = element.get("gradientUnits", parent.units if parent else "objectBoundingBox")
+        self.transform = parse_transform(element.get("gradientTransform"))
+        bbox_units = self.units == "objectBoundingBox"
+        self.p1 = np.array([parse_fraction(element.get("x1"), 0.0), parse_fraction(element.get("y1"), 0.0)])
+        self.p2 = np.array([parse_fraction(element.get("x2"), 1.0 if bbox_units else 0.0),
+                            parse_fraction(element.get("y2"), 0.0)])
+
+        offsets, colors = [], []
+        for stop in element:
+            if local_name(stop.tag) != "stop":
+                continue
+            props = parse_style(stop)
+            color = parse_color(props.get("stop-color", "black")) or (0, 0, 0, 0)
+            offsets.append(min(1.0, max(offsets[-1] if offsets else 0.0,
+                                        parse_fraction(props.get("offset"), 0.0))))
+            colors.append(color[:3] + (color[3] * float(props.get("stop-opacity", 1)),))
+        if not offsets and parent is not None:
+            offsets, colors = list(parent.offsets), list(parent.colors)
+        self.offsets = np.array(offsets or [0.0])
+        self.colors = np.array(colors or [(0, 0, 0, 0)])
+
+    def resolve(self, ctm, bbox):
+        """结合元素的当前变换和包围盒，得到设备坐标到渐变空间的逆变换"""
+        matrix = ctm
+        if self.units == "objectBoundingBox":
+            (bx0, by0), (bx1, by1) = bbox
+            matrix = matrix @ np.array([[bx1 - bx0, 0, bx0], [0, by1 - by0, by0], [0, 0, 1]])
+        return self, np.linalg.inv(matrix @ self.transform)
+
+    def colors_at(self, inverse, xs, ys):
+        gx = inverse[0, 0] * xs + inverse[0, 1] * ys + inverse[0, 2]
+        gy = inverse[1, 0] * xs + inverse[1, 1] * ys + inverse[1, 2]
+        axis = self.p2 - self.p1
+        length_sq = float(axis @ axis) or 1.0
+        t = np.clip(((gx - self.p1[0]) * axis[0] + (gy - self.p1[1]) * axis[1]) / length_sq, 0, 1)
+        return np.stack([np.interp(t, self.offsets, self.colors[:, c]) for c in range(4)], axis=-1)
+
+
+class Canvas:
+    """预乘alpha的float32 RGBA缓冲区；可只对应整幅图像中 origin 起的一个窗口"""
+
+    def __init__(self, width, height, origin=(0, 0), samples=SUBSAMPLES):
+        self.width = width
+        self.height = height
+        self.origin = origin
+        self.samples = samples
+        self.pixels = np.zeros((height, width, 4), dtype=np.float32)
+
+    def fill(self, polygons, paint, opacity=1.0, fill_rule="nonzero"):
+        """用纯色 (r,g,b,a) 或 (渐变, 逆变换) 填充设备坐标下的多边形"""
+        ox, oy = self.origin
+        local = [np.asarray(p, dtype=np.float64) - (ox, oy) for p in polygons]
+        result = rasterize(local, self.width, self.height, fill_rule, self.samples)
+        if result is not None:
+            self.composite(result[0], result[1], paint, opacity)
+
+    def composite(self, coverage, position, paint, opacity=1.0):
+        """把覆盖率蒙版以source-over方式合成到缓冲区"""
+        x0, y0 = position
+        h, w = coverage.shape
+        region = self.pixels[y0:y0 + h, x0:x0 + w]
+        if isinstance(paint, tuple) and isinstance(paint[0], LinearGradient):
+            gradient, inverse = paint
+            xs = self.origin[0] + x0 + np.arange(w) + 0.5
+            ys = self.origin[1] + y0 + np.arange(h)[:, None] + 0.5
+            colors = gradient.colors_at(inverse, xs[None, :], ys).astype(np.float32)
+        else:
+            colors = np.asarray(paint, dtype=np.float32)
+        alpha = coverage * np.float32(opacity) * colors[..., 3]
+        region[..., :3] = colors[..., :3] * alpha[..., None] + region[..., :3] * (1 - alpha[..., None])
+        region[..., 3] = alpha + region[..., 3] * (1 - alpha)
+
+    def to_image(self):
+        """反预乘并转换为8位RGBA图像"""
+        alpha = self.pixels[..., 3]
+        rgb = np.divide(self.pixels[..., :3], alpha[..., None],
+                        out=np.zeros_like(self.pixels[..., :3]), where=alpha[..., None] > 0)
+        out = np.dstack([rgb, alpha])
+        return Image.fromarray(np.rint(np.clip(out, 0, 1) * 255).astype(np.uint8), "RGBA")
+
+
+@lru_cache(maxsize=None)
+def load_font(size, bold=False):
+    for path in FONT_CANDIDATES[bold]:
+        try:
+            return get_font(path, size)
+        except OSError:
+            continue
+    return load_role_font("bold" if bold else "body", size)
+
+
+# ---------------------------------------------------------------- SVG文档
+
+class SvgDocument:
+    """解析后的SVG文档，可按任意尺寸（或尺寸中的一个窗口）渲染"""
+
+    def __init__(self, source):
+        root = ET.parse(source).getroot() if isinstance(source, str) else source
+        self.root = root
+        viewbox = root.get("viewBox")
+        if viewbox:
+            self.viewbox = [float(v) for v in re.findall(NUMBER_RE, viewbox)]
+        else:
+            self.viewbox = [0.0, 0.0, parse_length(root.get("width"), 300.0),
+                            parse_length(root.get("height"), 150.0)]
+        self.gradients = {}
+        for element in root.iter():
+            if local_name(element.tag) == "linearGradient" and element.get("id"):
+                self.gradients[element.get("id")] = LinearGradient(element, self.gradients)
+
+    def output_size(self, size):
+        """给定输出宽度，按viewBox比例计算输出尺寸"""
+        _, _, vb_w, vb_h = self.viewbox
+        return size, max(1, round(size * vb_h / vb_w))
+
+    def render(self, size, window=None, samples=SUBSAMPLES):
+        """渲染为RGBA图像；window=(x, y, w, h) 时只渲染输出图像中的这一块"""
+        width, height = self.output_size(size)
+        x, y, w, h = window or (0, 0, width, height)
+        with span(f"svg {w}x{h}", "render", top=y):
+            canvas = Canvas(w, h, (x, y), samples)
+            vb_x, vb_y, vb_w, vb_h = self.viewbox
+            base = np.diag([width / vb_w, height / vb_h, 1.0]) @ translation(-vb_x, -vb_y)
+            self._render_children(self.root, canvas, base, {}, 1.0)
+            return canvas.to_image()
+
+    def _render_children(self, element, canvas, ctm, inherited, opacity):
+        for child in element:
+            self._render_element(child, canvas, ctm, inherited, opacity)
+
+    def _render_element(self, element, canvas, ctm, inherited, opacity):
+        tag = local_name(element.tag)
+        if tag in ("defs", "filter", "title", "desc", "metadata", "linearGradient",
+                   "radialGradient", "style", "clipPath", "mask", "symbol"):
+            return
+
+        props = parse_style(element)
+        style = dict(inherited)
+        style.update({k: props[k] for k in INHERITED if k in props})
+        ctm = ctm @ parse_transform(element.get("transform"))
+        opacity = opacity * float(props.get("opacity", 1))
+        if props.get("display") == "none" or props.get("visibility") == "hidden":
+            return
+
+        if tag in ("g", "svg", "a"):
+            self._render_children(element, canvas, ctm, style, opacity)
+            return
+        if tag == "text":
+            self._render_text(element, canvas, ctm, style, opacity)
+            return
+
+        scale = matrix_scale(ctm)
+        subpaths = self._shape_subpaths(tag, element, scale)
+        if not subpaths:
+            return
+
+        user_points = np.vstack([points for points, _ in subpaths])
+        bbox = (user_points.min(axis=0), user_points.max(axis=0))
+        device = [(apply_matrix(ctm, points), closed) for points, closed in subpaths]
+
+        fill = self._paint(style.get("fill", "black"), ctm, bbox)
+        if fill is not None:
+            canvas.fill([points for points, _ in device], fill,
+                        opacity * float(style.get("fill-opacity", 1)),
+                        style.get("fill-rule", "nonzero"))
+
+        stroke = self._paint(style.get("stroke", "none"), ctm, bbox)
+        stroke_width = parse_length(style.get("stroke-width"), 1.0) * scale
+        if stroke is not None and stroke_width > 0:
+            canvas.fill(stroke_polygons(device, stroke_width), stroke,
+                        opacity * float(style.get("stroke-opacity", 1)))
+
+    def _shape_subpaths(self, tag, element, scale):
+        get = element.get
+        if tag == "rect":
+            w, h = parse_length(get("width")), parse_length(get("height"))
+            if w <= 0 or h <= 0:
+                return []
+            rx, ry = get("rx"), get("ry")
+            rx = parse_length(rx if rx is not None else ry, 0.0)
+            ry = parse_length(ry if ry is not None else get("rx"), 0.0)
+            points = rounded_rect_points(parse_length(get("x")), parse_length(get("y")), w, h,
+                                         min(rx, w / 2), min(ry, h / 2), scale)
+            return [(points, True)]
+        if tag == "circle":
+            r = parse_length(get("r"))
+            if r <= 0:
+                return []
+            return [(ellipse_points(parse_length(get("cx")), parse_length(get("cy")), r, r, scale), True)]
+        if tag == "ellipse":
+            rx, ry = parse_length(get("rx")), parse_length(get("ry"))
+            if rx <= 0 or ry <= 0:
+                return []
+            return [(ellipse_points(parse_length(get("cx")), parse_length(get("cy")), rx, ry, scale), True)]
+        if tag == "line":
+            points = np.array([[parse_length(get("x1")), parse_length(get("y1"))],
+                               [parse_length(get("x2")), parse_length(get("y2"))]])
+            return [(points, False)]
+        if tag in ("polygon", "polyline"):
+            values = [float(v) for v in re.findall(NUMBER_RE, get("points", ""))]
+            points = np.array(values[:len(values) // 2 * 2]).reshape(-1, 2)
+            return [(points, tag == "polygon")] if len(points) > 1 else []
+        if tag == "path":
+            return parse_path(get("d", ""), scale)
+        return []
+
+    def _paint(self, value, ctm, bbox):
+        value = value.strip()
+        match = re.match(r"url\(#([^)]+)\)", value)
+        if match:
+            gradient = self.gradients.get(match.group(1))
+            return gradient.resolve(ctm, bbox) if gradient else None
+        return parse_color(value)
+
+    def _render_text(self, element, canvas, ctm, style, opacity):
+        text = " ".join("".join(element.itertext()).split())
+        color = self._paint(style.get("fill", "black"), ctm, ((0, 0), (1, 1)))
+        if not text or color is None:
+            return
+        font_size = round(parse_length(style.get("font-size"), 16.0) * matrix_scale(ctm))
+        if font_size < 1:
+            return
+        weight = style.get("font-weight", "normal")
+        bold = weight == "bold" or (weight.isdigit() and int(weight) >= 600)
+        font = load_font(font_size, bold)
+
+        horizontal = {"middle": "m", "end": "r"}.get(style.get("text-anchor"), "l")
+        vertical = "m" if style.get("dominant-baseline") in ("central", "middle") else "s"
+        x, y = apply_matrix(ctm, [[parse_length(element.get("x")), parse_length(element.get("y"))]])[0]
+        x -= canvas.origin[0]
+        y -= canvas.origin[1]
+
+        # 只在文字包围盒范围内生成蒙版
+        left, top, right, bottom = font.getbbox(text, anchor=horizontal + vertical)
+        x0 = max(0, math.floor(x + left))
+        y0 = max(0, math.floor(y + top))
+        x1 = min(canvas.width, math.ceil(x + right))
+        y1 = min(canvas.height, math.ceil(y + bottom))
+        if x0 >= x1 or y0 >= y1:
+            return
+        mask = Image.new("L", (x1 - x0, y1 - y0), 0)
+        ImageDraw.Draw(mask).text((x - x0, y - y0), text, fill=255, font=font,
+                                  anchor=horizontal + vertical)
+        coverage = np.asarray(mask, dtype=np.float32) / 255
+        if isinstance(color, tuple) and isinstance(color[0], LinearGradient):
+            color = tuple(color[0].colors[0])
+        canvas.composite(coverage, (x0, y0), color, opacity * float(style.get("fill-opacity", 1)))
+
+
+def render_svg(svg_path, size=1024, samples=SUBSAMPLES):
+    """解析SVG文件并渲染为指定宽度的RGBA图像"""
+    return SvgDocument(svg_path).render(size, samples=samples)
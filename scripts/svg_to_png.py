@@ -1,70 +1,95 @@
 #!/usr/bin/env python3
 """
 SVG到PNG转换脚本
-直接解析SVG并使用PIL绘制
+直接解析SVG并用内置光栅化器绘制（不依赖外部转换工具）
 """
 
+import argparse
 import os
-import xml.etree.ElementTree as ET
-from PIL import Image, ImageDraw, ImageFont
-import math
+from PIL import ImageDraw
+from functools import lru_cache
 
-def parse_svg_and_create_png(svg_path, output_path, size=1024):
-    """解析SVG文件并创建对应的PNG图像"""
-    
-    # 创建画布
-    img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
-    
-    # 缩放比例 (SVG是1024x1024)
-    scale = size / 1024.0
+try:
+    import svg_raster
+except ImportError:  # 缺少NumPy时退回手工绘制的版本
+    svg_raster = None
+
+from display_list import DisplayList
+from font_registry import load_font
+from png_stream import (BAND_PIXELS, STREAM_THRESHOLD, add_png_mode_argument, render_to_png,
+                        set_png_mode, write_png)
+
+def parse_svg_and_create_png(svg_path, output_path, size=1024, tiled=None):
+    """解析SVG文件并创建对应的PNG图像（tiled为None时超过4096自动分块渲染），返回EncodeStats"""
+    if svg_raster is None:
+        print("⚠️ 未安装NumPy，使用手工绘制的简化图标")
+        return create_png_with_pil(output_path, size)
+
+    document = svg_raster.SvgDocument(svg_path)
+    if tiled is None:
+        tiled = size > STREAM_THRESHOLD
+    if tiled:
+        # 按水平条带光栅化并流式编码，峰值内存与尺寸无关
+        # （光栅化需要float缓冲区和逐像素渐变，条带取默认像素预算的1/4）
+        width, height = document.output_size(size)
+        return render_to_png(output_path, width, height,
+                             lambda top, rows: document.render(size, window=(0, top, width, rows)),
+                             band_pixels=BAND_PIXELS // 4)
+
+    return write_png(document.render(size), output_path)
+
+@lru_cache(maxsize=None)
+def fallback_display_list():
+    """concrete SVG布局的显示列表（SVG的1024设计坐标，只构建一次）"""
+    size = 1024
+    draw = DisplayList(size)
     
     # 白色圆角背景
-    corner_radius = int(102.4 * scale)
-    draw_rounded_rectangle(draw, 0, 0, size-1, size-1, corner_radius, '#FFFFFF', '#E8EAED', int(2*scale))
+    corner_radius = 102
+    draw_rounded_rectangle(draw, 0, 0, size-1, size-1, corner_radius, '#FFFFFF', '#E8EAED', 2)
     
     # Google Drive 三角形 (中心在512, 452)
-    center_x, center_y = int(512 * scale), int(452 * scale)
+    center_x, center_y = 512, 452
     
     # 左侧蓝色三角形: (-120,60) -> (-20,-80) -> (80,60)
     blue_triangle = [
-        (center_x + int(-120 * scale), center_y + int(60 * scale)),
-        (center_x + int(-20 * scale), center_y + int(-80 * scale)),
-        (center_x + int(80 * scale), center_y + int(60 * scale))
+        (center_x - 120, center_y + 60),
+        (center_x - 20, center_y - 80),
+        (center_x + 80, center_y + 60)
     ]
     draw.polygon(blue_triangle, fill='#4285F4')
     
     # 右侧绿色三角形: (80,60) -> (180,60) -> (80,-80)
     green_triangle = [
-        (center_x + int(80 * scale), center_y + int(60 * scale)),
-        (center_x + int(180 * scale), center_y + int(60 * scale)),
-        (center_x + int(80 * scale), center_y + int(-80 * scale))
+        (center_x + 80, center_y + 60),
+        (center_x + 180, center_y + 60),
+        (center_x + 80, center_y - 80)
     ]
     draw.polygon(green_triangle, fill='#0F9D58')
     
     # 底部黄色三角形: (-120,60) -> (80,60) -> (180,60) -> (30,160) -> (-70,160)
     yellow_shape = [
-        (center_x + int(-120 * scale), center_y + int(60 * scale)),
-        (center_x + int(80 * scale), center_y + int(60 * scale)),
-        (center_x + int(180 * scale), center_y + int(60 * scale)),
-        (center_x + int(30 * scale), center_y + int(160 * scale)),
-        (center_x + int(-70 * scale), center_y + int(160 * scale))
+        (center_x - 120, center_y + 60),
+        (center_x + 80, center_y + 60),
+        (center_x + 180, center_y + 60),
+        (center_x + 30, center_y + 160),
+        (center_x - 70, center_y + 160)
     ]
     draw.polygon(yellow_shape, fill='#F4B400')
     
     # X 标识 (中心在 512+30, 452+10)
-    x_center_x, x_center_y = center_x + int(30 * scale), center_y + int(10 * scale)
-    x_radius = int(45 * scale)
+    x_center_x, x_center_y = center_x + 30, center_y + 10
+    x_radius = 45
     
     # X的背景圆形
     draw.ellipse([
         x_center_x - x_radius, x_center_y - x_radius,
         x_center_x + x_radius, x_center_y + x_radius
-    ], fill='#FFFFFF', outline='#202124', width=int(4*scale))
+    ], fill='#FFFFFF', outline='#202124', width=4)
     
     # X字母的两条线
-    x_line_half = int(20 * scale)
-    x_line_width = int(6 * scale)
+    x_line_half = 20
+    x_line_width = 6
     
     # 对角线1 (左上到右下)
     draw_thick_line(draw, 
@@ -79,8 +104,8 @@ def parse_svg_and_create_png(svg_path, output_path, size=1024):
         x_line_width, '#202124')
     
     # 下载箭头 (中心在 512, 632)
-    arrow_center_x, arrow_center_y = int(512 * scale), int(632 * scale)
-    arrow_radius = int(40 * scale)
+    arrow_center_x, arrow_center_y = 512, 632
+    arrow_radius = 40
     
     # 箭头背景圆形
     draw.ellipse([
@@ -89,47 +114,51 @@ def parse_svg_and_create_png(svg_path, output_path, size=1024):
     ], fill='#4285F4')
     
     # 箭头杆
-    arrow_shaft_width = int(6 * scale)
-    arrow_shaft_height = int(25 * scale)
+    arrow_shaft_width = 6
+    arrow_shaft_height = 25
     draw.rectangle([
-        arrow_center_x - arrow_shaft_width//2, arrow_center_y - int(20 * scale),
-        arrow_center_x + arrow_shaft_width//2, arrow_center_y + int(5 * scale)
+        arrow_center_x - arrow_shaft_width//2, arrow_center_y - 20,
+        arrow_center_x + arrow_shaft_width//2, arrow_center_y + 5
     ], fill='#FFFFFF')
     
     # 箭头头部
     arrow_head = [
-        (arrow_center_x - int(15 * scale), arrow_center_y + int(5 * scale)),
-        (arrow_center_x, arrow_center_y + int(20 * scale)),
-        (arrow_center_x + int(15 * scale), arrow_center_y + int(5 * scale)),
-        (arrow_center_x + int(10 * scale), arrow_center_y + int(5 * scale)),
-        (arrow_center_x, arrow_center_y + int(15 * scale)),
-        (arrow_center_x - int(10 * scale), arrow_center_y + int(5 * scale))
+        (arrow_center_x - 15, arrow_center_y + 5),
+        (arrow_center_x, arrow_center_y + 20),
+        (arrow_center_x + 15, arrow_center_y + 5),
+        (arrow_center_x + 10, arrow_center_y + 5),
+        (arrow_center_x, arrow_center_y + 15),
+        (arrow_center_x - 10, arrow_center_y + 5)
     ]
     draw.polygon(arrow_head, fill='#FFFFFF')
     
     # 品牌文字 "DOWNLOADER" (中心在 512, 712)
-    text_center_x, text_center_y = int(512 * scale), int(712 * scale)
-    text_bg_width, text_bg_height = int(120 * scale), int(30 * scale)
+    text_center_x, text_center_y = 512, 712
+    text_bg_width, text_bg_height = 120, 30
     
     # 文字背景
     draw_rounded_rectangle(draw,
         text_center_x - text_bg_width//2, text_center_y - text_bg_height//2,
         text_center_x + text_bg_width//2, text_center_y + text_bg_height//2,
-        int(15 * scale), '#202124', opacity=25)
+        15, '#202124', opacity=25)
+    
+    return draw
+
+def create_png_with_pil(output_path, size=1024, supersample=None):
+    """按concrete SVG的布局用PIL手工绘制（无NumPy时的备选方案）"""
+    img = fallback_display_list().render(size, supersample)
+    draw = ImageDraw.Draw(img)
+    
+    # 品牌文字 (SVG中心在 512, 712)
+    scale = size / 1024.0
+    text_center_x, text_center_y = int(512 * scale), int(712 * scale)
     
     # 文字 (简化版本，因为字体可能不可用)
     try:
         font_size = int(20 * scale)
         if font_size > 8:  # 只在足够大时绘制文字
-            # 尝试使用系统字体
-            font = None
-            try:
-                font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", font_size)
-            except:
-                try:
-                    font = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", font_size)
-                except:
-                    font = ImageFont.load_default()
+            # 使用字体注册表中缓存的系统字体
+            font = load_font('body', font_size)
             
             text = "DOWNLOADER"
             # 获取文字尺寸
@@ -147,71 +176,27 @@ def parse_svg_and_create_png(svg_path, output_path, size=1024):
         pass
     
     # 保存图像
-    img.save(output_path, 'PNG')
-    return True
+    return write_png(img, output_path)
 
 def draw_rounded_rectangle(draw, x1, y1, x2, y2, radius, fill_color, outline_color=None, outline_width=0, opacity=255):
-    """绘制圆角矩形"""
+    """绘制圆角矩形（draw可以是AADraw或DisplayList）"""
     
     if isinstance(fill_color, str):
         # 将十六进制颜色转为RGBA
         fill_color = tuple(int(fill_color[i:i+2], 16) for i in (1, 3, 5)) + (opacity,)
     
-    # 创建圆角矩形的路径点
-    points = []
-    
-    # 右下角
-    for angle in range(0, 91, 10):
-        x = x2 - radius + radius * math.cos(math.radians(angle))
-        y = y2 - radius + radius * math.sin(math.radians(angle))
-        points.append((x, y))
-    
-    # 左下角
-    for angle in range(90, 181, 10):
-        x = x1 + radius + radius * math.cos(math.radians(angle))
-        y = y2 - radius + radius * math.sin(math.radians(angle))
-        points.append((x, y))
-    
-    # 左上角
-    for angle in range(180, 271, 10):
-        x = x1 + radius + radius * math.cos(math.radians(angle))
-        y = y1 + radius + radius * math.sin(math.radians(angle))
-        points.append((x, y))
-    
-    # 右上角
-    for angle in range(270, 361, 10):
-        x = x2 - radius + radius * math.cos(math.radians(angle))
-        y = y1 + radius + radius * math.sin(math.radians(angle))
-        points.append((x, y))
-    
-    # 绘制填充
-    if len(points) > 2:
-        draw.polygon(points, fill=fill_color)
-    else:
-        # 备选：绘制简单矩形
-        draw.rectangle([x1, y1, x2, y2], fill=fill_color)
+    draw.rounded_rectangle([x1, y1, x2, y2], radius, fill=fill_color)
     
     # 绘制边框
     if outline_color and outline_width > 0:
-        outline_rgba = tuple(int(outline_color[i:i+2], 16) for i in (1, 3, 5)) + (255,)
-        if len(points) > 2:
-            draw.polygon(points, outline=outline_rgba, width=outline_width)
-        else:
-            draw.rectangle([x1, y1, x2, y2], outline=outline_rgba, width=outline_width)
+        draw.rounded_rectangle([x1, y1, x2, y2], radius, outline=outline_color, width=outline_width)
 
 def draw_thick_line(draw, x1, y1, x2, y2, width, color):
     """绘制粗线条"""
-    # 简化版本：绘制多条相邻的线
-    if isinstance(color, str):
-        color = tuple(int(color[i:i+2], 16) for i in (1, 3, 5))
-    
-    for i in range(-width//2, width//2 + 1):
-        draw.line([(x1, y1+i), (x2, y2+i)], fill=color, width=1)
-        draw.line([(x1+i, y1), (x2+i, y2)], fill=color, width=1)
+    draw.line([(x1, y1), (x2, y2)], fill=color, width=width)
 
-def main():
-    svg_source = "assets/x-google-drive-downloader-concrete.svg"
-    output_path = "generated_icons/base_1024_improved.png"
+def main(svg_source="assets/x-google-drive-downloader-concrete.svg",
+         output_path="generated_icons/base_1024_improved.png", size=1024, tiled=None):
     
     if not os.path.exists(svg_source):
         print(f"❌ SVG文件不存在: {svg_source}")
@@ -221,12 +206,22 @@ def main():
     
     print("🎨 使用SVG内容创建精确的PNG图标...")
     
-    if parse_svg_and_create_png(svg_source, output_path, 1024):
-        print(f"✅ 高质量图标生成成功: {output_path}")
+    stats = parse_svg_and_create_png(svg_source, output_path, size, tiled)
+    if stats:
+        print(f"✅ 高质量图标生成成功: {output_path} ({stats.describe()})")
         return True
     else:
         print(f"❌ 图标生成失败")
         return False
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="SVG转PNG")
+    parser.add_argument("svg", nargs="?", default="assets/x-google-drive-downloader-concrete.svg")
+    parser.add_argument("output", nargs="?", default="generated_icons/base_1024_improved.png")
+    parser.add_argument("--size", type=int, default=1024, help="输出宽度（像素）")
+    parser.add_argument("--tiled", action="store_true", default=None,
+                        help="强制分块渲染并流式编码（默认超过4096时启用）")
+    add_png_mode_argument(parser)
+    args = parser.parse_args()
+    set_png_mode(args.png_mode)
+    main(args.svg, args.output, args.size, args.tiled)
\ No newline at end of file
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+截图文字排版
+每段文字按 (文字, 字体角色, 字号) 只整形和测量一次；逐个码位按拉丁/中日韩/表情分类选择字体，
+主字体缺字时依次回退，相邻同字体的字符合并为一个run，各run按基线对齐；
+提供单行、居中、框内居中和自动换行的绘制函数，重复排版只剩光栅化的开销
+"""
+
+import unicodedata
+from dataclasses import dataclass
+from functools import lru_cache
+
+from PIL import Image, ImageChops, ImageDraw
+
+from font_registry import draw_text, find_font, get_font, load_font, text_bbox
+
+# 各类字符依次尝试的字体角色（None 表示调用方指定的主角色）
+FALLBACK_CHAINS = {
+    "latin": (None, "body", "chinese", "emoji"),
+    "cjk": ("chinese", None, "emoji"),
+    "emoji": ("emoji", None, "chinese", "body"),
+}
+# 彩色表情字体只提供这些位图字号，按最接近的字号加载后缩放
+EMOJI_STRIKES = (160, 137, 109, 96, 64, 48, 40, 32, 26, 20)
+# 判断彩色字体时渲染的表情
+COLOR_PROBE = "\U0001F600"
+# 不存在于任何字体中的码位，用来取得缺字（.notdef）字形
+NOTDEF_PROBE = "\U0010FFFD"
+# 附着在前一个字符上的码位：变体选择符、零宽连接符、组合符号
+JOINERS = {"\u200d", "\ufe0e", "\ufe0f"}
+
+LAYOUT_CACHE_SIZE = 4096
+
+
+@dataclass(frozen=True)
+class FontSpec:
+    """字体角色 + 字号，排版函数用它代替具体的字体对象"""
+    role: str
+    size: int
+
+
+@dataclass(frozen=True)
+class Run:
+    """同一字体的一段文字；x为相对行起点的偏移，color为True时是彩色字体，scale不为1时是缩放后的位图字体"""
+    text: str
+    font: object
+    x: float
+    scale: float = 1.0
+    color: bool = False
+
+
+@dataclass(frozen=True)
+class Line:
+    """整形后的一行文字：bbox 以主字体 'la' 锚点（与 draw.text 默认一致）为原点"""
+    runs: tuple
+    ascent: int
+    advance: float
+    bbox: tuple
+
+    @property
+    def width(self):
+        return self.bbox[2] - self.bbox[0]
+
+    @property
+    def height(self):
+        return self.bbox[3] - self.bbox[1]
+
+
+def classify(char):
+    """把码位归类为 latin / cjk / emoji"""
+    code = ord(char)
+    if 0x1F000 <= code <= 0x1FAFF or 0x2600 <= code <= 0x27BF or 0x2B00 <= code <= 0x2BFF:
+        return "emoji"
+    if (0x2E80 <= code <= 0x9FFF or 0xAC00 <= code <= 0xD7AF or 0xF900 <= code <= 0xFAFF
+            or 0xFF00 <= code <= 0xFFEF or 0x20000 <= code <= 0x2FFFF):
+        return "cjk"
+    return "latin"
+
+
+@lru_cache(maxsize=None)
+def resolve_font(role, size):
+    """返回 (字体, 缩放比例)；只有固定字号的彩色字体按最接近的位图字号加载"""
+    found = find_font(role)
+    if found is None:
+        return load_font(role, size), 1.0
+    try:
+        return get_font(found[0], size, found[1]), 1.0
+    except OSError:
+        pass
+    for strike in sorted(EMOJI_STRIKES, key=lambda s: (s < size, abs(s - size))):
+        try:
+            return get_font(found[0], strike, found[1]), size / strike
+        except OSError:
+            continue
+    return load_font(role, size), 1.0
+
+
+def _glyph_signature(font, char):
+    # 以RGBA模式渲染，彩色位图字体（只有彩色字形）也能比较
+    try:
+        width = font.getlength(char, mode="RGBA")
+        left, top, right, bottom = font.getbbox(char, mode="RGBA")
+        glyph = Image.new("RGBA", (max(1, right - left), max(1, bottom - top)), (0, 0, 0, 0))
+        ImageDraw.Draw(glyph).text((-left, -top), char, font=font, fill=(255, 255, 255, 255),
+                                   embedded_color=True)
+    except (OSError, ValueError, AttributeError):
+        return None
+    return width, (left, top, right, bottom), glyph.tobytes()
+
+
+@lru_cache(maxsize=None)
+def is_color_font(font):
+    """字体是否带彩色字形（白色填充渲染表情时出现非灰色像素）"""
+    try:
+        left, top, right, bottom = font.getbbox(COLOR_PROBE, mode="RGBA")
+        probe = Image.new("RGB", (max(1, right - left), max(1, bottom - top)), (0, 0, 0))
+        ImageDraw.Draw(probe).text((-left, -top), COLOR_PROBE, font=font, fill=(255, 255, 255),
+                                   embedded_color=True)
+    except (OSError, ValueError, TypeError, AttributeError):
+        return False
+    red, green, blue = probe.split()
+    return any(ImageChops.difference(a, b).getbbox() for a, b in ((red, green), (green, blue)))
+
+
+@lru_cache(maxsize=None)
+def _notdef_signature(font):
+    return _glyph_signature(font, NOTDEF_PROBE)
+
+
+@lru_cache(maxsize=65536)
+def has_glyph(font, char):
+    """字体是否包含该字符（渲染结果与缺字字形相同视为缺字）"""
+    if char.isspace() or unicodedata.category(char) in ("Cc", "Cf", "Mn"):
+        return True
+    signature = _glyph_signature(font, char)
+    return signature is not None and signature != _notdef_signature(font)
+
+
+def _font_for(char, spec):
+    chain = [role or spec.role for role in FALLBACK_CHAINS[classify(char)]]
+    candidates = [resolve_font(role, spec.size) for role in dict.fromkeys(chain)]
+    for font, scale in candidates:
+        if has_glyph(font, char):
+            return font, scale
+    # 所有字体都缺字时使用主字体（显示缺字框，与原来的行为一致）
+    return resolve_font(spec.role, spec.size)
+
+
+def itemize(text, spec):
+    """把文字拆分为 [(文字, 字体, 缩放)]，相邻同字体的字符合并"""
+    items = []
+    for char in text:
+        if items and (char in JOINERS or unicodedata.category(char) == "Mn"):
+            items[-1][0] += char
+            continue
+        font, scale = _font_for(char, spec)
+        if items and items[-1][1] is font:
+            items[-1][0] += char
+        else:
+            items.append([char, font, scale])
+    return [tuple(item) for item in items]
+
+
+@lru_cache(maxsize=LAYOUT_CACHE_SIZE)
+def shape(text, spec):
+    """整形并测量一行文字（按文字和字体规格缓存）"""
+    primary, _ = resolve_font(spec.role, spec.size)
+    ascent = primary.getmetrics()[0] if hasattr(primary, "getmetrics") else 0
+    runs, x = [], 0.0
+    boxes = []
+    for run_text, font, scale in itemize(text, spec):
+        color = is_color_font(font)
+        # 彩色字形只在RGBA模式下有度量，与 _glyph_signature 一致
+        mode = "RGBA" if color else ""
+        runs.append(Run(run_text, font, x, scale, color))
+        left, top, right, bottom = text_bbox(font, run_text, "ls", mode)
+        boxes.append((x + left * scale, ascent + top * scale, x + right * scale, ascent + bottom * scale))
+        x += font.getlength(run_text, mode=mode) * scale
+    if boxes:
+        bbox = tuple(int(round(f(values))) for f, values in
+                     zip((min, min, max, max), zip(*boxes)))
+    else:
+        bbox = (0, 0, 0, 0)
+    return Line(tuple(runs), ascent, x, bbox)
+
+
+def measure(text, spec):
+    """返回 (宽, 高)，与 draw.textbbox 的宽高一致"""
+    line = shape(text, spec)
+    return line.width, line.height
+
+
+# ---------------------------------------------------------------- 绘制
+
+@lru_cache(maxsize=LAYOUT_CACHE_SIZE)
+def _color_bitmap(font, text, scale, fill):
+    """彩色/位图字体：按原生字号渲染RGBA位图（单色字形使用fill），需要时缩放，返回 (RGBA图像, 相对基线的偏移)"""
+    left, top, right, bottom = text_bbox(font, text, "ls", "RGBA")
+    image = Image.new("RGBA", (max(1, right - left), max(1, bottom - top)), (0, 0, 0, 0))
+    ImageDraw.Draw(image).text((-left, -top), text, font=font, fill=fill, anchor="ls", embedded_color=True)
+    if scale != 1.0:
+        size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        image = image.resize(size, Image.Resampling.LANCZOS)
+    return image, (left * scale, top * scale)
+
+
+def draw_line(image, xy, text, spec, fill):
+    """在 xy（与 draw.text 默认锚点相同的左上角）绘制一行文字"""
+    line = shape(text, spec)
+    x, baseline = xy[0], xy[1] + line.ascent
+    for run in line.runs:
+        if not run.color and run.scale == 1.0:
+            draw_text(image, (x + run.x, baseline), run.text, run.font, fill, anchor="ls")
+        else:
+            # 彩色字体即使恰好按原生字号加载也走RGBA位图，否则表情会变成fill颜色的剪影
+            bitmap, (dx, dy) = _color_bitmap(run.font, run.text, run.scale, fill)
+            position = (int(round(x + run.x + dx)), int(round(baseline + dy)))
+            if image.mode == "RGBA":
+                image.alpha_composite(bitmap, position)
+            else:
+                image.paste(bitmap, position, bitmap)
+    return line
+
+
+def draw_centered(image, center_x, y, text, spec, fill):
+    """水平居中绘制（中心x，顶端y）"""
+    width = shape(text, spec).width
+    return draw_line(image, (center_x - width // 2, y), text, spec, fill)
+
+
+def draw_in_box(image, box, text, spec, fill):
+    """在矩形 (x0, y0, x1, y1) 内水平、垂直居中绘制"""
+    line = shape(text, spec)
+    x0, y0, x1, y1 = box
+    return draw_line(image, (x0 + (x1 - x0 - line.width) // 2, y0 + (y1 - y0 - line.height) // 2),
+                     text, spec, fill)
+
+
+def _tokens(text):
+    """换行单位：连续的非中日韩字符（含其后的空格）为一个词，中日韩字符单独成词"""
+    tokens, current = [], ""
+    for char in text:
+        if classify(char) == "cjk":
+            if current:
+                tokens.append(current)
+            tokens.append(char)
+            current = ""
+        elif char == " " and current and not current.endswith(" "):
+            current += char
+        else:
+            if current.endswith(" "):
+                tokens.append(current)
+                current = ""
+            current += char
+    if current:
+        tokens.append(current)
+    return tokens
+
+
+@lru_cache(maxsize=LAYOUT_CACHE_SIZE)
+def wrap(text, spec, max_width):
+    """按最大宽度贪心换行，返回各行文字的元组"""
+    lines, current = [], ""
+    for token in _tokens(text):
+        candidate = current + token
+        if current and shape(candidate.rstrip(), spec).width > max_width:
+            lines.append(current.rstrip())
+            current = token.lstrip()
+        else:
+            current = candidate
+    if current.strip() or not lines:
+        lines.append(current.rstrip())
+    return tuple(lines)
+
+
+def draw_wrapped(image, xy, text, spec, fill, max_width, line_height=None, align="left"):
+    """自动换行绘制，返回最后一行下方的y坐标"""
+    x, y = xy
+    step = line_height or round(spec.size * 1.4)
+    for line_text in wrap(text, spec, max_width):
+        if align == "center":
+            draw_centered(image, x + max_width // 2, y, line_text, spec, fill)
+        else:
+            draw_line(image, (x, y), line_text, spec, fill)
+        y += step
+    return y
+
+
+def cache_info():
+    """返回整形和换行缓存的命中统计"""
+    return {"shape": shape.cache_info(), "wrap": wrap.cache_info(), "glyphs": has_glyph.cache_info()}
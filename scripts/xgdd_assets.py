@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+资源工具统一入口
+xgdd-assets <命令> [参数]：icons / screenshots / build 走增量构建图，svg、optimize、bench、golden 调用对应脚本，
+status 显示各节点是否最新、可用的转换工具和渲染缓存。
+各命令的模块在执行时才导入，--help、status 和全部命中缓存的构建不加载 PIL/NumPy
+"""
+
+import argparse
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ICON_TARGETS = ["user_icon", "app_icons", "desktop_icons", "showcase_icon", "improved_base_icon"]
+SCREENSHOT_TARGETS = ["realistic_screenshots", "demo_screenshots"]
+
+
+def _build(targets):
+    def run(argv, prog):
+        from build_graph import main
+        return main(targets + argv, prog)
+    return run
+
+
+def _svg(argv, prog):
+    from generate_icons import cli
+    # generate_icons 使用相对仓库根目录的路径
+    os.chdir(REPO_ROOT)
+    return cli(argv, prog)
+
+
+def _optimize(argv, prog):
+    from png_optimize import main
+    return main(argv, prog)
+
+
+def _bench(argv, prog):
+    from benchmark import main
+    return main(argv, prog)
+
+
+def _golden(argv, prog):
+    from golden_images import main
+    return main(argv, prog)
+
+
+def _status(argv, prog):
+    parser = argparse.ArgumentParser(prog=prog, description="显示资源构建状态、转换工具和渲染缓存")
+    parser.parse_args(argv)
+
+    from build_graph import ASSET_NODES, BuildGraph
+    from converter_tools import available_converters
+    from render_cache import RenderCache
+
+    print("📦 资源节点:")
+    BuildGraph(ASSET_NODES).build(dry_run=True)
+
+    print("\n🔧 SVG转换工具:")
+    for name, info in available_converters():
+        if info:
+            print(f"  ✅ {name} {info['version']}".rstrip() + f" ({info['path']})")
+        else:
+            print(f"  ⚪ {name}: 未安装")
+
+    cache = RenderCache()
+    total = sum(meta["bytes"] for meta in cache.index.values())
+    print(f"\n💾 渲染缓存: {len(cache.index)} 个文件, {total / 1024 / 1024:.1f}MB ({cache.root})")
+    return 0
+
+
+# 命令 -> (处理函数, 说明)
+COMMANDS = {
+    "icons": (_build(ICON_TARGETS), "增量构建应用图标（图标集、桌面图标、展示图标）"),
+    "screenshots": (_build(SCREENSHOT_TARGETS), "增量构建截图"),
+    "build": (_build([]), "增量构建全部资源（可指定节点）"),
+    "svg": (_svg, "用外部转换工具从SVG生成图标集"),
+    "optimize": (_optimize, "无损压缩PNG资源"),
+    "bench": (_bench, "资源管线基准测试"),
+    "golden": (_golden, "金标准图像回归测试"),
+    "status": (_status, "显示构建状态、转换工具和渲染缓存"),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="xgdd-assets", description="资源工具统一入口",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="命令:\n" + "\n".join(f"  {name:<12}{help_text}" for name, (_, help_text) in COMMANDS.items())
+        + "\n\n各命令的参数见 xgdd-assets <命令> --help")
+    parser.add_argument("command", choices=COMMANDS, metavar="命令")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="传给命令的参数")
+    args = parser.parse_args(argv)
+
+    handler, _ = COMMANDS[args.command]
+    return handler(args.args, f"xgdd-assets {args.command}") or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+资源生成器的金标准图像回归测试
+运行: python3 -m unittest discover -s test -p "test_*.py"（需要 Pillow 和 NumPy）
+"""
+
+import os
+import sys
+import unittest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "scripts"))
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+import golden_images
+
+
+def gradient(size=64):
+    """不透明的渐变测试图"""
+    ys, xs = np.indices((size, size))
+    pixels = np.stack([xs * 4, ys * 4, (xs + ys) * 2, np.full_like(xs, 255)], axis=-1)
+    return Image.fromarray(pixels.astype(np.uint8), "RGBA")
+
+
+class CompareTest(unittest.TestCase):
+    """compare() 在合成图像对上的判定"""
+
+    def test_identical_images_pass(self):
+        image = gradient()
+        result, distance = golden_images.compare(image, image.copy())
+        self.assertEqual(result.status, "passed")
+        self.assertEqual(result.ssim, 1.0)
+        self.assertIsNone(distance)
+
+    def test_rounding_noise_passes(self):
+        reference = gradient()
+        # 五分之一的像素有 ±1 的舍入差异
+        rng = np.random.default_rng(0)
+        noise = rng.integers(-1, 2, (64, 64, 3)) * (rng.random((64, 64, 1)) < 0.2)
+        pixels = np.asarray(reference).astype(np.int16)
+        pixels[..., :3] = np.clip(pixels[..., :3] + noise, 0, 255)
+        result, _ = golden_images.compare(reference, Image.fromarray(pixels.astype(np.uint8), "RGBA"))
+        self.assertEqual(result.status, "passed", result.describe())
+        self.assertLess(result.mean_delta_e, 0.5)
+
+    def test_visible_change_fails(self):
+        reference = gradient()
+        actual = reference.copy()
+        ImageDraw.Draw(actual).rectangle((20, 20, 35, 35), fill=(255, 0, 0, 255))
+        result, distance = golden_images.compare(reference, actual)
+        self.assertEqual(result.status, "failed")
+        self.assertIn("SSIM", result.reason)
+        self.assertEqual(distance.shape, (64, 64))
+        self.assertGreater(distance[28, 28], 10)
+        self.assertEqual(distance[5, 5], 0)
+
+    def test_alpha_change_fails(self):
+        reference = Image.new("RGBA", (32, 32), (0, 0, 0, 255))
+        actual = Image.new("RGBA", (32, 32), (0, 0, 0, 0))
+        result, _ = golden_images.compare(reference, actual)
+        self.assertEqual(result.status, "failed")
+        self.assertGreater(result.mean_delta_e, 50)
+
+    def test_size_mismatch_fails(self):
+        result, distance = golden_images.compare(gradient(64), gradient(32))
+        self.assertEqual(result.status, "failed")
+        self.assertIsNone(distance)
+
+
+class CommittedGoldensTest(unittest.TestCase):
+    """图标生成器的全部尺寸与 test/goldens/ 中提交的参考图一致"""
+
+    def setUp(self):
+        # 生成器和默认参考图目录都使用相对仓库根目录的路径
+        self._cwd = os.getcwd()
+        os.chdir(REPO_ROOT)
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+
+    def test_icon_matrix(self):
+        cases = golden_images.golden_cases()
+        self.assertTrue(cases)
+        self.assertFalse([case.name for case in cases if case.generator in golden_images.LOCAL_GENERATORS])
+        for case, result in zip(cases, golden_images.run_cases(cases)):
+            with self.subTest(case=case.name):
+                self.assertIn(result.status, ("passed", "skipped"), result.describe())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+渲染缓存与转换执行器的回归测试
+运行: python3 -m unittest discover -s test -p "test_*.py"
+"""
+
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "scripts"))
+
+import converter_runner
+from render_cache import RenderCache
+
+# 假的 rsvg-convert：像真实工具一样就地写输出文件，并记录调用次数
+STUB_CONVERTER = """#!/bin/sh
+echo call >> "$(dirname "$0")/calls.log"
+while [ $# -gt 0 ]; do
+    case $1 in
+        -w|-h) shift 2 ;;
+        -o) output=$2; shift 2 ;;
+        *) svg=$1; shift ;;
+    esac
+done
+cat "$svg" > "$output"
+"""
+
+
+@unittest.skipIf(sys.platform == "win32", "需要POSIX shell")
+class ConverterCacheTest(unittest.TestCase):
+    """缓存命中后放置出去的文件被下一次转换覆盖时，缓存对象不能随之改变"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        bin_dir = os.path.join(self.tmp, "bin")
+        os.makedirs(bin_dir)
+        stub = os.path.join(bin_dir, "rsvg-convert")
+        with open(stub, "w") as f:
+            f.write(STUB_CONVERTER)
+        os.chmod(stub, os.stat(stub).st_mode | stat.S_IXUSR)
+        self.calls_log = os.path.join(bin_dir, "calls.log")
+
+        self.svg = os.path.join(self.tmp, "icon.svg")
+        self.output = os.path.join(self.tmp, "icon_16x16.png")
+        self.cache = RenderCache(root=os.path.join(self.tmp, "cache"))
+        patches = [
+            mock.patch.dict(os.environ, {"PATH": bin_dir + os.pathsep + os.environ.get("PATH", "")}),
+            mock.patch.object(converter_runner, "converter_version", return_value="stub 1.0"),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def calls(self):
+        try:
+            with open(self.calls_log) as f:
+                return len(f.readlines())
+        except OSError:
+            return 0
+
+    def render(self, content):
+        with open(self.svg, "w") as f:
+            f.write(content)
+        result, = converter_runner.run_conversions(
+            [(self.svg, 16, self.output)], "librsvg", max_parallel=1, cache=self.cache)
+        self.assertTrue(result.ok, result.error)
+        with open(self.output) as f:
+            self.assertEqual(f.read(), content)
+
+    def test_revert_hits_cache(self):
+        self.render("<svg>A</svg>")
+        self.assertEqual(self.calls(), 1)
+        self.render("<svg>A</svg>")
+        self.assertEqual(self.calls(), 1)
+        self.render("<svg>B</svg>")
+        self.assertEqual(self.calls(), 2)
+        # 改回A：缓存对象应保持A的内容，直接命中
+        self.render("<svg>A</svg>")
+        self.assertEqual(self.calls(), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,22 +5,25 @@
 """
 
 try:
-    from PIL import Image, ImageDraw, ImageFont
-    import math
+    import PIL  # noqa: F401  检查依赖是否已安装
+    import argparse
+    from functools import lru_cache
+    import os
+    import sys
 except ImportError:
     print("❌ 需要安装 PIL 库")
     print("运行: pip3 install Pillow")
     exit(1)
 
-def create_professional_icon(size=1024):
-    """创建专业的蓝色云下载图标"""
-    
-    # 创建图像
-    img = Image.new('RGBA', (size, size), (0, 0, 0, 0))  # 透明背景
-    draw = ImageDraw.Draw(img)
-    
-    # 计算尺寸比例
-    scale = size / 1024.0
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+from png_stream import STREAM_THRESHOLD, add_png_mode_argument, render_to_png, set_png_mode, write_png
+from display_list import DisplayList
+
+@lru_cache(maxsize=None)
+def professional_icon_display_list():
+    """专业蓝色云下载图标的显示列表（1024设计坐标，只构建一次）"""
+    size = 1024
+    draw = DisplayList(size)  # 接口与AADraw一致，坐标直接使用设计坐标
     
     # 颜色定义
     primary_blue = (74, 133, 244, 255)      # #4A85F4 (Google蓝)
@@ -29,7 +32,7 @@ def create_professional_icon(size=1024):
     shadow_color = (0, 0, 0, 30)
     
     # 创建背景渐变圆角矩形
-    corner_radius = int(180 * scale)
+    corner_radius = 180
     
     # 绘制背景
     bg_rect = [0, 0, size, size]
@@ -37,9 +40,9 @@ def create_professional_icon(size=1024):
     
     # 云朵设计 - 更专业和现代化
     cloud_center_x = size // 2
-    cloud_center_y = int(300 * scale)
-    cloud_width = int(400 * scale)
-    cloud_height = int(120 * scale)
+    cloud_center_y = 300
+    cloud_width = 400
+    cloud_height = 120
     
     # 主云朵体
     cloud_main = [
@@ -53,30 +56,30 @@ def create_professional_icon(size=1024):
     # 云朵凸起部分 - 创建更自然的云朵形状
     bumps = [
         # 左侧凸起
-        [cloud_center_x - int(180 * scale), cloud_center_y - int(80 * scale),
-         cloud_center_x - int(80 * scale), cloud_center_y + int(20 * scale)],
+        [cloud_center_x - 180, cloud_center_y - 80,
+         cloud_center_x - 80, cloud_center_y + 20],
         # 上方凸起
-        [cloud_center_x - int(100 * scale), cloud_center_y - int(100 * scale),
-         cloud_center_x + int(100 * scale), cloud_center_y - int(20 * scale)],
+        [cloud_center_x - 100, cloud_center_y - 100,
+         cloud_center_x + 100, cloud_center_y - 20],
         # 右侧凸起
-        [cloud_center_x + int(80 * scale), cloud_center_y - int(60 * scale),
-         cloud_center_x + int(180 * scale), cloud_center_y + int(40 * scale)]
+        [cloud_center_x + 80, cloud_center_y - 60,
+         cloud_center_x + 180, cloud_center_y + 40]
     ]
     
     for bump in bumps:
         draw.ellipse(bump, fill=white)
     
     # 添加云朵阴影效果
-    shadow_offset = int(4 * scale)
+    shadow_offset = 4
     for bump in bumps:
         shadow_bump = [b + shadow_offset for b in bump]
         draw.ellipse(shadow_bump, fill=shadow_color)
     
     # 下载箭头 - 现代化设计
     arrow_center_x = cloud_center_x
-    arrow_start_y = cloud_center_y + int(80 * scale)
-    arrow_length = int(200 * scale)
-    arrow_width = int(30 * scale)
+    arrow_start_y = cloud_center_y + 80
+    arrow_length = 200
+    arrow_width = 30
     
     # 箭头杆
     arrow_rect = [
@@ -85,35 +88,35 @@ def create_professional_icon(size=1024):
         arrow_center_x + arrow_width//2,
         arrow_start_y + arrow_length
     ]
-    draw.rounded_rectangle(arrow_rect, int(15 * scale), fill=secondary_blue)
+    draw.rounded_rectangle(arrow_rect, 15, fill=secondary_blue)
     
     # 箭头头部 - 三角形
-    arrow_head_size = int(70 * scale)
-    arrow_tip_y = arrow_start_y + arrow_length + int(30 * scale)
+    arrow_head_size = 70
+    arrow_tip_y = arrow_start_y + arrow_length + 30
     
     arrow_points = [
         (arrow_center_x, arrow_tip_y),  # 尖端
-        (arrow_center_x - arrow_head_size, arrow_start_y + arrow_length - int(20 * scale)),  # 左
-        (arrow_center_x + arrow_head_size, arrow_start_y + arrow_length - int(20 * scale))   # 右
+        (arrow_center_x - arrow_head_size, arrow_start_y + arrow_length - 20),  # 左
+        (arrow_center_x + arrow_head_size, arrow_start_y + arrow_length - 20)   # 右
     ]
     draw.polygon(arrow_points, fill=secondary_blue)
     
     # 添加光泽效果
-    highlight_y = int(200 * scale)
-    highlight_height = int(150 * scale)
+    highlight_y = 200
+    highlight_height = 150
     highlight_ellipse = [
-        int(200 * scale), highlight_y,
-        int(824 * scale), highlight_y + highlight_height
+        200, highlight_y,
+        824, highlight_y + highlight_height
     ]
     draw.ellipse(highlight_ellipse, fill=(255, 255, 255, 40))
     
     # 添加底部完成指示
-    dot_y = arrow_tip_y + int(60 * scale)
-    dot_radius = int(15 * scale)
+    dot_y = arrow_tip_y + 60
+    dot_radius = 15
     
     # 三个指示点
     for i, x_offset in enumerate([-40, 0, 40]):
-        dot_x = arrow_center_x + int(x_offset * scale)
+        dot_x = arrow_center_x + x_offset
         opacity = 255 if i == 1 else 180  # 中间点更亮
         dot_color = (*secondary_blue[:3], opacity)
         
@@ -123,22 +126,36 @@ def create_professional_icon(size=1024):
         ]
         draw.ellipse(dot_bounds, fill=dot_color)
     
-    return img
+    return draw
+
+def create_professional_icon(size=1024, supersample=None, rows=None):
+    """
+    创建专业的蓝色云下载图标（supersample为超采样倍数，默认读取XGDD_SUPERSAMPLE）
+    rows=(起始行, 行数) 时只绘制整幅图标中的这一水平条带
+    """
+    return professional_icon_display_list().render(size, supersample, rows)
 
-def main():
+def save_icon_tiled(path, size, supersample=None):
+    """按水平条带绘制并流式编码，峰值内存与尺寸无关"""
+    return render_to_png(path, size, size,
+                         lambda top, rows: create_professional_icon(size, supersample, (top, rows)))
+
+def main(size=1024, source_path="user_icon.png"):
     """主函数"""
     print("🎨 创建专业蓝色云下载图标")
     print("=" * 40)
     
-    # 创建高分辨率源图标
-    icon = create_professional_icon(1024)
-    
-    # 保存源文件
-    source_path = "user_icon.png"
-    icon.save(source_path, "PNG")
-    
-    file_size = len(icon.tobytes()) / 1024
-    print(f"✅ 创建源图标: {source_path} ({file_size:.1f}KB)")
+    if size > STREAM_THRESHOLD:
+        # 超大尺寸按条带流式编码，不在内存中保留整幅图像
+        stats = save_icon_tiled(source_path, size)
+        print(f"✅ 创建源图标: {source_path} ({size}x{size}, 分块渲染, {stats.describe()})")
+    else:
+        # 创建高分辨率源图标
+        icon = create_professional_icon(size)
+        
+        # 保存源文件
+        stats = write_png(icon, source_path)
+        print(f"✅ 创建源图标: {source_path} ({stats.describe()})")
     
     print("")
     print("📋 图标特征:")
@@ -152,4 +169,10 @@ def main():
     print("下一步: 运行 python3 extract_and_convert_icon.py 转换为所有尺寸")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="创建专业蓝色云下载图标")
+    parser.add_argument("--size", type=int, default=1024, help="输出尺寸（超过4096时分块渲染）")
+    parser.add_argument("-o", "--output", default="user_icon.png", help="输出路径")
+    add_png_mode_argument(parser)
+    args = parser.parse_args()
+    set_png_mode(args.png_mode)
+    main(args.size, args.output)
\ No newline at end of file